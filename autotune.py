@@ -0,0 +1,137 @@
+# autotune.py
+"""Autotuning przy pierwszym uruchomieniu: krótkie mikrobenchmarki opcji
+renderowania na tej maszynie i zapis zwycięzców do tuning.json (obok
+setting.json), z kluczem sprzętowym - po zmianie CPU / ekranu / sterownika
+pomiar uruchamia się ponownie."""
+import hashlib
+import json
+import logging
+import os
+import platform
+import statistics
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+import pygame
+
+from perf import FramePacer
+
+log = logging.getLogger("dino_runner.autotune")
+
+TUNING_FILENAME = "tuning.json"
+TUNING_VERSION = 1
+
+SMOOTHSCALE_BACKENDS = ("SSE2", "SSE", "NEON", "MMX", "GENERIC")
+BLIT_STRATEGIES = ("blits", "blit")
+
+
+def hardware_fingerprint() -> str:
+    """Skrót CPU + ekranów + sterownika wideo + wersji SDL/pygame."""
+    try:
+        desktops = [list(s) for s in pygame.display.get_desktop_sizes()]
+    except Exception:
+        desktops = []
+    try:
+        driver = pygame.display.get_driver()
+    except Exception:
+        driver = ""
+    parts = {
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "system": platform.system(),
+        "cpus": os.cpu_count(),
+        "desktops": desktops,
+        "driver": driver,
+        "sdl": list(pygame.get_sdl_version()),
+        "pygame": pygame.version.ver,
+    }
+    raw = json.dumps(parts, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def load_tuning(path: str, fingerprint: str) -> Optional[dict]:
+    """Zapisany wynik, o ile pasuje do sprzętu i wersji formatu."""
+    try:
+        with open(path, "r", encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict):
+        return None
+    if data.get("version") != TUNING_VERSION or data.get("fingerprint") != fingerprint:
+        return None
+    return data
+
+
+def save_tuning(path: str, data: dict):
+    tmp = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+    except OSError as e:
+        log.warning("nie można zapisać %s: %s", path, e)
+
+
+def _median_ms(fn: Callable[[], None], repeats: int) -> float:
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return statistics.median(times)
+
+
+def bench_smoothscale(sample: pygame.Surface, target_size, repeats: int = 5) -> Dict[str, float]:
+    """Mediana czasu smoothscale dla każdego dostępnego backendu [ms]."""
+    results: Dict[str, float] = {}
+    try:
+        original = pygame.transform.get_smoothscale_backend()
+    except Exception:
+        original = None
+    for backend in SMOOTHSCALE_BACKENDS:
+        try:
+            pygame.transform.set_smoothscale_backend(backend)
+        except (ValueError, pygame.error):
+            continue
+        pygame.transform.smoothscale(sample, target_size)   # rozgrzewka
+        results[backend] = _median_ms(lambda: pygame.transform.smoothscale(sample, target_size), repeats)
+    if original is not None:
+        pygame.transform.set_smoothscale_backend(original)
+    return results
+
+
+def bench_strategies(draw: Callable[[str], None], strategies: Sequence[str], repeats: int = 30) -> Dict[str, float]:
+    """draw(strategia) rysuje jedną klatkę; wynik: mediana [ms] dla każdej strategii.
+    Strategie są przeplatane, żeby nagrzewanie cache nie faworyzowało pierwszej."""
+    samples: Dict[str, List[float]] = {s: [] for s in strategies}
+    for s in strategies:
+        draw(s)
+    for _ in range(repeats):
+        for s in strategies:
+            t0 = time.perf_counter()
+            draw(s)
+            samples[s].append((time.perf_counter() - t0) * 1000.0)
+    return {s: statistics.median(v) for s, v in samples.items()}
+
+
+def bench_vsync(flip: Callable[[], None], frames: int = 24) -> dict:
+    """Czy flip() faktycznie czeka na odświeżenie ekranu (vsync), i w jakim rytmie."""
+    flip()
+    intervals = []
+    last = time.perf_counter()
+    for _ in range(frames):
+        flip()
+        now = time.perf_counter()
+        intervals.append((now - last) * 1000.0)
+        last = now
+    # te same kryteria co FramePacer w grze: flip blokuje w rytmie (wielokrotnościach) odświeżania
+    ok, period, _reason = FramePacer.judge_vsync(intervals)
+    return {"ok": ok, "median_ms": round(statistics.median(intervals), 3), "period_ms": round(period, 3)}
+
+
+def pick_fastest(results: Dict[str, float], default: str) -> str:
+    if not results:
+        return default
+    return min(results, key=results.get)
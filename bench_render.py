@@ -0,0 +1,145 @@
+# bench_render.py
+"""Benchmark: rysowanie sceny rozgrywki przez Surface + display.flip()
+vs SDL2 Renderer/Texture (texture_backend.TextureBackend).
+
+Scena jest syntetyczna (wygenerowane tło, przeszkody i dino), ale przeszkody
+przechodzą przez prawdziwe ObstacleManager.update/draw.
+
+    python bench_render.py --size 1920x1080 --frames 300
+    python bench_render.py --accelerated      # renderer GPU zamiast programowego
+    SDL_VIDEODRIVER=dummy python bench_render.py   # bez okna
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+import pygame
+
+from render import ObstacleManager
+
+
+def _parse_size(text: str):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def _make_background(w: int, h: int) -> pygame.Surface:
+    bg = pygame.Surface((w, h))
+    for y in range(h):
+        c = int(60 + 120 * y / max(1, h))
+        pygame.draw.line(bg, (c // 2, c, 200 - c // 2), (0, y), (w, y))
+    pygame.draw.rect(bg, (70, 50, 30), (0, int(h * 0.86), w, h))
+    return bg.convert()
+
+
+def _write_obstacles(folder: str):
+    for i in range(3):
+        img = pygame.Surface((60 + 14 * i, 90 + 10 * i), pygame.SRCALPHA)
+        pygame.draw.ellipse(img, (40, 120 + 30 * i, 40, 255), img.get_rect())
+        pygame.draw.rect(img, (90, 60, 30, 255), (img.get_width() // 3, img.get_height() // 2, 12, img.get_height() // 2))
+        pygame.image.save(img, os.path.join(folder, f"bg1_obs{i + 1}.png"))
+
+
+def _build_scene(size, obstacle_dir: str):
+    w, h = size
+    bg = _make_background(w, h)
+    dino = pygame.Surface((int(h * 0.11), int(h * 0.125)), pygame.SRCALPHA)
+    pygame.draw.ellipse(dino, (200, 90, 40, 255), dino.get_rect())
+    dino = dino.convert_alpha()
+
+    font = pygame.font.Font(None, max(22, int(h * 0.04)))
+    hud = font.render("TLO ZA: 12s", True, (255, 225, 120)).convert_alpha()
+    pause = pygame.Surface((int(h * 0.07), int(h * 0.07)), pygame.SRCALPHA)
+    pygame.draw.circle(pause, (30, 30, 30), pause.get_rect().center, pause.get_width() // 2)
+
+    manager = ObstacleManager(
+        screen_size=size,
+        dino_height_px=dino.get_height(),
+        obstacle_dir=obstacle_dir,
+        seed=1234,
+        jump_vel_px_per_s=1120.0,
+        gravity_px_per_s2=2718.0,
+    )
+    return bg, dino, hud, pause, manager
+
+
+def _draw_scene(dst, scene, frame: int, size):
+    bg, dino, hud, pause, manager = scene
+    w, h = size
+    x = -((frame * 4) % w)
+    dst.blit(bg, (x, 0))
+    dst.blit(bg, (x + w, 0))
+    manager.draw(dst)
+    dst.blit(dino, (int(w * 0.18), int(h * 0.86) - dino.get_height()))
+    dst.blit(hud, (12, 12))
+    dst.blit(pause, (w - pause.get_width() - 12, 12))
+
+
+def _run(scene, size, frames: int, dst, present) -> list:
+    manager = scene[4]
+    manager.reset(0, 0, dino_safe_right_px=int(size[0] * 0.2))
+    times = []
+    now = 0
+    for i in range(frames):
+        now += 16
+        manager.update(16, int(size[1] * 0.86), 0, now, dino_safe_right_px=int(size[0] * 0.2))
+        t0 = time.perf_counter()
+        _draw_scene(dst, scene, i, size)
+        present()
+        times.append((time.perf_counter() - t0) * 1000.0)
+        pygame.event.pump()
+    return times
+
+
+def _summary(name: str, times: list) -> str:
+    times = sorted(times)
+    p95 = times[int(len(times) * 0.95) - 1]
+    return f"{name:<18} avg {statistics.fmean(times):7.3f} ms   p50 {statistics.median(times):7.3f} ms   p95 {p95:7.3f} ms"
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--size", default="1280x720")
+    ap.add_argument("--frames", type=int, default=300)
+    ap.add_argument("--accelerated", action="store_true", help="renderer GPU zamiast programowego")
+    args = ap.parse_args()
+
+    size = _parse_size(args.size)
+    pygame.init()
+    screen = pygame.display.set_mode(size, pygame.NOFRAME)
+
+    from texture_backend import TextureBackend
+
+    with tempfile.TemporaryDirectory() as obstacle_dir:
+        _write_obstacles(obstacle_dir)
+        scene = _build_scene(size, obstacle_dir)
+
+        surface_times = _run(scene, size, args.frames, screen, pygame.display.flip)
+
+        backend = TextureBackend(size, "bench", vsync=False, software=not args.accelerated)
+        texture_times = _run(scene, size, args.frames, backend, backend.present)
+
+        # zgodność obrazu: ta sama klatka obiema ścieżkami
+        _draw_scene(screen, scene, 0, size)
+        _draw_scene(backend, scene, 0, size)
+        ref = screen.copy()
+        got = backend.read_frame()
+        diff = 0
+        for y in range(0, size[1], 7):
+            for x in range(0, size[0], 7):
+                a = ref.get_at((x, y))
+                b = got.get_at((x, y))
+                diff = max(diff, abs(a.r - b.r), abs(a.g - b.g), abs(a.b - b.b))
+
+    kind = "GPU" if args.accelerated else "software"
+    print(f"scena {size[0]}x{size[1]}, {args.frames} klatek, przeszkód na ekranie: {len(scene[4].obstacles)}")
+    print(_summary("surface+flip", surface_times))
+    print(_summary(f"texture ({kind})", texture_times))
+    print(f"tekstur wgranych: {backend.texture_count()}, maks. różnica pikseli: {diff}")
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    main()
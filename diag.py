@@ -0,0 +1,793 @@
+# diag.py
+import cProfile
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+import pygame
+
+from perf import PhaseTimer, percentile
+
+
+class PerfOverlay:
+    """Nakładka wydajności (F3): wykres czasów klatek, percentyle, średnie faz
+    i histogram jittera dla bieżącego stanu gry.
+
+    Panel jest przerysowywany co REFRESH_MS do jednej powierzchni, a w każdej
+    klatce tylko blitowany - sama nakładka prawie nie zmienia tego, co mierzy."""
+
+    REFRESH_MS = 250
+    GRAPH_FRAMES = 180
+    GRAPH_HEIGHT_PX = 72
+    HIST_HEIGHT_PX = 48
+    PAD_PX = 8
+    TEXT_CACHE_MAX_ITEMS = 256
+    # odchylenie dt od budżetu klatki [ms] - granice przedziałów histogramu
+    JITTER_EDGES = (-2.0, -0.5, 0.5, 2.0, 4.0, 8.0)
+    JITTER_LABELS = ("<-2", "-2", "±.5", "+.5", "+2", "+4", ">8")
+
+    # fazy pętli + przerwy GC (nakładają się na fazy, osobna pozycja)
+    ROWS = PhaseTimer.PHASES + ("gc",)
+
+    COLOR_BG = (10, 12, 16, 185)
+    COLOR_TEXT = (225, 230, 235)
+    COLOR_DIM = (140, 150, 160)
+    COLOR_OK = (90, 200, 110)
+    COLOR_WARN = (235, 200, 70)
+    COLOR_BAD = (235, 80, 70)
+    COLOR_BUDGET = (120, 170, 255)
+
+    def __init__(self, font: pygame.font.Font, width_px: int = 380):
+        self.font = font
+        self.visible = False
+        self.width = int(width_px)
+        self.line_h = font.get_linesize()
+
+        lines = 3 + (len(self.ROWS) + 1) // 2
+        self.height = (
+            self.PAD_PX * 5 + lines * self.line_h
+            + self.GRAPH_HEIGHT_PX + self.HIST_HEIGHT_PX + self.line_h
+        )
+        self._panel: Optional[pygame.Surface] = None
+        self._text_cache: Dict[Tuple[str, tuple], pygame.Surface] = {}
+        self._last_refresh_ms: Optional[int] = None
+        self._last_state: Optional[str] = None
+        self._dirty = False
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._last_refresh_ms = None
+
+    # ---------- rysowanie ----------
+    def _text(self, text: str, color=COLOR_TEXT) -> pygame.Surface:
+        key = (text, color)
+        surf = self._text_cache.get(key)
+        if surf is None:
+            if len(self._text_cache) >= self.TEXT_CACHE_MAX_ITEMS:
+                self._text_cache.clear()
+            surf = self.font.render(text, True, color)
+            self._text_cache[key] = surf
+        return surf
+
+    def _bar_color(self, value: float, budget: float):
+        if value <= budget:
+            return self.COLOR_OK
+        if value <= budget * 1.25:
+            return self.COLOR_WARN
+        return self.COLOR_BAD
+
+    def _draw_graph(self, panel: pygame.Surface, rect: pygame.Rect, totals: List[float], budget: float):
+        pygame.draw.rect(panel, (0, 0, 0, 120), rect)
+        scale_ms = max(budget * 2.0, 1.0)
+        budget_y = rect.bottom - int(rect.height * min(1.0, budget / scale_ms))
+        pygame.draw.line(panel, self.COLOR_BUDGET, (rect.left, budget_y), (rect.right - 1, budget_y))
+        if not totals:
+            return
+        step = rect.width / float(self.GRAPH_FRAMES)
+        x0 = rect.right - len(totals) * step
+        for i, v in enumerate(totals):
+            h = max(1, int(rect.height * min(1.0, v / scale_ms)))
+            x = int(x0 + i * step)
+            pygame.draw.line(panel, self._bar_color(v, budget), (x, rect.bottom - 1), (x, rect.bottom - h))
+
+    def _draw_histogram(self, panel: pygame.Surface, rect: pygame.Rect, dts: List[float], budget: float):
+        counts = [0] * (len(self.JITTER_EDGES) + 1)
+        for dt in dts:
+            dev = dt - budget
+            b = 0
+            while b < len(self.JITTER_EDGES) and dev >= self.JITTER_EDGES[b]:
+                b += 1
+            counts[b] += 1
+        peak = max(1, max(counts))
+        n = len(counts)
+        bar_w = rect.width // n
+        for i, c in enumerate(counts):
+            h = int((rect.height - 2) * c / peak)
+            color = self.COLOR_OK if i in (2, 3) else (self.COLOR_WARN if i in (1, 4) else self.COLOR_BAD)
+            if h > 0:
+                pygame.draw.rect(panel, color, (rect.left + i * bar_w + 2, rect.bottom - h, bar_w - 4, h))
+            label = self._text(self.JITTER_LABELS[i], self.COLOR_DIM)
+            panel.blit(label, (rect.left + i * bar_w + (bar_w - label.get_width()) // 2, rect.bottom + 2))
+
+    def _rebuild(self, timer: PhaseTimer, state: str, budget_ms: float):
+        if self._panel is None:
+            self._panel = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        panel = self._panel
+        panel.fill(self.COLOR_BG)
+
+        pad = self.PAD_PX
+        lh = self.line_h
+        x, y = pad, pad
+        summary = timer.summary(state)
+        dts = timer.series(state, "dt")
+
+        fps = 1000.0 / (sum(dts) / len(dts)) if dts and sum(dts) > 0 else 0.0
+        panel.blit(self._text(f"{state}   {fps:5.1f} FPS   budżet {budget_ms:.2f} ms"), (x, y))
+        y += lh
+        if summary:
+            panel.blit(self._text(
+                f"praca p50 {summary['p50']:.2f}  p95 {summary['p95']:.2f}  p99 {summary['p99']:.2f} ms",
+                self._bar_color(summary["p95"], budget_ms),
+            ), (x, y))
+        y += lh
+
+        half = (self.width - 2 * pad) // 2
+        for i, phase in enumerate(self.ROWS):
+            value = summary.get(phase, 0.0)
+            col = x + (i % 2) * half
+            row = y + (i // 2) * lh
+            panel.blit(self._text(phase, self.COLOR_DIM), (col, row))
+            val = self._text(f"{value:.2f} ms", self.COLOR_TEXT)
+            panel.blit(val, (col + half - pad - val.get_width(), row))
+        y += ((len(self.ROWS) + 1) // 2) * lh + pad
+
+        graph_rect = pygame.Rect(x, y, self.width - 2 * pad, self.GRAPH_HEIGHT_PX)
+        self._draw_graph(panel, graph_rect, timer.series(state, "total")[-self.GRAPH_FRAMES:], budget_ms)
+        y = graph_rect.bottom + pad
+
+        if dts:
+            jitter = percentile(sorted(abs(d - budget_ms) for d in dts), 0.95)
+            panel.blit(self._text(f"jitter dt (p95 odchylenia {jitter:.2f} ms)", self.COLOR_DIM), (x, y))
+        y += lh
+        hist_rect = pygame.Rect(x, y, self.width - 2 * pad, self.HIST_HEIGHT_PX - lh // 2)
+        self._draw_histogram(panel, hist_rect, dts, budget_ms)
+        self._dirty = True
+
+    def draw(self, dst, timer: PhaseTimer, state: str, now_ms: int, budget_ms: float):
+        if not self.visible:
+            return
+        if (
+            self._panel is None
+            or state != self._last_state
+            or self._last_refresh_ms is None
+            or now_ms - self._last_refresh_ms >= self.REFRESH_MS
+        ):
+            self._rebuild(timer, state, budget_ms)
+            self._last_refresh_ms = now_ms
+            self._last_state = state
+        if self._dirty and hasattr(dst, "forget"):
+            # backend tekstur trzyma teksturę tej powierzchni - treść się zmieniła
+            dst.forget(self._panel)
+        self._dirty = False
+        dst.blit(self._panel, (self.PAD_PX, self.PAD_PX))
+
+
+class TraceWriter:
+    """Zapis zdarzeń w formacie Chrome trace-event (JSON), do otwarcia w
+    chrome://tracing albo ui.perfetto.dev.
+
+    Wątek główny tylko dokłada słowniki do kolejki; serializacja i zapis idą
+    w osobnym wątku co FLUSH_INTERVAL_S. Czasy podaje się jako wartości
+    time.perf_counter() (sekundy), w pliku są mikrosekundy od startu."""
+
+    FLUSH_INTERVAL_S = 0.5
+    MAX_PENDING = 200_000
+
+    def __init__(self, path: str):
+        self.path = path
+        self._t0 = time.perf_counter()
+        self._pid = os.getpid()
+        self._tid = threading.get_ident()
+        self._pending: Deque[dict] = deque()
+        self._stop = threading.Event()
+        self._first = True
+        self.written = 0
+        self.dropped = 0
+
+        self._fh = open(path, "w", encoding="utf-8")
+        self._fh.write("[\n")
+        self._push({"name": "process_name", "ph": "M", "pid": self._pid, "tid": self._tid,
+                    "args": {"name": "Dino Runner"}})
+        self._push({"name": "thread_name", "ph": "M", "pid": self._pid, "tid": self._tid,
+                    "args": {"name": "main"}})
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def _us(self, t_s: float) -> float:
+        return round((t_s - self._t0) * 1e6, 1)
+
+    def _push(self, ev: dict):
+        if len(self._pending) >= self.MAX_PENDING:
+            self.dropped += 1
+            return
+        self._pending.append(ev)
+
+    # ---------- API ----------
+    def complete(self, name: str, cat: str, t0_s: float, dur_s: float, args: Optional[dict] = None):
+        ev = {"name": name, "cat": cat, "ph": "X", "ts": self._us(t0_s),
+              "dur": round(dur_s * 1e6, 1), "pid": self._pid, "tid": self._tid}
+        if args:
+            ev["args"] = args
+        self._push(ev)
+
+    def instant(self, name: str, cat: str, args: Optional[dict] = None, t_s: Optional[float] = None):
+        ev = {"name": name, "cat": cat, "ph": "i", "s": "g",
+              "ts": self._us(time.perf_counter() if t_s is None else t_s),
+              "pid": self._pid, "tid": self._tid}
+        if args:
+            ev["args"] = args
+        self._push(ev)
+
+    def counter(self, name: str, values: dict, t_s: Optional[float] = None):
+        self._push({"name": name, "ph": "C", "ts": self._us(time.perf_counter() if t_s is None else t_s),
+                    "pid": self._pid, "tid": self._tid, "args": values})
+
+    # ---------- zapis ----------
+    def _flush(self):
+        parts = []
+        while self._pending:
+            ev = self._pending.popleft()
+            parts.append(("" if self._first else ",\n") + json.dumps(ev, ensure_ascii=False, separators=(",", ":")))
+            self._first = False
+        if parts:
+            self._fh.write("".join(parts))
+            self._fh.flush()
+            self.written += len(parts)
+
+    def _run(self):
+        while not self._stop.wait(self.FLUSH_INTERVAL_S):
+            self._flush()
+
+    def close(self):
+        """Zatrzymuje wątek, dopisuje resztę zdarzeń i domyka tablicę JSON."""
+        if self._fh is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._flush()
+        self._fh.write("\n]\n")
+        self._fh.close()
+        self._fh = None
+
+
+class StackSampler:
+    """Próbkujący profiler wątku głównego: co INTERVAL_S zapamiętuje jego stos
+    (sys._current_frames). Próbka to krotka (code, lineno) - bez formatowania
+    napisów, więc koszt jest na tyle mały, że sampler może działać zawsze.
+
+    paused=True (np. gdy gra śpi w event.wait) wstrzymuje zbieranie."""
+
+    INTERVAL_S = 0.005
+    HISTORY_S = 2.0
+    MAX_DEPTH = 48
+
+    def __init__(self, interval_s: float = INTERVAL_S):
+        self.interval_s = float(interval_s)
+        self._target = threading.main_thread().ident
+        self._samples: Deque[Tuple[float, tuple]] = deque(maxlen=int(self.HISTORY_S / self.interval_s) + 1)
+        self._stop = threading.Event()
+        self.paused = False
+        self.taken = 0
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        get_frames = sys._current_frames
+        while not self._stop.wait(self.interval_s):
+            if self.paused:
+                continue
+            frame = get_frames().get(self._target)
+            stack = []
+            depth = 0
+            while frame is not None and depth < self.MAX_DEPTH:
+                stack.append((frame.f_code, frame.f_lineno))
+                frame = frame.f_back
+                depth += 1
+            self._samples.append((time.perf_counter(), tuple(stack)))
+            self.taken += 1
+
+    def samples_between(self, t0: float, t1: float) -> List[Tuple[float, tuple]]:
+        return [s for s in list(self._samples) if t0 <= s[0] <= t1]
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    @staticmethod
+    def format_stack(stack: tuple) -> List[str]:
+        """Od najbardziej zewnętrznej ramki do najgłębszej."""
+        return [f"{os.path.basename(code.co_filename)}:{lineno} {code.co_name}" for code, lineno in reversed(stack)]
+
+
+class HitchRecorder:
+    """Czarna skrzynka klatek: gdy praca klatki przekroczy factor * budżet,
+    zapisuje do folderu JSON z próbkami stosu z tej klatki i migawką stanu gry.
+
+    Zapisy są limitowane (odstęp MIN_INTERVAL_S, najwyżej MAX_DUMPS na sesję,
+    w folderze zostaje KEEP_FILES najnowszych) i idą w osobnym wątku."""
+
+    MIN_INTERVAL_S = 5.0
+    MAX_DUMPS = 20
+    KEEP_FILES = 20
+    TOP_FUNCTIONS = 15
+
+    def __init__(self, sampler: StackSampler, folder: str, factor: float = 2.5):
+        self.sampler = sampler
+        self.folder = folder
+        self.factor = float(factor)
+        self.hitches = 0
+        self.dumps = 0
+        self._last_dump_t: Optional[float] = None
+
+    def check(self, frame_t0: float, frame_t1: float, budget_ms: float, snapshot_fn) -> bool:
+        """Wywoływane na końcu klatki. snapshot_fn() jest wołane tylko przy zaciągnięciu."""
+        frame_ms = (frame_t1 - frame_t0) * 1000.0
+        if frame_ms <= budget_ms * self.factor:
+            return False
+        self.hitches += 1
+        if self.dumps >= self.MAX_DUMPS:
+            return True
+        if self._last_dump_t is not None and frame_t1 - self._last_dump_t < self.MIN_INTERVAL_S:
+            return True
+        self._last_dump_t = frame_t1
+        self.dumps += 1
+
+        samples = self.sampler.samples_between(frame_t0, frame_t1)
+        snapshot = snapshot_fn()
+        threading.Thread(
+            target=self._write,
+            args=(frame_t0, frame_ms, budget_ms, samples, snapshot),
+            name="hitch-dump",
+            daemon=True,
+        ).start()
+        return True
+
+    def _write(self, frame_t0: float, frame_ms: float, budget_ms: float, samples, snapshot: dict):
+        collapsed: Dict[str, int] = {}
+        leaf: Dict[str, int] = {}
+        stacks = []
+        for t, stack in samples:
+            lines = StackSampler.format_stack(stack)
+            key = ";".join(lines)
+            collapsed[key] = collapsed.get(key, 0) + 1
+            if lines:
+                leaf[lines[-1]] = leaf.get(lines[-1], 0) + 1
+            stacks.append({"t_ms": round((t - frame_t0) * 1000.0, 2), "stack": lines})
+
+        report = {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "frame_ms": round(frame_ms, 2),
+            "budget_ms": round(budget_ms, 2),
+            "sample_interval_ms": self.sampler.interval_s * 1000.0,
+            "samples": len(samples),
+            "snapshot": snapshot,
+            "top": sorted(leaf.items(), key=lambda kv: -kv[1])[:self.TOP_FUNCTIONS],
+            "collapsed": collapsed,
+            "stacks": stacks,
+        }
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            name = time.strftime("hitch_%Y%m%d_%H%M%S") + f"_{self.dumps:02d}.json"
+            path = os.path.join(self.folder, name)
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(report, fh, ensure_ascii=False, indent=1)
+            old = sorted(f for f in os.listdir(self.folder) if f.startswith("hitch_") and f.endswith(".json"))
+            for f in old[:-self.KEEP_FILES]:
+                os.remove(os.path.join(self.folder, f))
+        except OSError:
+            pass
+
+
+class StateProfiler:
+    """cProfile włączany na żądanie, osobny profil dla każdego stanu gry.
+
+    switch(stan) na początku klatki przełącza aktywny profil (None = żaden,
+    np. na czas czekania w trybie bezczynności). stop() zapisuje dla każdego
+    stanu plik .pstats i plik .collapsed (format "a;b;c mikrosekundy" dla
+    flamegraph.pl / speedscope), odtworzony z grafu wywołań pstats."""
+
+    COLLAPSED_MAX_DEPTH = 64
+    COLLAPSED_MIN_S = 0.00001
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.active = False
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._current: Optional[cProfile.Profile] = None
+        self._started = ""
+
+    def start(self, state: Optional[str] = None):
+        if self.active:
+            return
+        self.active = True
+        self._profiles = {}
+        self._started = time.strftime("%Y%m%d_%H%M%S")
+        self.switch(state)
+
+    def switch(self, state: Optional[str]):
+        if not self.active:
+            return
+        prof = None
+        if state is not None:
+            prof = self._profiles.get(state)
+            if prof is None:
+                prof = cProfile.Profile()
+                self._profiles[state] = prof
+        if prof is self._current:
+            return
+        if self._current is not None:
+            self._current.disable()
+        self._current = prof
+        if prof is not None:
+            prof.enable()
+
+    def stop(self) -> List[str]:
+        """Kończy profilowanie i zapisuje raporty; zwraca ścieżki zapisanych plików."""
+        if not self.active:
+            return []
+        self.switch(None)
+        self.active = False
+        os.makedirs(self.folder, exist_ok=True)
+        written = []
+        for state, prof in self._profiles.items():
+            base = os.path.join(self.folder, f"profile_{self._started}_{state}")
+            try:
+                stats = pstats.Stats(prof)
+            except TypeError:
+                continue    # profil bez żadnego wywołania
+            stats.dump_stats(base + ".pstats")
+            with open(base + ".collapsed", "w", encoding="utf-8") as fh:
+                for stack, us in self._collapsed(stats, state):
+                    fh.write(f"{stack} {us}\n")
+            written += [base + ".pstats", base + ".collapsed"]
+        self._profiles = {}
+        return written
+
+    @staticmethod
+    def _label(func) -> str:
+        filename, lineno, name = func
+        if filename == "~":
+            return name      # funkcje wbudowane: "<built-in method ...>"
+        return f"{name} ({os.path.basename(filename)}:{lineno})"
+
+    def _collapsed(self, stats: pstats.Stats, root_label: str):
+        """Przybliżone stosy z grafu caller->callee: czas własny funkcji dzielony
+        proporcjonalnie do udziału krawędzi w jej czasie łącznym."""
+        entries = stats.stats
+        callees: Dict[tuple, Dict[tuple, float]] = {}
+        for func, (_cc, _nc, _tt, _ct, callers) in entries.items():
+            for caller, edge in callers.items():
+                callees.setdefault(caller, {})[func] = edge[3]
+        roots = [f for f, e in entries.items() if not e[4] or all(c not in entries for c in e[4])]
+
+        out: Dict[str, int] = {}
+
+        def walk(func, path, factor):
+            if len(path) >= self.COLLAPSED_MAX_DEPTH:
+                return
+            _cc, _nc, tt, ct, _callers = entries[func]
+            path = path + [self._label(func)]
+            us = int(tt * factor * 1e6)
+            if us > 0:
+                key = ";".join(path)
+                out[key] = out.get(key, 0) + us
+            visited.add(func)
+            for callee, edge_ct in callees.get(func, {}).items():
+                if callee in visited or callee not in entries:
+                    continue
+                callee_ct = entries[callee][3]
+                # gałęzie poniżej COLLAPSED_MIN_S pomijamy - inaczej liczba ścieżek rośnie wykładniczo
+                if callee_ct > 0 and edge_ct * factor >= self.COLLAPSED_MIN_S:
+                    walk(callee, path, factor * min(1.0, edge_ct / callee_ct))
+            visited.discard(func)
+
+        visited = set()
+        for root in roots:
+            walk(root, [root_label], 1.0)
+        return sorted(out.items())
+
+
+# =====================
+# PAMIĘĆ: powierzchnie, maski, tracemalloc
+# =====================
+def surface_bytes(surf: pygame.Surface) -> int:
+    """Bajty pikseli (pitch * wysokość - z wyrównaniem wierszy)."""
+    return surf.get_pitch() * surf.get_height()
+
+
+def mask_bytes(mask: pygame.mask.Mask) -> int:
+    """Maska pygame to bity w słowach maszynowych, wiersz po wierszu."""
+    w, h = mask.get_size()
+    return ((w + 63) // 64) * 8 * h
+
+
+def _walk_memory(obj, seen: set, acc: dict, depth: int = 0):
+    if obj is None or depth > 8:
+        return
+    oid = id(obj)
+    if oid in seen:
+        return
+    if isinstance(obj, pygame.Surface):
+        seen.add(oid)
+        acc["surfaces"] += 1
+        acc["surface_bytes"] += surface_bytes(obj)
+    elif isinstance(obj, pygame.mask.Mask):
+        seen.add(oid)
+        acc["masks"] += 1
+        acc["mask_bytes"] += mask_bytes(obj)
+    elif isinstance(obj, dict):
+        seen.add(oid)
+        for v in obj.values():
+            _walk_memory(v, seen, acc, depth + 1)
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        seen.add(oid)
+        for v in obj:
+            _walk_memory(v, seen, acc, depth + 1)
+    elif hasattr(obj, "__dataclass_fields__"):
+        seen.add(oid)
+        for name in obj.__dataclass_fields__:
+            _walk_memory(getattr(obj, name, None), seen, acc, depth + 1)
+
+
+def memory_report(families: Dict[str, object]) -> List[dict]:
+    """Sumuje powierzchnie i maski w każdej rodzinie (zagnieżdżone dict/list/
+    dataclass). Obiekt współdzielony liczy się tylko w pierwszej rodzinie."""
+    seen: set = set()
+    rows = []
+    for name, obj in families.items():
+        acc = {"family": name, "surfaces": 0, "surface_bytes": 0, "masks": 0, "mask_bytes": 0}
+        _walk_memory(obj, seen, acc)
+        rows.append(acc)
+    return rows
+
+
+def format_memory_report(rows: List[dict], sep: Optional[str] = None) -> str:
+    """Tabela tekstowa; sep="\t" zamiast wyrównania spacjami (dla TextPanelOverlay)."""
+    widths = (22, 6, 9, 7, 8)
+
+    def line(cells):
+        if sep is not None:
+            return sep.join(cells)
+        return cells[0].ljust(widths[0]) + "".join(c.rjust(w) for c, w in zip(cells[1:], widths[1:]))
+
+    lines = [line(["rodzina", "pow.", "MB", "maski", "MB"])]
+    tot = [0, 0, 0, 0]
+    for r in rows:
+        vals = (r["surfaces"], r["surface_bytes"], r["masks"], r["mask_bytes"])
+        lines.append(line([r["family"], str(vals[0]), f"{vals[1] / 1048576:.2f}", str(vals[2]), f"{vals[3] / 1048576:.2f}"]))
+        tot = [a + b for a, b in zip(tot, vals)]
+    lines.append(line(["RAZEM", str(tot[0]), f"{tot[1] / 1048576:.2f}", str(tot[2]), f"{tot[3] / 1048576:.2f}"]))
+    return "\n".join(lines)
+
+
+class PyHeapTracker:
+    """tracemalloc (opt-in - spowalnia alokacje): migawka na granicy sesji
+    i różnica względem poprzedniej, czyli przyrost pamięci Pythona między sesjami."""
+
+    TOP = 10
+
+    def __init__(self, frames: int = 1):
+        tracemalloc.start(frames)
+        self._prev: Optional[tracemalloc.Snapshot] = None
+        self.sessions = 0
+
+    def checkpoint(self) -> List[str]:
+        """Robi migawkę; zwraca TOP linii z największym przyrostem od poprzedniej."""
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        prev, self._prev = self._prev, snap
+        self.sessions += 1
+        if prev is None:
+            return []
+        out = []
+        for stat in snap.compare_to(prev, "lineno")[:self.TOP]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            out.append(
+                f"{os.path.basename(frame.filename)}:{frame.lineno} "
+                f"+{stat.size_diff / 1024:.1f} KiB ({stat.count_diff:+d} bloków)"
+            )
+        return out
+
+    def current_mb(self) -> float:
+        return tracemalloc.get_traced_memory()[0] / 1048576
+
+
+class TextPanelOverlay:
+    """Prosta nakładka tekstowa (np. raport pamięci), odświeżana co refresh_ms
+    do jednej buforowanej powierzchni. Komórki rozdzielone "\t" są układane
+    w kolumny (pierwsza do lewej, reszta do prawej)."""
+
+    PAD_PX = 8
+    COLOR_BG = (10, 12, 16, 185)
+    COLOR_TEXT = (225, 230, 235)
+
+    def __init__(self, font: pygame.font.Font, refresh_ms: int = 2000):
+        self.font = font
+        self.refresh_ms = int(refresh_ms)
+        self.visible = False
+        self._panel: Optional[pygame.Surface] = None
+        self._last_refresh_ms: Optional[int] = None
+        self._dirty = False
+
+    def toggle(self):
+        self.visible = not self.visible
+        self._last_refresh_ms = None
+
+    def _rebuild(self, text: str):
+        rows = [[self.font.render(c, True, self.COLOR_TEXT) for c in line.split("\t")] for line in text.splitlines()]
+        gap = self.PAD_PX * 2
+        col_w: List[int] = []
+        for cells in rows:
+            if len(cells) == 1:
+                continue
+            for i, c in enumerate(cells):
+                if i >= len(col_w):
+                    col_w.append(0)
+                col_w[i] = max(col_w[i], c.get_width())
+        table_w = sum(col_w) + gap * max(0, len(col_w) - 1)
+        lh = self.font.get_linesize()
+        w = max([table_w] + [cells[0].get_width() for cells in rows if len(cells) == 1]) + 2 * self.PAD_PX
+        h = lh * len(rows) + 2 * self.PAD_PX
+        if self._panel is None or self._panel.get_size() != (w, h):
+            self._panel = pygame.Surface((w, h), pygame.SRCALPHA)
+        self._panel.fill(self.COLOR_BG)
+        for r, cells in enumerate(rows):
+            y = self.PAD_PX + r * lh
+            if len(cells) == 1:
+                self._panel.blit(cells[0], (self.PAD_PX, y))
+                continue
+            x = self.PAD_PX
+            for i, c in enumerate(cells):
+                cx = x if i == 0 else x + col_w[i] - c.get_width()
+                self._panel.blit(c, (cx, y))
+                x += col_w[i] + gap
+        self._dirty = True
+
+    def draw(self, dst, text_fn, now_ms: int):
+        if not self.visible:
+            return
+        if self._panel is None or self._last_refresh_ms is None or now_ms - self._last_refresh_ms >= self.refresh_ms:
+            self._rebuild(text_fn())
+            self._last_refresh_ms = now_ms
+        if self._dirty and hasattr(dst, "forget"):
+            dst.forget(self._panel)
+        self._dirty = False
+        dst.blit(self._panel, (dst.get_width() - self._panel.get_width() - self.PAD_PX, self.PAD_PX))
+
+
+# =====================
+# AUDYT BLITÓW
+# =====================
+class BlitAuditor:
+    """Zbiera blity na audytowaną powierzchnię docelową (AuditedSurface),
+    pogrupowane po miejscu wywołania (plik:linia funkcja):
+
+    - format: źródło w innym formacie pikseli niż cel -> SDL konwertuje przy każdym blicie,
+    - alpha_opaque: źródło z kanałem alfa (SRCALPHA), ale w pełni nieprzezroczyste
+      -> wystarczy convert() i zwykłe kopiowanie,
+    - rle: colorkey albo rzadki sprite z alfą (>= 35% przezroczystych pikseli)
+      bez RLEACCEL -> kandydat na RLE,
+    - bajty: objętość pikseli zapisanych do celu (średnio na klatkę)."""
+
+    SOURCE_CACHE_MAX_ITEMS = 2048
+    RLE_MIN_TRANSPARENT = 0.35
+
+    def __init__(self):
+        self.frames = 0
+        self.sites: Dict[tuple, dict] = {}
+        self._sources: Dict[int, Tuple[pygame.Surface, dict]] = {}
+        self._frame_bytes = 0
+        self.max_frame_bytes = 0
+
+    def _source_info(self, src: pygame.Surface, dst: pygame.Surface) -> dict:
+        entry = self._sources.get(id(src))
+        if entry is not None and entry[0] is src:
+            return entry[1]
+        if len(self._sources) >= self.SOURCE_CACHE_MAX_ITEMS:
+            self._sources.clear()
+        flags = src.get_flags()
+        # alfa per-piksel = maska kanału A; samo set_alpha() też ustawia SRCALPHA we flagach
+        has_alpha = src.get_masks()[3] != 0
+        opaque = False
+        sparse = False
+        if has_alpha:
+            w, h = src.get_size()
+            opaque = w * h > 0 and pygame.mask.from_surface(src, 254).count() == w * h
+            # dużo w pełni przezroczystych pikseli - RLE pomija je całymi seriami
+            sparse = w * h > 0 and pygame.mask.from_surface(src, 0).count() <= w * h * (1.0 - self.RLE_MIN_TRANSPARENT)
+        info = {
+            # ARGB -> XRGB z tym samym układem RGB ma szybką ścieżkę w SDL; inny układ / głębia - nie
+            "format": (src.get_bytesize(), src.get_masks()[:3]) != (dst.get_bytesize(), dst.get_masks()[:3]),
+            "alpha_opaque": opaque,
+            "rle": (src.get_colorkey() is not None or sparse) and not flags & pygame.RLEACCEL,
+        }
+        self._sources[id(src)] = (src, info)
+        return info
+
+    def record(self, dst: pygame.Surface, src: pygame.Surface, rect: pygame.Rect, frame):
+        code = frame.f_code
+        site = (os.path.basename(code.co_filename), frame.f_lineno, code.co_name)
+        stat = self.sites.get(site)
+        if stat is None:
+            stat = {"blits": 0, "bytes": 0, "format": 0, "alpha_opaque": 0, "rle": 0, "sizes": set()}
+            self.sites[site] = stat
+        info = self._source_info(src, dst)
+        nbytes = rect.width * rect.height * dst.get_bytesize()
+        stat["blits"] += 1
+        stat["bytes"] += nbytes
+        for key in ("format", "alpha_opaque", "rle"):
+            if info[key]:
+                stat[key] += 1
+        if len(stat["sizes"]) < 8:
+            stat["sizes"].add(src.get_size())
+        self._frame_bytes += nbytes
+
+    def end_frame(self):
+        self.frames += 1
+        self.max_frame_bytes = max(self.max_frame_bytes, self._frame_bytes)
+        self._frame_bytes = 0
+
+    def report(self, top: int = 25) -> str:
+        frames = max(1, self.frames)
+        rows = sorted(self.sites.items(), key=lambda kv: -kv[1]["bytes"])
+        total = sum(s["bytes"] for _site, s in rows)
+        lines = [
+            f"audyt blitów: {self.frames} klatek, średnio {total / frames / 1048576:.2f} MB/klatkę, "
+            f"maks {self.max_frame_bytes / 1048576:.2f} MB",
+            f"{'miejsce':<48}{'blit/kl.':>9}{'KB/kl.':>9}  problemy",
+        ]
+        for (fname, lineno, func), s in rows[:top]:
+            issues = []
+            if s["format"]:
+                issues.append(f"format x{s['format']}")
+            if s["alpha_opaque"]:
+                issues.append(f"alfa-na-nieprzezroczystym x{s['alpha_opaque']}")
+            if s["rle"]:
+                issues.append(f"RLE? x{s['rle']}")
+            site = f"{fname}:{lineno} {func}"
+            lines.append(
+                f"{site[:47]:<48}{s['blits'] / frames:>9.2f}{s['bytes'] / frames / 1024:>9.1f}  "
+                + (", ".join(issues) or "-")
+            )
+        return "\n".join(lines)
+
+
+class AuditedSurface(pygame.Surface):
+    """Powierzchnia docelowa, która zgłasza każdy blit do BlitAuditor."""
+
+    auditor: Optional[BlitAuditor] = None
+
+    def blit(self, source, dest, area=None, special_flags=0):
+        rect = super().blit(source, dest, area, special_flags)
+        if self.auditor is not None:
+            self.auditor.record(self, source, rect, sys._getframe(1))
+        return rect
+
+    def blits(self, blit_sequence, doreturn=1):
+        seq = list(blit_sequence)
+        rects = super().blits(seq, 1)
+        if self.auditor is not None:
+            caller = sys._getframe(1)
+            for item, rect in zip(seq, rects):
+                self.auditor.record(self, item[0], rect, caller)
+        return rects if doreturn else None
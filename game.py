@@ -5,9 +5,56 @@ import platform
 import math
 import os
 import json
+import time
+import logging
+import gc
+import struct
 from typing import Optional
 
-from render import ObstacleManager
+from render import SurfacePool
+from sim import BG_SWITCH_EVERY_MS, DINO_PATH, PIX_DEN, RunSim, build_dino, make_obstacles
+from storage import BackgroundWriter, SettingsStore
+from history import HISTORY_FILENAME, RunHistory, RunRecord
+from telemetry import TELEMETRY_FOLDER_NAME, Telemetry
+from replay import (
+    OUTCOME_ABANDONED, OUTCOME_COLLISION, OUTCOME_NAMES, REPLAY_FOLDER_NAME, ReplayError, ReplayFile, ReplayRecorder,
+)
+from perf import FramePacer, GcController, IncrementalLoader, PhaseTimer, QualityGovernor
+from autotune import (
+    BLIT_STRATEGIES, TUNING_FILENAME, TUNING_VERSION,
+    bench_smoothscale, bench_strategies, bench_vsync, hardware_fingerprint, load_tuning, pick_fastest, save_tuning,
+)
+from diag import (
+    AuditedSurface, BlitAuditor, HitchRecorder, PerfOverlay, PyHeapTracker, StackSampler, StateProfiler, TextPanelOverlay, TraceWriter,
+    format_memory_report, memory_report,
+)
+
+# początek startu - od niego liczony czas do pierwszej klatki (TTFF)
+startup_t0 = time.perf_counter()
+
+# Log diagnostyczny: DINO_LOG=INFO (albo DEBUG) wypisuje komunikaty na stderr
+log = logging.getLogger("dino_runner")
+if os.environ.get("DINO_LOG"):
+    try:
+        logging.basicConfig(level=os.environ["DINO_LOG"].upper(), format="[%(name)s] %(message)s")
+    except ValueError:
+        logging.basicConfig(level=logging.INFO, format="[%(name)s] %(message)s")
+
+# Ślad Chrome/Perfetto: DINO_TRACE=plik.json (fazy klatek, przejścia stanów, ładowanie, cache)
+tracer = None
+if os.environ.get("DINO_TRACE"):
+    try:
+        tracer = TraceWriter(os.environ["DINO_TRACE"])
+    except OSError as e:
+        log.warning("nie można otworzyć pliku śladu %s: %s", os.environ["DINO_TRACE"], e)
+
+# GC: zamrożenie obiektów ze startu, odsunięte gen2 w rozgrywce, kolekcje w pauzie /
+# końcu gry / ekranach przejściowych; DINO_GC=0 zostawia domyślne zachowanie (tylko pomiar)
+gc_controller = GcController(manage=os.environ.get("DINO_GC", "1") != "0")
+gc_controller.tracer = tracer
+
+# tracemalloc (opt-in, spowalnia alokacje): DINO_TRACEMALLOC=1, przyrost między sesjami gry
+py_heap = PyHeapTracker() if os.environ.get("DINO_TRACEMALLOC") == "1" else None
 
 # Lepsza inicjalizacja audio (mniejsze opóźnienie skoku)
 try:
@@ -17,15 +64,6 @@ except Exception:
 
 pygame.init()
 
-# Lepsza jakość skalowania (jeśli backend dostępny)
-try:
-    pygame.transform.set_smoothscale_backend("SSE2")
-except Exception:
-    try:
-        pygame.transform.set_smoothscale_backend("GENERIC")
-    except Exception:
-        pass
-
 # =====================
 # USTAWIENIA
 # =====================
@@ -33,6 +71,8 @@ TOP_PADDING = 10
 LOCK_WINDOW_POS = True
 
 INTRO_DURATION_MS = 5000
+# zasoby doładowywane w trakcie intro: tyle ms na klatkę (pojedynczy krok i tak kończy się w całości)
+STARTUP_SLICE_MS = 12
 
 FADE_INTRO_TO_MENU_MS = 1200
 FADE_MENU_TO_LOAD_MS = 900
@@ -48,6 +88,12 @@ FADE_MENU_TO_SETTINGS_MS = 650
 FADE_SETTINGS_TO_MENU_MS = 450
 
 TARGET_FPS_NO_VSYNC = 90
+
+# Backend rysowania rozgrywki: "surface" (Surface + display.flip),
+# "texture" (SDL2 Renderer/Texture) albo "texture-software" (Renderer SDL bez GPU)
+RENDER_BACKEND = os.environ.get("DINO_RENDER_BACKEND", "surface").lower()
+# Ile wolnych pełnoekranowych powierzchni trzyma pula (przechwycenia, fade, snapshoty)
+FRAME_POOL_MAX_FREE = 4
 ESC_EXIT_PRESS_COUNT = 3
 ESC_EXIT_PRESS_WINDOW_MS = 1200
 
@@ -57,70 +103,80 @@ ESC_EXIT_PRESS_WINDOW_MS = 1200
 CURSOR_PATH = "assets/cursor/cursor.png"
 CURSOR_HOTSPOT_RAW = (0, 0)
 
+# "auto": kolorowy kursor SDL (rysowany przez system, bez opóźnienia klatki),
+# a gdy się nie uda - programowy blit na końcu klatki; "software": zawsze blit
+CURSOR_MODE = os.environ.get("DINO_CURSOR_MODE", "auto").lower()
+CURSOR_CALIBRATION_BLITS = 64
+
 CURSOR_TARGET_H_PX = None
 CURSOR_TARGET_H_FRAC = 0.06
 CURSOR_MIN_H_PX = 18
 CURSOR_MAX_H_PX = 64
 
+# Zasady biegu (prędkość, levele, fizyka dino, podłoże, kolizje) są w sim.py
+
 # =====================
-# TŁA PO ŁADOWANIU (bg1->bg6)
+# WEWNĘTRZNA ROZDZIELCZOŚĆ ROZGRYWKI
+# Scena (tło, przeszkody, dino) w STATE_BG renderowana do mniejszego bufora
+# i raz na klatkę skalowana do okna; HUD zawsze w natywnej rozdzielczości.
 # =====================
-BG_SWITCH_EVERY_MS = 20000
-
-# Bazowa prędkość gry (scroll + przeszkody)
-BG_SCROLL_PX_PER_SEC = 230.0
-
-MAX_DT_MS_FOR_SCROLL = 40
+RENDER_SCALE_DEFAULT = 1.0
+RENDER_SCALE_MIN = 0.5
 
 # =====================
-# LEVEL SPEED
-# Speed per level: +15%, cap 2.50x.
+# ADAPTACYJNA JAKOŚĆ (governor czasu klatki)
+# Poziomy: 1 = przeszkody bez highlight/rim, 2 = tańsze fade,
+# 3+ = kolejne skale wewnętrznej rozdzielczości sceny.
 # =====================
-# Co level (czyli co zmianę tła) przyspieszamy o +4.2%, max do 1.40x.
-LEVEL_SPEED_INCREASE = 0.15
-LEVEL_SPEED_CAP_MULT = 2.50
+ADAPTIVE_QUALITY = os.environ.get("DINO_ADAPTIVE_QUALITY", "1") != "0"
+QUALITY_RENDER_SCALES = [0.85, 0.70, 0.50]
+DISPLAY_REFRESH_HZ_DEFAULT = 60
 
 # =====================
-# DINO - PARAMETRY
+# TRYB BEZCZYNNOŚCI (statyczne ekrany: intro, menu, ustawienia, pauza, wyjście)
+# Gdy nic się nie animuje, pętla czeka na zdarzenie zamiast rysować w pełnym tempie.
 # =====================
-DINO_PATH = "assets/skin/dino.png"
+IDLE_MODE = os.environ.get("DINO_IDLE", "1") != "0"
+IDLE_WAIT_MAX_MS = 250          # i tak budzimy się co tyle (pilnowanie pozycji okna itp.)
+IDLE_ANIM_EPS = 0.002           # animacja wykładnicza bliżej celu = stoi
 
-GROUND_Y_FRAC_BY_BG = [
-    0.86,  # bg1
-    0.86,  # bg2
-    0.90,  # bg3
-    0.86,  # bg4
-    0.90,  # bg5
-    0.86,  # bg6
-    0.86,  # bg7
-    0.906, # bg8
-]
+# =====================
+# NAKŁADKA WYDAJNOŚCI (F3): czasy faz pętli per stan, wykres, percentyle, jitter
+# =====================
+PERF_HUD = os.environ.get("DINO_PERF_HUD", "0") == "1"
+PERF_HUD_KEY = pygame.K_F3
 
-GROUND_Y_PX_OFFSET_BY_BG = [
-    0,      # bg1
-    0,      # bg2
-    -16,    # bg3
-    +5,     # bg4
-    -16,    # bg5
-    0,      # bg6
-    0,      # bg7
-    0,      # bg8
-]
+# =====================
+# CZARNA SKRZYNKA ZACIĘĆ: próbkowanie stosu wątku głównego w tle; klatka dłuższa
+# niż HITCH_FACTOR * budżet -> JSON z próbkami i stanem gry w <folder ustawień>/hitches
+# =====================
+HITCH_RECORDER = os.environ.get("DINO_HITCH", "1") != "0"
+HITCH_FACTOR = 2.5
+HITCH_FOLDER_NAME = "hitches"
 
-DINO_X_FRAC = 0.18
+# =====================
+# RAPORT PAMIĘCI: F4 = nakładka, `python game.py --memory-report` = wypisz po starcie i wyjdź
+# =====================
+MEMORY_OVERLAY_KEY = pygame.K_F4
+MEMORY_REPORT_ARG = "--memory-report"
 
-# Dino mniejsze
-DINO_HEIGHT_FRAC = 0.125
+# =====================
+# POWTÓRKI: każdy bieg (seed + dt i skoki klatek) do <folder ustawień>/replays;
+# `python game.py --replay PLIK` odtwarza nagranie w oknie (strzałki: przewijanie)
+# =====================
+REPLAYS = os.environ.get("DINO_REPLAYS", "1") != "0"
+REPLAY_ARG = "--replay"
+REPLAY_SEEK_STEP_MS = 5000
 
-# Skok ~3% dalej
-DINO_GRAVITY_PX_PER_S2 = 2800.0 / 1.03
-DINO_JUMP_VEL_PX_PER_S = 1120.0
+# =====================
+# HISTORIA BIEGÓW: <folder ustawień>/history.db (SQLite), ranking na ekranie końca gry
+# =====================
+HISTORY = os.environ.get("DINO_HISTORY", "1") != "0"
 
 # =====================
-# KOLIZJE - maska
+# TELEMETRIA: zdarzenia sesji (stany, levele, śmierci, czasy klatek) do <folder ustawień>/telemetry/*.jsonl.gz
 # =====================
-MASK_ALPHA_THRESHOLD = 50     # ignoruje bardzo "miękkie" piksele na krawędziach
-MIN_OVERLAP_PIXELS = 4        # minimalna liczba pikseli overlap aby uznać kolizję
+TELEMETRY = os.environ.get("DINO_TELEMETRY", "1") != "0"
 
 # =====================
 # DŹWIĘK SKOKU
@@ -144,6 +200,9 @@ jump_key_mode = "space"
 # >>> USTAWIENIA: odliczanie do nastepnego tla (domyslnie WL.)
 bg_timer_enabled = True
 
+# >>> USTAWIENIA: skala wewnętrznej rozdzielczości sceny (1.0 = natywna)
+render_scale = RENDER_SCALE_DEFAULT
+
 def current_jump_key() -> int:
     if jump_key_mode == "up":
         return pygame.K_UP
@@ -175,8 +234,41 @@ def _get_settings_path():
     path = os.path.join(folder, SETTINGS_FILENAME)
     return folder, path
 
+# =====================
+# PROFILOWANIE (cProfile) - F9 start/stop albo DINO_PROFILE=1 od startu (ładowanie = "startup").
+# Osobny profil dla każdego stanu; .pstats + .collapsed w <folder ustawień>/profiles
+# =====================
+PROFILE_KEY = pygame.K_F9
+PROFILE_FOLDER_NAME = "profiles"
+state_profiler = StateProfiler(os.path.join(_get_settings_path()[0], PROFILE_FOLDER_NAME))
+if os.environ.get("DINO_PROFILE") == "1":
+    state_profiler.start("startup")
+
+# =====================
+# AUTOTUNING: backend smoothscale, strategia blitów przeszkód, vsync czy własne tempo.
+# Mierzone przy pierwszym starcie (i po zmianie sprzętu), wynik w tuning.json obok setting.json.
+# DINO_AUTOTUNE=0 - bez pomiaru (wartości domyślne), DINO_AUTOTUNE=force - zmierz od nowa.
+# =====================
+AUTOTUNE_MODE = os.environ.get("DINO_AUTOTUNE", "1")
+tuning_path = os.path.join(_get_settings_path()[0], TUNING_FILENAME)
+hardware_id = hardware_fingerprint()
+tuning = load_tuning(tuning_path, hardware_id) if AUTOTUNE_MODE == "1" else None
+autotune_pending = AUTOTUNE_MODE in ("1", "force") and tuning is None
+
+def apply_smoothscale_backend(preferred: Optional[str] = None) -> Optional[str]:
+    """Lepsza jakość skalowania: zmierzony zwycięzca, potem SSE2, potem GENERIC."""
+    for backend in ([preferred] if preferred else []) + ["SSE2", "GENERIC"]:
+        try:
+            pygame.transform.set_smoothscale_backend(backend)
+            return backend
+        except Exception:
+            continue
+    return None
+
+apply_smoothscale_backend((tuning or {}).get("smoothscale"))
+
 def load_user_settings():
-    global jump_sound_enabled, jump_key_mode, bg_timer_enabled
+    global jump_sound_enabled, jump_key_mode, bg_timer_enabled, render_scale
     folder, path = _get_settings_path()
     try:
         os.makedirs(folder, exist_ok=True)
@@ -194,6 +286,12 @@ def load_user_settings():
             if "bg_timer_enabled" in data:
                 bg_timer_enabled = bool(data["bg_timer_enabled"])
 
+            if "render_scale" in data:
+                try:
+                    render_scale = max(RENDER_SCALE_MIN, min(1.0, float(data["render_scale"])))
+                except (TypeError, ValueError):
+                    pass
+
             if "jump_key" in data:
                 v = str(data["jump_key"]).lower().strip()
                 if v in ("space", "up", "w"):
@@ -205,24 +303,16 @@ def load_user_settings():
         # uszkodzony plik / brak uprawnień: zostaw domyślne
         pass
 
-def save_user_settings():
-    folder, path = _get_settings_path()
-    try:
-        os.makedirs(folder, exist_ok=True)
-    except Exception:
-        return
+# zapis w tle (scalanie zmian, plik tymczasowy + os.replace) - pętla gry nie czeka na dysk
+settings_store = SettingsStore(_get_settings_path()[1])
 
-    data = {
+def save_user_settings():
+    settings_store.save({
         "jump_sound_enabled": bool(jump_sound_enabled),
         "bg_timer_enabled": bool(bg_timer_enabled),
+        "render_scale": float(render_scale),
         "jump_key": str(jump_key_mode),
-    }
-
-    try:
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
+    })
 
 # wczytaj na starcie
 load_user_settings()
@@ -269,6 +359,12 @@ OVERLAY_OPTIONS_MAX_HEIGHT_FRAC = 0.26
 OVERLAY_OPTION_START_SIZE_FRAC = 0.07
 OVERLAY_OPTION_MIN_SIZE_PX = 22
 
+LEADERBOARD_GAP_FRAC = 0.04
+LEADERBOARD_MAX_SIZE_FRAC = 0.036
+LEADERBOARD_MIN_SIZE_PX = 14
+LEADERBOARD_SPACING_FRAC = 0.18
+LEADERBOARD_OUTLINE_PX = 2
+
 # =====================
 # USTAWIENIA: design (piękny "glass" UI)
 # =====================
@@ -306,7 +402,23 @@ BAR_OFFSET_X = -12
 # POMOCNICZE FUNKCJE
 # =====================
 def load_raw(path: str) -> pygame.Surface:
-    return pygame.image.load(path)
+    if tracer is None:
+        return pygame.image.load(path)
+    t0 = time.perf_counter()
+    img = pygame.image.load(path)
+    tracer.complete(os.path.basename(path), "asset", t0, time.perf_counter() - t0, {"path": path})
+    return img
+
+def png_size(path: str):
+    """(szerokość, wysokość) z nagłówka IHDR pliku PNG - bez dekodowania obrazu."""
+    try:
+        with open(path, "rb") as fh:
+            head = fh.read(24)
+    except OSError:
+        return None
+    if len(head) < 24 or head[:8] != b"\x89PNG\r\n\x1a\n" or head[12:16] != b"IHDR":
+        return None
+    return struct.unpack(">II", head[16:24])
 
 def convert_best(img: pygame.Surface) -> pygame.Surface:
     """Konwersja do formatu ekranu z zachowaniem kanału alfa (jeśli występuje)."""
@@ -367,8 +479,16 @@ def _set_window_position_win32(x: int, y: int) -> bool:
     except Exception:
         return False
 
+def _get_window_position():
+    if texture_backend is not None:
+        return texture_backend.get_position()
+    return pygame.display.get_window_position()
+
 def _set_window_position_safe(x: int, y: int) -> bool:
     try:
+        if texture_backend is not None:
+            texture_backend.set_position(x, y)
+            return True
         pygame.display.set_window_position(int(x), int(y))
         return True
     except Exception:
@@ -412,11 +532,83 @@ def render_text_styled(font: pygame.font.Font, text: str,
     out.blit(base, (outline_px, outline_px))
     return out
 
+_font_cache = {}
+
+def get_font(size: int) -> pygame.font.Font:
+    """Font(FONT_PATH, size) - jeden obiekt na rozmiar."""
+    font = _font_cache.get(size)
+    if font is None:
+        font = pygame.font.Font(FONT_PATH, size)
+        _font_cache[size] = font
+    return font
+
+def styled_text_size(font: pygame.font.Font, text: str, outline_px: int, shadow_offset=(0, 0)):
+    """Rozmiar wyniku render_text_styled z samych metryk fontu (bez renderowania)."""
+    w, h = font.size(text)
+    return w + outline_px * 2 + abs(shadow_offset[0]), h + outline_px * 2 + abs(shadow_offset[1])
+
+def fit_font_size(labels, min_size: int, max_size: int, spacing_frac: float,
+                  max_w: int, max_h: int, outline_px: int, shadow_offset=(0, 0)) -> int:
+    """Największy rozmiar z [min_size, max_size], przy którym kolumna etykiet (z odstępem
+    spacing_frac * rozmiar) mieści się w max_w x max_h; gdy żaden - min_size.
+    Wyszukiwanie binarne po font.size(), etykiety renderuje dopiero wywołujący."""
+    def fits(size: int) -> bool:
+        font = get_font(size)
+        dims = [styled_text_size(font, txt, outline_px, shadow_offset) for txt in labels]
+        total_h = sum(h for _w, h in dims) + int(size * spacing_frac) * (len(dims) - 1)
+        return max((w for w, _h in dims), default=0) <= max_w and total_h <= max_h
+
+    lo, hi = min_size, max(min_size, max_size)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+# =====================
+# WIDGETY - cache gotowych powierzchni
+# =====================
+WIDGET_ANIM_STEPS = 24
+WIDGET_CACHE_MAX_ITEMS = 512
+
+# klucz: (widget, rozmiar, hovered, selected, kwantyzowane t, styl) -> Surface
+_widget_cache = {}
+
+def quantize_anim_t(t: float) -> int:
+    return int(round(clamp(t, 0.0, 1.0) * WIDGET_ANIM_STEPS))
+
+def get_widget_surface(widget: str, size, build, hovered: bool = False, selected: bool = False,
+                       anim_q: int = 0, style=None) -> pygame.Surface:
+    """Zwraca gotową powierzchnię widżetu; `build` wołany tylko przy pierwszym użyciu danego stanu."""
+    key = (widget, (int(size[0]), int(size[1])), bool(hovered), bool(selected), int(anim_q), style)
+    surf = _widget_cache.get(key)
+    if surf is None:
+        if len(_widget_cache) >= WIDGET_CACHE_MAX_ITEMS:
+            _widget_cache.clear()
+        surf = build()
+        _widget_cache[key] = surf
+    return surf
+
+def _build_rounded_rect_surface(size, color_rgba, radius: int, width: int = 0) -> pygame.Surface:
+    tmp = pygame.Surface((max(1, int(size[0])), max(1, int(size[1]))), pygame.SRCALPHA)
+    pygame.draw.rect(tmp, color_rgba, tmp.get_rect(), width=width, border_radius=radius)
+    return tmp
+
+def rounded_rect_surface(size, color_rgba, radius: int, width: int = 0) -> pygame.Surface:
+    color_rgba = tuple(color_rgba)
+    return get_widget_surface(
+        "rounded_rect", size,
+        lambda: _build_rounded_rect_surface(size, color_rgba, radius, width),
+        style=(color_rgba, int(radius), int(width)),
+    )
+
 # =====================
 # HUD / Pause / Game over helpers
 # =====================
 def _build_option_surfaces(labels, font_size: int):
-    font = pygame.font.Font(FONT_PATH, font_size)
+    font = get_font(font_size)
     surfs_normal = [
         render_text_styled(
             font, txt,
@@ -441,19 +633,20 @@ def _build_option_surfaces(labels, font_size: int):
     ]
 
     spacing = int(font_size * OVERLAY_OPTIONS_SPACING_FRAC)
-    total_h = sum(s.get_height() for s in surfs_normal) + spacing * (len(surfs_normal) - 1)
-    max_w = max(s.get_width() for s in surfs_normal) if surfs_normal else 0
-    return surfs_normal, surfs_hover, spacing, total_h, max_w
+    return surfs_normal, surfs_hover, spacing
 
 def _fit_option_surfaces(labels):
-    start_size = max(30, int(HEIGHT * OVERLAY_OPTION_START_SIZE_FRAC))
-    font_size = start_size
-    while font_size > OVERLAY_OPTION_MIN_SIZE_PX:
-        surfs_normal, surfs_hover, spacing, total_h, max_w = _build_option_surfaces(labels, font_size)
-        if max_w <= int(WIDTH * OVERLAY_OPTIONS_MAX_WIDTH_FRAC) and total_h <= int(HEIGHT * OVERLAY_OPTIONS_MAX_HEIGHT_FRAC):
-            break
-        font_size -= 2
-    return surfs_normal, surfs_hover, spacing
+    font_size = fit_font_size(
+        labels,
+        min_size=OVERLAY_OPTION_MIN_SIZE_PX,
+        max_size=max(30, int(HEIGHT * OVERLAY_OPTION_START_SIZE_FRAC)),
+        spacing_frac=OVERLAY_OPTIONS_SPACING_FRAC,
+        max_w=int(WIDTH * OVERLAY_OPTIONS_MAX_WIDTH_FRAC),
+        max_h=int(HEIGHT * OVERLAY_OPTIONS_MAX_HEIGHT_FRAC),
+        outline_px=MENU_OUTLINE_PX,
+        shadow_offset=MENU_SHADOW_OFFSET,
+    )
+    return _build_option_surfaces(labels, font_size)
 
 def build_overlay_cache(title_text: str, option_labels):
     title_surf = render_text_styled(
@@ -540,14 +733,71 @@ def draw_overlay_menu_animated(dst: pygame.Surface, cache: dict, mouse_pos, dt_m
 
     return hovered
 
-def draw_pause_button(dst: pygame.Surface, hovered: bool):
-    rect = pause_button_rect
+# ranking pod opcjami końca gry; przebudowa tylko gdy zmienią się wiersze
+_leaderboard_key = None
+_leaderboard_surf = None
+
+def _build_leaderboard(records, current) -> pygame.Surface:
+    lines = [("NAJLEPSZE BIEGI", False)]
+    for i, r in enumerate(records, 1):
+        lines.append((f"{i}. {r.time_ms / 1000.0:.1f} s   LVL {r.level}", r == current))
+    if current is not None and current not in records:
+        lines.append((f"TEN BIEG: {current.time_ms / 1000.0:.1f} s   LVL {current.level}", True))
+
+    top = game_over_menu_cache["option_rects"][-1].bottom + int(HEIGHT * LEADERBOARD_GAP_FRAC)
+    labels = [text for text, _hl in lines]
+    font_size = fit_font_size(
+        labels,
+        min_size=LEADERBOARD_MIN_SIZE_PX,
+        max_size=max(LEADERBOARD_MIN_SIZE_PX, int(HEIGHT * LEADERBOARD_MAX_SIZE_FRAC)),
+        spacing_frac=LEADERBOARD_SPACING_FRAC,
+        max_w=int(WIDTH * OVERLAY_OPTIONS_MAX_WIDTH_FRAC),
+        max_h=HEIGHT - HUD_MARGIN_PX - top,
+        outline_px=LEADERBOARD_OUTLINE_PX,
+    )
+    font = get_font(font_size)
+    surfs = [
+        render_text_styled(
+            font, text,
+            fill=MENU_HOVER_FILL if highlight else MENU_TEXT_FILL,
+            outline=MENU_TEXT_OUTLINE,
+            outline_px=LEADERBOARD_OUTLINE_PX,
+        )
+        for text, highlight in lines
+    ]
+    spacing = int(font_size * LEADERBOARD_SPACING_FRAC)
+    w = max(s.get_width() for s in surfs)
+    h = sum(s.get_height() for s in surfs) + spacing * (len(surfs) - 1)
+    panel = pygame.Surface((w, h), pygame.SRCALPHA)
+    y = 0
+    for s in surfs:
+        panel.blit(s, s.get_rect(centerx=w // 2, top=y))
+        y += s.get_height() + spacing
+    return panel
+
+def draw_leaderboard(dst: pygame.Surface):
+    """Najlepsze biegi z migawki RunHistory (bez zapytań do bazy w klatce)."""
+    global _leaderboard_key, _leaderboard_surf
+    if run_history is None:
+        return
+    records = run_history.leaderboard()
+    key = (tuple(records), last_run_record)
+    if key != _leaderboard_key:
+        _leaderboard_key = key
+        _leaderboard_surf = _build_leaderboard(records, last_run_record) if records else None
+    if _leaderboard_surf is not None:
+        top = game_over_menu_cache["option_rects"][-1].bottom + int(HEIGHT * LEADERBOARD_GAP_FRAC)
+        dst.blit(_leaderboard_surf, _leaderboard_surf.get_rect(centerx=WIDTH // 2, top=top))
+
+def _build_pause_button(size, hovered: bool) -> pygame.Surface:
+    surf = pygame.Surface(size, pygame.SRCALPHA)
+    rect = surf.get_rect()
     cx, cy = rect.center
     radius = rect.width // 2
 
     fill = PAUSE_BTN_FILL_HOVER if hovered else PAUSE_BTN_FILL
-    pygame.draw.circle(dst, fill, (cx, cy), radius)
-    pygame.draw.circle(dst, PAUSE_BTN_OUTLINE, (cx, cy), radius, width=2)
+    pygame.draw.circle(surf, fill, (cx, cy), radius)
+    pygame.draw.circle(surf, PAUSE_BTN_OUTLINE, (cx, cy), radius, width=2)
 
     bar_w = max(4, int(radius * 0.28))
     bar_h = max(12, int(radius * 1.2))
@@ -557,82 +807,207 @@ def draw_pause_button(dst: pygame.Surface, hovered: bool):
     right_x = cx + gap // 2
 
     pygame.draw.rect(
-        dst, PAUSE_BTN_ICON,
+        surf, PAUSE_BTN_ICON,
         pygame.Rect(left_x, bar_y, bar_w, bar_h),
         border_radius=max(1, bar_w // 2)
     )
     pygame.draw.rect(
-        dst, PAUSE_BTN_ICON,
+        surf, PAUSE_BTN_ICON,
         pygame.Rect(right_x, bar_y, bar_w, bar_h),
         border_radius=max(1, bar_w // 2)
     )
+    return surf
 
-timer_cache_seconds = None
-timer_cache_surf = None
+def draw_pause_button(dst: pygame.Surface, hovered: bool):
+    rect = pause_button_rect
+    surf = get_widget_surface(
+        "pause_button", rect.size,
+        lambda: _build_pause_button(rect.size, hovered),
+        hovered=hovered,
+    )
+    dst.blit(surf, rect.topleft)
+
+# =====================
+# HUD: atlas cyfr (szybkie liczniki)
+# =====================
+NUMBER_ATLAS_CHARSET = "0123456789:.,-+/%s "
+
+def build_number_atlas(font: pygame.font.Font, fill, outline, outline_px: int,
+                       shadow=None, shadow_offset=(0, 0), charset: str = NUMBER_ATLAS_CHARSET) -> dict:
+    """Jednorazowo renderuje stylizowane znaki do dwóch atlasów: tło (cień + obrys) i wypełnienie."""
+    backs = {}
+    fills = {}
+    advances = {}
+    for ch in dict.fromkeys(charset):
+        advances[ch] = font.size(ch)[0]
+        if ch.isspace():
+            continue
+        # obrys renderowany "wypełnieniem" w kolorze obrysu = sama warstwa tła
+        backs[ch] = render_text_styled(
+            font, ch,
+            fill=outline,
+            outline=outline,
+            outline_px=outline_px,
+            shadow=shadow,
+            shadow_offset=shadow_offset
+        )
+        fills[ch] = font.render(ch, True, fill).convert_alpha()
+
+    cell_h = max([s.get_height() for s in backs.values()] or [1])
+    back_w = sum(s.get_width() for s in backs.values())
+    fill_w = sum(s.get_width() for s in fills.values())
+    back_atlas = pygame.Surface((max(1, back_w), cell_h), pygame.SRCALPHA)
+    fill_atlas = pygame.Surface((max(1, fill_w), cell_h), pygame.SRCALPHA)
+
+    back_rects = {}
+    fill_rects = {}
+    bx = 0
+    fx = 0
+    for ch, surf in backs.items():
+        back_atlas.blit(surf, (bx, 0))
+        back_rects[ch] = pygame.Rect(bx, 0, surf.get_width(), surf.get_height())
+        bx += surf.get_width()
+
+        fsurf = fills[ch]
+        fill_atlas.blit(fsurf, (fx, 0))
+        fill_rects[ch] = pygame.Rect(fx, 0, fsurf.get_width(), fsurf.get_height())
+        fx += fsurf.get_width()
+
+    return {
+        "back_atlas": back_atlas,
+        "fill_atlas": fill_atlas,
+        "back_rects": back_rects,
+        "fill_rects": fill_rects,
+        "advances": advances,
+        "outline_px": int(outline_px),
+        "height": cell_h,
+    }
 
-def draw_bg_timer(dst: pygame.Surface, now_ms: int):
-    global timer_cache_seconds, timer_cache_surf
+def measure_number_text(atlas: dict, text: str) -> int:
+    adv = atlas["advances"]
+    return sum(adv.get(ch, 0) for ch in text) + atlas["outline_px"] * 2
+
+def draw_number_text(dst: pygame.Surface, atlas: dict, text: str, topleft) -> int:
+    """Rysuje tekst z atlasu (ta sama geometria co render_text_styled). Zwraca szerokość."""
+    x0, y0 = int(topleft[0]), int(topleft[1])
+    op = atlas["outline_px"]
+    adv = atlas["advances"]
+    back_rects = atlas["back_rects"]
+    fill_rects = atlas["fill_rects"]
+    back_atlas = atlas["back_atlas"]
+    fill_atlas = atlas["fill_atlas"]
+
+    back_blits = []
+    fill_blits = []
+    pen = 0
+    for ch in text:
+        r = back_rects.get(ch)
+        if r is not None:
+            back_blits.append((back_atlas, (x0 + pen, y0), r))
+            fill_blits.append((fill_atlas, (x0 + pen + op, y0 + op), fill_rects[ch]))
+        pen += adv.get(ch, 0)
+
+    # najpierw wszystkie obrysy, potem wypełnienia - obrys kolejnej cyfry nie zachodzi na poprzednią
+    if back_blits:
+        dst.blits(back_blits, doreturn=False)
+        dst.blits(fill_blits, doreturn=False)
+    return pen + op * 2
+
+timer_prefix_surf = None
+timer_prefix_advance = 0
+timer_number_atlas = None
+
+def draw_bg_timer(dst: pygame.Surface):
+    global timer_prefix_surf, timer_prefix_advance, timer_number_atlas
     if not bg_timer_enabled:
         return
-    if bg_switch_start_ms is None:
-        remaining_ms = BG_SWITCH_EVERY_MS
-    else:
-        remaining_ms = max(0, BG_SWITCH_EVERY_MS - (now_ms - bg_switch_start_ms))
+    remaining_ms = max(0, BG_SWITCH_EVERY_MS - (run.time_ms - run.bg_switch_start_ms))
 
     seconds_left = int(math.ceil(remaining_ms / 1000.0))
-    if seconds_left != timer_cache_seconds or timer_cache_surf is None:
-        timer_cache_seconds = seconds_left
-        label = f"TLO ZA: {seconds_left}s"
-        timer_cache_surf = render_text_styled(
-            font_hud, label,
+    if timer_number_atlas is None:
+        prefix = "TLO ZA: "
+        style = dict(
             fill=MENU_TEXT_FILL,
             outline=MENU_TEXT_OUTLINE,
             outline_px=4,
             shadow=MENU_TEXT_SHADOW,
             shadow_offset=(3, 3)
         )
-
-    dst.blit(timer_cache_surf, (HUD_MARGIN_PX, HUD_MARGIN_PX))
+        timer_prefix_surf = render_text_styled(font_hud, prefix, **style)
+        timer_prefix_advance = font_hud.size(prefix)[0]
+        timer_number_atlas = build_number_atlas(font_hud, **style)
+
+    dst.blit(timer_prefix_surf, (HUD_MARGIN_PX, HUD_MARGIN_PX))
+    draw_number_text(
+        dst, timer_number_atlas, f"{seconds_left}s",
+        (HUD_MARGIN_PX + timer_prefix_advance, HUD_MARGIN_PX)
+    )
 
 def draw_game_world(dst: pygame.Surface):
-    bg_scroll_x = int(bg_scroll_num // PIX_DEN)
-    draw_scrolling_bg(dst, bg_sequence[bg_index], bg_scroll_x)
+    bg_scroll_x = int(run.bg_scroll_num // PIX_DEN)
+    draw_scrolling_bg(dst, bg_sequence[run.bg_index], bg_scroll_x)
     obstacles.draw(dst)
-    dx, dy = dino_draw_pos()
-    dst.blit(dino_img, (dx, dy))
+    dst.blit(dino.img, run.dino_draw_pos())
+
+# bufor sceny w wewnętrznej rozdzielczości + tła/dino przygotowane w tej skali
+_scene_buffer = None
+_scene_scaled_assets = {}
+
+def _scene_buffer_for_scale(scale: float) -> pygame.Surface:
+    global _scene_buffer
+    size = (max(1, int(WIDTH * scale)), max(1, int(HEIGHT * scale)))
+    if _scene_buffer is None or _scene_buffer.get_size() != size:
+        _scene_buffer = pygame.Surface(size).convert()
+        _scene_scaled_assets.clear()
+    return _scene_buffer
+
+def _scene_asset(surf: pygame.Surface, size) -> pygame.Surface:
+    key = (id(surf), size)
+    entry = _scene_scaled_assets.get(key)
+    if entry is None:
+        entry = (surf, convert_best(pygame.transform.smoothscale(surf, size)))
+        _scene_scaled_assets[key] = entry
+    return entry[1]
+
+def draw_game_world_scaled(dst: pygame.Surface):
+    """draw_game_world w rozdzielczości render_scale (lub niższej z governora), skalowane raz do dst."""
+    scale = min(render_scale, quality_render_scale)
+    if scale >= 0.999 or dst is texture_backend:
+        draw_game_world(dst)
+        return
+
+    buf = _scene_buffer_for_scale(scale)
+    bw, bh = buf.get_size()
+    sx = bw / float(WIDTH)
+
+    bg = _scene_asset(bg_sequence[run.bg_index], (bw, bh))
+    bg_scroll_x = int(run.bg_scroll_num // PIX_DEN)
+    draw_scrolling_bg(buf, bg, int(bg_scroll_x * sx) % bw)
+    obstacles.draw(buf, scale=sx)
+
+    dino_size = (max(1, int(round(dino.img.get_width() * sx))), max(1, int(round(dino.img.get_height() * sx))))
+    dx, dy = run.dino_draw_pos()
+    buf.blit(_scene_asset(dino.img, dino_size), (int(dx * sx), int(dy * sx)))
+
+    pygame.transform.scale(buf, dst.get_size(), dst)
 
-def capture_game_frame(now_ms: int, include_hud: bool = True) -> pygame.Surface:
-    frame = pygame.Surface((WIDTH, HEIGHT)).convert()
+def capture_game_frame(include_hud: bool = True) -> pygame.Surface:
+    """Klatka z puli - wołający oddaje ją przez frame_pool.release()."""
+    frame = frame_pool.acquire()
     draw_game_world(frame)
     if include_hud:
-        draw_bg_timer(frame, now_ms)
+        draw_bg_timer(frame)
         draw_pause_button(frame, hovered=False)
     return frame
 
 def make_countdown_base_frame(bg_idx: int = 0) -> pygame.Surface:
     frame = make_scrolling_bg_frame(bg_sequence[bg_idx], 0)
-    gy = get_ground_y_for_bg(bg_idx)
-    dx = int(dino_x - dino_img.get_width() // 2)
-    dy = int(gy - dino_img.get_height())
-    frame.blit(dino_img, (dx, dy))
+    gy = run.ground_y(bg_idx)
+    dx = int(run.dino_x - dino.img.get_width() // 2)
+    dy = int(gy - dino.img.get_height())
+    frame.blit(dino.img, (dx, dy))
     return frame
 
-def resume_from_pause(now_ms: int):
-    global pause_started_ms, bg_switch_start_ms
-    if pause_started_ms is None:
-        return
-
-    pause_ms = max(0, now_ms - pause_started_ms)
-    if bg_switch_start_ms is not None:
-        bg_switch_start_ms += pause_ms
-
-    try:
-        obstacles.next_spawn_ms += pause_ms
-    except Exception:
-        pass
-
-    pause_started_ms = None
-
 def reset_exit_confirm_presses():
     global esc_exit_press_count, esc_exit_last_press_ms
     esc_exit_press_count = 0
@@ -655,7 +1030,9 @@ def enter_exit_confirm(now_ms: int):
     if state == STATE_EXIT_CONFIRM:
         return
     exit_confirm_prev_state = state
-    exit_confirm_frame = screen.copy()
+    frame_pool.release(exit_confirm_frame)
+    exit_confirm_frame = frame_pool.acquire()
+    exit_confirm_frame.blit(screen, (0, 0))
     exit_confirm_started_ms = now_ms
     state = STATE_EXIT_CONFIRM
 
@@ -684,6 +1061,7 @@ def resume_from_exit_confirm(now_ms: int):
     state = prev_state
     exit_confirm_prev_state = None
     exit_confirm_started_ms = None
+    frame_pool.release(exit_confirm_frame)
     exit_confirm_frame = None
     reset_exit_confirm_presses()
 
@@ -710,33 +1088,61 @@ def load_scale_cursor(path: str, win_h: int):
     hy = int(hy_raw * scale)
     return surf, (hx, hy)
 
-def union_rects(rects):
-    if not rects:
+def install_hardware_cursor(surf: pygame.Surface, hotspot) -> bool:
+    """Ustawia przeskalowany kursor jako kolorowy kursor SDL. False = zostaje blit programowy."""
+    try:
+        hx = clamp(int(hotspot[0]), 0, surf.get_width() - 1)
+        hy = clamp(int(hotspot[1]), 0, surf.get_height() - 1)
+        pygame.mouse.set_cursor(pygame.cursors.Cursor((hx, hy), surf))
+        return True
+    except Exception:
+        return False
+
+def measure_cursor_blit_ms(dst: pygame.Surface, surf: Optional[pygame.Surface]) -> Optional[float]:
+    """Średni koszt jednego programowego blitu kursora (to, co oszczędza tryb sprzętowy)."""
+    if surf is None:
         return None
-    u = rects[0].copy()
-    for r in rects[1:]:
-        u.union_ip(r)
-    return u
+    t0 = time.perf_counter()
+    for i in range(CURSOR_CALIBRATION_BLITS):
+        dst.blit(surf, (i % 7, i % 5))
+    return (time.perf_counter() - t0) * 1000.0 / CURSOR_CALIBRATION_BLITS
+
+def cursor_report() -> str:
+    frames = max(1, cursor_stats["frames"])
+    blit_ms = cursor_stats["blit_ms_total"] / frames
+    if cursor_stats["mode"] == "hardware" and cursor_stats["calibrated_blit_ms"] is not None:
+        blit_ms = cursor_stats["calibrated_blit_ms"]
+    latency_ms = cursor_stats["sample_to_flip_ms_total"] / frames
+    if cursor_stats["mode"] == "hardware":
+        verdict = "zaoszczędzone przez kursor sprzętowy"
+    else:
+        verdict = "koszt kursora programowego"
+    return (
+        f"kursor: tryb={cursor_stats['mode']}, blit {blit_ms:.3f} ms/klatkę, "
+        f"próbka myszy -> flip {latency_ms:.2f} ms ({verdict}), klatek={cursor_stats['frames']}"
+    )
 
 # =====================
 # USTAWIENIA - UI helpers
 # =====================
 def _draw_rounded_rect_alpha(dst: pygame.Surface, rect: pygame.Rect, color_rgba, radius: int):
-    tmp = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-    pygame.draw.rect(tmp, color_rgba, tmp.get_rect(), border_radius=radius)
-    dst.blit(tmp, rect.topleft)
+    dst.blit(rounded_rect_surface(rect.size, color_rgba, radius), rect.topleft)
 
 def draw_glass_panel(dst: pygame.Surface, rect: pygame.Rect, radius: int = 18,
                      fill_rgba=(16, 18, 24, 165), stroke_rgba=(255, 255, 255, 38), stroke_w: int = 2):
     _draw_rounded_rect_alpha(dst, rect, fill_rgba, radius)
-    tmp = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-    pygame.draw.rect(tmp, stroke_rgba, tmp.get_rect(), width=stroke_w, border_radius=radius)
-    dst.blit(tmp, rect.topleft)
+    dst.blit(rounded_rect_surface(rect.size, stroke_rgba, radius, width=stroke_w), rect.topleft)
 
-def draw_divider(dst: pygame.Surface, x1: int, x2: int, y: int, rgba=(255, 255, 255, 40)):
-    tmp = pygame.Surface((max(1, x2 - x1), 2), pygame.SRCALPHA)
+def _build_divider(width: int, rgba) -> pygame.Surface:
+    tmp = pygame.Surface((width, 2), pygame.SRCALPHA)
     tmp.fill(rgba)
-    dst.blit(tmp, (x1, y))
+    return tmp
+
+def draw_divider(dst: pygame.Surface, x1: int, x2: int, y: int, rgba=(255, 255, 255, 40)):
+    width = max(1, x2 - x1)
+    rgba = tuple(rgba)
+    surf = get_widget_surface("divider", (width, 2), lambda: _build_divider(width, rgba), style=rgba)
+    dst.blit(surf, (x1, y))
 
 # =====================
 # PASEK ŁADOWANIA - FUNKCJE
@@ -752,6 +1158,13 @@ def _bar_rect(screen: pygame.Surface) -> pygame.Rect:
     r.center = (cx + BAR_OFFSET_X, cy)
     return r
 
+def _build_progress_track(size, radius: int) -> pygame.Surface:
+    bar = pygame.Surface(size, pygame.SRCALPHA)
+    # Tor: bardzo lekki "glass"
+    pygame.draw.rect(bar, (255, 255, 255, 22), bar.get_rect(), border_radius=radius)
+    pygame.draw.rect(bar, (255, 255, 255, 60), bar.get_rect(), width=2, border_radius=radius)
+    return bar
+
 def draw_progress_bar(screen: pygame.Surface, progress: float, now_ms: int,
                       track_rect: Optional[pygame.Rect] = None):
     """Półprzezroczysty pasek ładowania: tło przezroczyste, delikatny obrys, zielone wypełnienie."""
@@ -768,40 +1181,47 @@ def draw_progress_bar(screen: pygame.Surface, progress: float, now_ms: int,
 
     progress = max(0.0, min(1.0, float(progress)))
     radius = track_rect.height // 2
+    size = track_rect.size
 
     # Delikatny cień (też półprzezroczysty)
-    shadow = pygame.Surface((track_rect.width, track_rect.height), pygame.SRCALPHA)
-    pygame.draw.rect(shadow, (0, 0, 0, 70), shadow.get_rect(), border_radius=radius)
-    screen.blit(shadow, (track_rect.left + 2, track_rect.top + 2))
+    screen.blit(rounded_rect_surface(size, (0, 0, 0, 70), radius), (track_rect.left + 2, track_rect.top + 2))
 
     # Właściwy pasek (alpha overlay)
-    bar = pygame.Surface((track_rect.width, track_rect.height), pygame.SRCALPHA)
-
-    # Tor: bardzo lekki "glass"
-    pygame.draw.rect(bar, (255, 255, 255, 22), bar.get_rect(), border_radius=radius)
-    pygame.draw.rect(bar, (255, 255, 255, 60), bar.get_rect(), width=2, border_radius=radius)
+    track = get_widget_surface("progress_track", size, lambda: _build_progress_track(size, radius))
+    screen.blit(track, track_rect.topleft)
 
     pad = 5
-    inner = pygame.Rect(pad, pad, track_rect.width - pad * 2, track_rect.height - pad * 2)
+    inner = pygame.Rect(track_rect.left + pad, track_rect.top + pad, track_rect.width - pad * 2, track_rect.height - pad * 2)
     if inner.width <= 2 or inner.height <= 2:
-        screen.blit(bar, track_rect.topleft)
         return
 
     fill_w = int(inner.width * progress)
-    if fill_w > 0:
-        fill_rect = inner.copy()
-        fill_rect.width = fill_w
-        fill_radius = min(inner.height // 2, max(0, fill_w // 2))
-        pygame.draw.rect(bar, (44, 220, 140, 180), fill_rect, border_radius=fill_radius)
+    if fill_w <= 0:
+        return
 
-    screen.blit(bar, track_rect.topleft)
+    fill_color = (44, 220, 140, 180)
+    full_radius = inner.height // 2
+    if fill_w < full_radius * 2:
+        fill_radius = max(0, fill_w // 2)
+        screen.blit(rounded_rect_surface((fill_w, inner.height), fill_color, fill_radius), inner.topleft)
+        return
+
+    # Pełne wypełnienie z cache: lewa część + prawy zaokrąglony koniec (bez nowych Surface co klatkę)
+    full = rounded_rect_surface(inner.size, fill_color, full_radius)
+    body_w = fill_w - full_radius
+    screen.blit(full, inner.topleft, pygame.Rect(0, 0, body_w, inner.height))
+    screen.blit(
+        full, (inner.left + body_w, inner.top),
+        pygame.Rect(inner.width - full_radius, 0, full_radius, inner.height)
+    )
 
 # =====================
 # SCROLL TŁA - FUNKCJE
 # =====================
 def make_scrolling_bg_frame(bg: pygame.Surface, offset_px: int) -> pygame.Surface:
+    """Klatka z puli - wołający oddaje ją przez frame_pool.release()."""
     w, h = bg.get_size()
-    out = pygame.Surface((w, h)).convert()
+    out = frame_pool.acquire()
     x = -offset_px
     out.blit(bg, (x, 0))
     out.blit(bg, (x + w, 0))
@@ -816,24 +1236,75 @@ def draw_scrolling_bg(screen: pygame.Surface, bg: pygame.Surface, offset_px: int
 # =====================
 # ROZMIAR OKNA Z TŁA
 # =====================
-bg1_raw = load_raw("assets/game_bg/bg1.png")
-WIDTH, HEIGHT = bg1_raw.get_size()
+BG1_PATH = "assets/game_bg/bg1.png"
+WIDTH, HEIGHT = png_size(BG1_PATH) or load_raw(BG1_PATH).get_size()
 
 # =====================
 # OKNO (bez ramki) + próba VSYNC + DOUBLEBUF
 # =====================
 flags = pygame.NOFRAME | pygame.DOUBLEBUF
 vsync_enabled = False
-try:
-    screen = pygame.display.set_mode((WIDTH, HEIGHT), flags, vsync=1)
-    vsync_enabled = True
-except TypeError:
-    screen = pygame.display.set_mode((WIDTH, HEIGHT), flags)
-except Exception:
+texture_backend = None
+# autotuner mógł stwierdzić, że vsync na tym sprzęcie nie działa - wtedy od razu własne tempo
+want_vsync = (tuning or {}).get("pacing", "vsync") == "vsync"
+
+if RENDER_BACKEND in ("texture", "texture-software"):
+    try:
+        from texture_backend import TextureBackend
+
+        # ukryty tryb wideo tylko po to, żeby convert()/convert_alpha() znały format pikseli
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        texture_backend = TextureBackend(
+            (WIDTH, HEIGHT), "Dino Runner",
+            vsync=want_vsync,
+            software=(RENDER_BACKEND == "texture-software"),
+        )
+        # menu / fade / overlay nadal rysujemy programowo do tej klatki
+        screen = pygame.Surface((WIDTH, HEIGHT)).convert()
+        vsync_enabled = want_vsync
+    except Exception as e:
+        log.warning("backend tekstur niedostępny (%s) - zostaje Surface", e)
+        texture_backend = None
+
+if texture_backend is None and not want_vsync:
     screen = pygame.display.set_mode((WIDTH, HEIGHT), flags)
+elif texture_backend is None:
+    try:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT), flags, vsync=1)
+        vsync_enabled = True
+    except TypeError:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT), flags)
+    except Exception:
+        screen = pygame.display.set_mode((WIDTH, HEIGHT), flags)
 
 pygame.display.set_caption("Dino Runner")
-clock = pygame.time.Clock()
+
+# audyt blitów (DINO_BLIT_AUDIT=1): rysujemy do bufora AuditedSurface w formacie ekranu,
+# który przed flip jest kopiowany na ekran; raport miejsc wywołań w logu przy wyjściu
+display_surface = screen
+blit_auditor = None
+if os.environ.get("DINO_BLIT_AUDIT") == "1":
+    blit_auditor = BlitAuditor()
+    screen = AuditedSurface((WIDTH, HEIGHT), 0, display_surface)
+    screen.auditor = blit_auditor
+
+# sleep + krótki spin zamiast tick_busy_loop; przy vsync tylko mierzy i pilnuje, czy vsync działa
+frame_pacer = FramePacer(TARGET_FPS_NO_VSYNC, vsync=vsync_enabled)
+
+# pula pełnoekranowych powierzchni (bez alokacji kilku MB przy każdej zmianie stanu)
+frame_pool = SurfacePool((WIDTH, HEIGHT), max_free=FRAME_POOL_MAX_FREE)
+
+def present_frame(frame_dst):
+    if blit_auditor is not None:
+        blit_auditor.end_frame()
+    if texture_backend is None:
+        if screen is not display_surface:
+            display_surface.blit(screen, (0, 0))
+        pygame.display.flip()
+        return
+    if frame_dst is not texture_backend:
+        texture_backend.present_surface(frame_dst)
+    texture_backend.present()
 
 # =====================
 # USTAW POZYCJĘ OKNA
@@ -859,161 +1330,179 @@ else:
 # =====================
 icon = pygame.image.load("assets/icon/icon.ico")
 pygame.display.set_icon(icon)
+if texture_backend is not None:
+    texture_backend.set_icon(icon)
 
 # =====================
-# CZCIONKI
+# INTRO - PIERWSZA KLATKA
+# Jedyne ładowanie przed pokazaniem okna; reszta zasobów (load_* niżej) wczytuje się
+# krokami w trakcie intro, a przejście do menu czeka, aż wszystko będzie gotowe.
 # =====================
-FONT_PATH = "assets/fonts/Bangers-Regular.ttf"
-font_big = pygame.font.Font(FONT_PATH, 64)
-font_small = pygame.font.Font(FONT_PATH, 32)
-font_hud = pygame.font.Font(FONT_PATH, max(22, int(HEIGHT * 0.040)))
-font_overlay_title = pygame.font.Font(FONT_PATH, max(56, int(HEIGHT * 0.115)))
-
-# Fonts dla ustawień (ładniejsze skalowanie)
-font_set_title = pygame.font.Font(FONT_PATH, max(72, int(HEIGHT * 0.12)))
-font_set_h1 = pygame.font.Font(FONT_PATH, max(48, int(HEIGHT * 0.075)))
-font_set_label = pygame.font.Font(FONT_PATH, max(30, int(HEIGHT * 0.045)))
-font_set_hint = pygame.font.Font(FONT_PATH, max(22, int(HEIGHT * 0.032)))
-
-font_countdown = pygame.font.Font(FONT_PATH, max(140, int(HEIGHT * 0.35)))
-countdown_outline_px = max(6, int(font_countdown.get_height() * 0.08))
-countdown_shadow_offset = (
-    max(4, int(countdown_outline_px * 0.6)),
-    max(4, int(countdown_outline_px * 0.6)),
-)
-countdown_surfs = {
-    i: render_text_styled(
-        font_countdown, str(i),
-        fill=MENU_HOVER_FILL,
-        outline=MENU_TEXT_OUTLINE,
-        outline_px=countdown_outline_px,
-        shadow=MENU_TEXT_SHADOW,
-        shadow_offset=countdown_shadow_offset
-    )
-    for i in range(COUNTDOWN_SECONDS, 0, -1)
-}
+intro_bg = scale_to_window(load_raw("assets/intro_screen/intro.png"), WIDTH, HEIGHT)
+screen.blit(intro_bg, (0, 0))
+present_frame(screen)
+
+startup_loader = IncrementalLoader(t0=startup_t0)
+startup_loader.tracer = tracer
+startup_loader.mark_first_frame()
+log.info("pierwsza klatka po %.0f ms", startup_loader.first_frame_ms)
+
+def advance_startup(budget_ms: float) -> bool:
+    """Porcja ładowania startowego (math.inf = wszystko od razu); True = gotowe."""
+    if startup_loader.done:
+        return True
+    if not startup_loader.run(budget_ms):
+        return False
+    log.info(startup_loader.report())
+    # wszystko ze startu (obrazy, cache, fonty) do generacji stałej - pełne kolekcje ich nie przeglądają
+    gc_controller.freeze_startup()
+    return True
 
 # =====================
-# GRAFIKI
+# CZCIONKI
 # =====================
-intro_bg = scale_to_window(load_raw("assets/intro_screen/intro.png"), WIDTH, HEIGHT)
-menu_bg = scale_to_window(load_raw("assets/menu/menu.png"), WIDTH, HEIGHT)
-load_level_bg = scale_to_window(load_raw("assets/load_level/load_level.png"), WIDTH, HEIGHT)
+FONT_PATH = "assets/fonts/Bangers-Regular.ttf"
 
-bg1 = scale_to_window(bg1_raw, WIDTH, HEIGHT)
-bg2 = scale_to_window(load_raw("assets/game_bg/bg2.png"), WIDTH, HEIGHT)
-bg3 = scale_to_window(load_raw("assets/game_bg/bg3.png"), WIDTH, HEIGHT)
-bg4 = scale_to_window(load_raw("assets/game_bg/bg4.png"), WIDTH, HEIGHT)
-bg5 = scale_to_window(load_raw("assets/game_bg/bg5.png"), WIDTH, HEIGHT)
-bg6 = scale_to_window(load_raw("assets/game_bg/bg6.png"), WIDTH, HEIGHT)
-bg7 = scale_to_window(load_raw("assets/game_bg/bg7.png"), WIDTH, HEIGHT)
-bg8 = scale_to_window(load_raw("assets/game_bg/bg8.png"), WIDTH, HEIGHT)
+def load_fonts():
+    global font_big, font_small, font_hud, font_overlay_title
+    global font_set_title, font_set_h1, font_set_label, font_set_hint
+    global font_countdown, countdown_outline_px, countdown_shadow_offset, countdown_surfs
+    font_big = pygame.font.Font(FONT_PATH, 64)
+    font_small = pygame.font.Font(FONT_PATH, 32)
+    font_hud = pygame.font.Font(FONT_PATH, max(22, int(HEIGHT * 0.040)))
+    font_overlay_title = pygame.font.Font(FONT_PATH, max(56, int(HEIGHT * 0.115)))
+
+    # Fonts dla ustawień (ładniejsze skalowanie)
+    font_set_title = pygame.font.Font(FONT_PATH, max(72, int(HEIGHT * 0.12)))
+    font_set_h1 = pygame.font.Font(FONT_PATH, max(48, int(HEIGHT * 0.075)))
+    font_set_label = pygame.font.Font(FONT_PATH, max(30, int(HEIGHT * 0.045)))
+    font_set_hint = pygame.font.Font(FONT_PATH, max(22, int(HEIGHT * 0.032)))
+    yield "fonty"
+
+    font_countdown = pygame.font.Font(FONT_PATH, max(140, int(HEIGHT * 0.35)))
+    countdown_outline_px = max(6, int(font_countdown.get_height() * 0.08))
+    countdown_shadow_offset = (
+        max(4, int(countdown_outline_px * 0.6)),
+        max(4, int(countdown_outline_px * 0.6)),
+    )
+    countdown_surfs = {}
+    for i in range(COUNTDOWN_SECONDS, 0, -1):
+        countdown_surfs[i] = render_text_styled(
+            font_countdown, str(i),
+            fill=MENU_HOVER_FILL,
+            outline=MENU_TEXT_OUTLINE,
+            outline_px=countdown_outline_px,
+            shadow=MENU_TEXT_SHADOW,
+            shadow_offset=countdown_shadow_offset
+        )
+        yield "odliczanie"
 
-bg_sequence = [bg1, bg2, bg3, bg4, bg5, bg6, bg7, bg8]
+startup_loader.add(load_fonts())
 
 # =====================
 # WŁASNY KURSOR
 # =====================
 cursor_img = None
 cursor_hotspot = (0, 0)
-try:
-    cursor_img, cursor_hotspot = load_scale_cursor(CURSOR_PATH, HEIGHT)
-    pygame.mouse.set_visible(False)
-except Exception:
-    cursor_img = None
-    pygame.mouse.set_visible(True)
+cursor_hw_active = False
+
+# pomiar: koszt blitu kursora i czas od próbki pozycji myszy do flip()
+cursor_stats = {
+    "mode": "system",
+    "frames": 0,
+    "blit_ms_total": 0.0,
+    "sample_to_flip_ms_total": 0.0,
+    "calibrated_blit_ms": None,
+}
+
+def load_cursor():
+    global cursor_img, cursor_hotspot, cursor_hw_active
+    try:
+        cursor_img, cursor_hotspot = load_scale_cursor(CURSOR_PATH, HEIGHT)
+        if CURSOR_MODE != "software":
+            cursor_hw_active = install_hardware_cursor(cursor_img, cursor_hotspot)
+        pygame.mouse.set_visible(cursor_hw_active)
+    except Exception:
+        cursor_img = None
+        pygame.mouse.set_visible(True)
+    cursor_stats["mode"] = "hardware" if cursor_hw_active else ("software" if cursor_img is not None else "system")
+    if cursor_hw_active:
+        cursor_stats["calibrated_blit_ms"] = measure_cursor_blit_ms(screen, cursor_img)
+    yield "kursor"
+
+startup_loader.add(load_cursor())
+
+# =====================
+# GRAFIKI (intro_bg - wyżej, przed pierwszą klatką)
+# =====================
+def load_backgrounds():
+    global menu_bg, load_level_bg, bg_sequence
+    menu_bg = scale_to_window(load_raw("assets/menu/menu.png"), WIDTH, HEIGHT)
+    yield "menu_bg"
+    load_level_bg = scale_to_window(load_raw("assets/load_level/load_level.png"), WIDTH, HEIGHT)
+    yield "load_level_bg"
+
+    bg_sequence = []
+    for i in range(8):
+        path = BG1_PATH if i == 0 else f"assets/game_bg/bg{i + 1}.png"
+        bg_sequence.append(scale_to_window(load_raw(path), WIDTH, HEIGHT))
+        yield f"bg{i + 1}"
+
+startup_loader.add(load_backgrounds())
 
 # =====================
 # DINO - wczytanie + skalowanie
 # =====================
-dino_raw = convert_img_alpha(load_raw(DINO_PATH))
-
-target_h = max(24, int(HEIGHT * DINO_HEIGHT_FRAC))
-scale = target_h / float(max(1, dino_raw.get_height()))
-target_w = max(24, int(dino_raw.get_width() * scale))
-dino_img = pygame.transform.smoothscale(dino_raw, (target_w, target_h)).convert_alpha()
-
-dino_mask = pygame.mask.from_surface(dino_img, MASK_ALPHA_THRESHOLD)
-
-dino_bounds_list = dino_mask.get_bounding_rects()
-dino_bounds = union_rects(dino_bounds_list) or dino_img.get_rect()
-
-DINO_BOTTOM_PAD_PX = int(dino_img.get_height() - dino_bounds.bottom)
-if DINO_BOTTOM_PAD_PX < 0:
-    DINO_BOTTOM_PAD_PX = 0
-if len(GROUND_Y_PX_OFFSET_BY_BG) > 7:
-    # bg8: push ground down to match the white base using dino bottom padding
-    GROUND_Y_PX_OFFSET_BY_BG[7] += DINO_BOTTOM_PAD_PX
-
-dino_x = int(WIDTH * 0.18)
-dino_y = 0.0
-dino_vy = 0.0
-dino_on_ground = True
-
-def get_ground_y_for_bg(bg_idx: int) -> int:
-    i = bg_idx % len(GROUND_Y_FRAC_BY_BG)
-    frac = GROUND_Y_FRAC_BY_BG[i]
-    px_off = GROUND_Y_PX_OFFSET_BY_BG[i] if i < len(GROUND_Y_PX_OFFSET_BY_BG) else 0
-    return int(HEIGHT * frac) + int(px_off)
-
-def snap_dino_to_ground(bg_idx: int):
-    global dino_y, dino_vy, dino_on_ground
-    gy = get_ground_y_for_bg(bg_idx)
-    dino_y = float(gy - dino_img.get_height())
-    dino_vy = 0.0
-    dino_on_ground = True
-
-def resolve_dino_vs_ground(bg_idx: int):
-    global dino_y, dino_vy, dino_on_ground
-    gy = get_ground_y_for_bg(bg_idx)
-    if dino_y + dino_img.get_height() >= gy:
-        dino_y = float(gy - dino_img.get_height())
-        dino_vy = 0.0
-        dino_on_ground = True
-
-def dino_safe_right_px() -> int:
-    return int(dino_x + dino_img.get_width() // 2)
-
-def dino_draw_pos() -> tuple[int, int]:
-    dx = int(dino_x - dino_img.get_width() // 2)
-    dy = int(dino_y)
-    return dx, dy
-
-def dino_hit_rect_world() -> pygame.Rect:
-    dx, dy = dino_draw_pos()
-    return pygame.Rect(dx + dino_bounds.left, dy + dino_bounds.top, dino_bounds.width, dino_bounds.height)
-
-# =====================
-# PRZESZKODY - manager
-# =====================
-obstacles = ObstacleManager(
-    screen_size=(WIDTH, HEIGHT),
-    dino_height_px=dino_img.get_height(),
-    obstacle_dir="assets/obstacles",
-    base_speed_px_per_sec=BG_SCROLL_PX_PER_SEC,
-    mask_alpha_threshold=MASK_ALPHA_THRESHOLD,
-    jump_vel_px_per_s=DINO_JUMP_VEL_PX_PER_S,
-    gravity_px_per_s2=DINO_GRAVITY_PX_PER_S2,
-)
+def load_dino():
+    global dino
+    dino = build_dino(convert_img_alpha(load_raw(DINO_PATH)), HEIGHT)
+
+    # backend tekstur: tła i dino wgrywamy raz (przeszkody i HUD - przy pierwszym użyciu)
+    if texture_backend is not None:
+        texture_backend.preload(bg_sequence + [dino.img])
+    yield "dino"
+
+startup_loader.add(load_dino())
 
 # =====================
-# SPEED MULT
+# PRZESZKODY - manager + symulacja biegu (sim.RunSim)
 # =====================
-speed_mult = 1.0
+def load_obstacles():
+    global obstacles, run
+    obstacles = make_obstacles((WIDTH, HEIGHT), dino, tracer=tracer, preload=False)
+    obstacles.blit_strategy = (tuning or {}).get("blit_strategy", obstacles.blit_strategy)
+    for bg_idx in obstacles.load_steps():
+        yield f"przeszkody bg{bg_idx + 1}"
+    run = RunSim((WIDTH, HEIGHT), dino, obstacles)
+    yield "przeszkody"
 
-def current_game_speed_px_per_sec() -> float:
-    return BG_SCROLL_PX_PER_SEC * float(speed_mult)
+startup_loader.add(load_obstacles())
 
-def apply_speed_to_systems(rescale_existing: bool = True):
-    global bg_speed_micro_per_sec
-    spd = current_game_speed_px_per_sec()
-    bg_speed_micro_per_sec = int(spd * 1_000_000)
-    try:
-        obstacles.set_base_speed(spd, rescale_existing=rescale_existing)
-    except Exception:
-        obstacles.base_speed = float(spd)
+# =====================
+# ADAPTACYJNA JAKOŚĆ - stan
+# =====================
+cheap_fades = False
+quality_render_scale = 1.0
+
+def apply_quality_level(level: int):
+    global cheap_fades, quality_render_scale
+    obstacles.draw_highlights = level < 1
+    obstacles.draw_rims = level < 1
+    cheap_fades = level >= 2
+    scale_step = level - 2
+    if scale_step >= 1:
+        quality_render_scale = QUALITY_RENDER_SCALES[min(scale_step, len(QUALITY_RENDER_SCALES)) - 1]
+    else:
+        quality_render_scale = 1.0
 
-apply_speed_to_systems(rescale_existing=False)
+def frame_budget_ms() -> float:
+    return frame_pacer.frame_budget_ms(DISPLAY_REFRESH_HZ_DEFAULT)
+
+quality_governor = None
+if ADAPTIVE_QUALITY:
+    # backend tekstur skaluje scenę na GPU i ignoruje quality_render_scale - poziomy 3+ nic by nie dały
+    quality_max_level = 2 if texture_backend is not None else 2 + len(QUALITY_RENDER_SCALES)
+    quality_governor = QualityGovernor(max_level=quality_max_level, budget_ms=frame_budget_ms())
 
 # =====================
 # MENU - AUTO-FIT + CACHE + HOVER ANIM
@@ -1021,7 +1510,7 @@ apply_speed_to_systems(rescale_existing=False)
 menu_labels = ["GRAJ", "USTAWIENIA", "WYJDŹ"]
 
 def build_menu_surfaces(font_size: int):
-    font = pygame.font.Font(FONT_PATH, font_size)
+    font = get_font(font_size)
 
     surfs_normal = [
         render_text_styled(
@@ -1052,16 +1541,6 @@ def build_menu_surfaces(font_size: int):
     max_w = max(s.get_width() for s in surfs_normal)
     return surfs_normal, surfs_hover, spacing, total_h, max_w
 
-start_size = max(58, int(HEIGHT * 0.145))
-font_size = start_size
-while font_size > 30:
-    tmp_normal, tmp_hover, tmp_spacing, tmp_total_h, tmp_max_w = build_menu_surfaces(font_size)
-    if tmp_max_w <= int(WIDTH * MENU_MAX_WIDTH_FRAC) and tmp_total_h <= int(HEIGHT * MENU_MAX_HEIGHT_FRAC):
-        break
-    font_size -= 2
-
-menu_surfs_normal, menu_surfs_hover, menu_spacing, menu_total_h, menu_max_w = build_menu_surfaces(font_size)
-
 def build_menu_layout_and_static_surface():
     surf = pygame.Surface((WIDTH, HEIGHT)).convert()
     surf.blit(menu_bg, (0, 0))
@@ -1084,9 +1563,32 @@ def build_menu_layout_and_static_surface():
 
     return centers, surf, rects
 
-menu_item_centers, menu_surface_static, menu_item_rects_static = build_menu_layout_and_static_surface()
+def load_menu():
+    global menu_surfs_normal, menu_surfs_hover, menu_spacing, menu_total_h, menu_max_w
+    global menu_item_centers, menu_surface_static, menu_item_rects_static
+    global menu_frame_surface, menu_item_rects_dynamic
+    font_size = fit_font_size(
+        menu_labels,
+        min_size=30,
+        max_size=max(58, int(HEIGHT * 0.145)),
+        spacing_frac=MENU_SPACING_FRAC,
+        max_w=int(WIDTH * MENU_MAX_WIDTH_FRAC),
+        max_h=int(HEIGHT * MENU_MAX_HEIGHT_FRAC),
+        outline_px=MENU_OUTLINE_PX,
+        shadow_offset=MENU_SHADOW_OFFSET,
+    )
+    menu_surfs_normal, menu_surfs_hover, menu_spacing, menu_total_h, menu_max_w = build_menu_surfaces(font_size)
+    yield "menu"
+
+    menu_item_centers, menu_surface_static, menu_item_rects_static = build_menu_layout_and_static_surface()
+    menu_frame_surface = menu_surface_static
+    menu_item_rects_dynamic = menu_item_rects_static
+    yield "menu (statyczne)"
+
+startup_loader.add(load_menu())
 
 menu_hover_t = [0.0 for _ in menu_labels]
+_menu_frame = None
 
 def compose_menu_frame(mouse_pos, dt_ms: int):
     mx, my = mouse_pos
@@ -1104,7 +1606,10 @@ def compose_menu_frame(mouse_pos, dt_ms: int):
         else:
             menu_hover_t[i] = max(0.0, menu_hover_t[i] - step)
 
-    surf = pygame.Surface((WIDTH, HEIGHT)).convert()
+    global _menu_frame
+    if _menu_frame is None:
+        _menu_frame = pygame.Surface((WIDTH, HEIGHT)).convert()
+    surf = _menu_frame
     surf.blit(menu_bg, (0, 0))
 
     rects = []
@@ -1135,8 +1640,13 @@ def compose_menu_frame(mouse_pos, dt_ms: int):
 
     return surf, rects, hovered_index
 
-load_surface = pygame.Surface((WIDTH, HEIGHT)).convert()
-load_surface.blit(load_level_bg, (0, 0))
+def load_load_screen():
+    global load_surface
+    load_surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+    load_surface.blit(load_level_bg, (0, 0))
+    yield "ekran ładowania"
+
+startup_loader.add(load_load_screen())
 countdown_bg_frame = None
 
 # =====================
@@ -1147,23 +1657,30 @@ pause_btn_radius = max(16, int(HEIGHT * PAUSE_BTN_RADIUS_FRAC))
 pause_button_rect = pygame.Rect(0, 0, pause_btn_radius * 2, pause_btn_radius * 2)
 pause_button_rect.topright = (WIDTH - HUD_MARGIN_PX, HUD_MARGIN_PX)
 
-dim_overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-dim_overlay.fill((0, 0, 0, OVERLAY_DIM_ALPHA))
+def load_overlays():
+    global dim_overlay, pause_menu_cache, pause_menu_hover_t, game_over_menu_cache, game_over_hover_t, exit_confirm_cache
+    dim_overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+    dim_overlay.fill((0, 0, 0, OVERLAY_DIM_ALPHA))
 
-pause_menu_cache = build_overlay_cache(
-    "PAUZA",
-    ["KONTYNUUJ GRE", "ROZPOCZNIJ NOWA GRE", "WROC DO MENU"],
-)
-pause_menu_hover_t = [0.0 for _ in pause_menu_cache["option_rects"]]
-game_over_menu_cache = build_overlay_cache(
-    "PRZEGRALES",
-    ["ROZPOCZNIJ NOWA GRE", "WROC DO MENU"],
-)
-game_over_hover_t = [0.0 for _ in game_over_menu_cache["option_rects"]]
-exit_confirm_cache = build_overlay_cache(
-    "CZY NA PEWNO WYJSC?",
-    ["WYJDZ", "ZOSTAN"],
-)
+    pause_menu_cache = build_overlay_cache(
+        "PAUZA",
+        ["KONTYNUUJ GRE", "ROZPOCZNIJ NOWA GRE", "WROC DO MENU"],
+    )
+    pause_menu_hover_t = [0.0 for _ in pause_menu_cache["option_rects"]]
+    yield "nakładka pauzy"
+    game_over_menu_cache = build_overlay_cache(
+        "PRZEGRALES",
+        ["ROZPOCZNIJ NOWA GRE", "WROC DO MENU"],
+    )
+    game_over_hover_t = [0.0 for _ in game_over_menu_cache["option_rects"]]
+    yield "nakładka końca gry"
+    exit_confirm_cache = build_overlay_cache(
+        "CZY NA PEWNO WYJSC?",
+        ["WYJDZ", "ZOSTAN"],
+    )
+    yield "nakładka wyjścia"
+
+startup_loader.add(load_overlays())
 
 # =====================
 # USTAWIENIA - NOWY DESIGN
@@ -1428,43 +1945,57 @@ def _build_settings_cache():
         "hint_rect": hint_rect
     })
 
-def _draw_pretty_slider(dst: pygame.Surface, rect: pygame.Rect, t: float, hovered: bool):
-    t = clamp(t, 0.0, 1.0)
+SLIDER_PAD_PX = 8
+
+def _build_pretty_slider(size, t: float, hovered: bool) -> pygame.Surface:
+    w, h = size
+    pad = SLIDER_PAD_PX
+    surf = pygame.Surface((w + pad * 2, h + pad * 2), pygame.SRCALPHA)
+    rect = pygame.Rect(pad, pad, w, h)
     r = rect.height // 2
 
     # Baza
     track = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
     pygame.draw.rect(track, (255, 255, 255, 50), track.get_rect(), border_radius=r)
     pygame.draw.rect(track, (0, 0, 0, 60), track.get_rect(), width=2, border_radius=r)
-    dst.blit(track, rect.topleft)
+    surf.blit(track, rect.topleft)
 
     # Fill
     fill_w = int(rect.width * t)
     if fill_w > r:
-        fill_rect = rect.copy()
-        fill_rect.width = fill_w
         tmp_fill = pygame.Surface((fill_w, rect.height), pygame.SRCALPHA)
         col = (44, 220, 140, 160 if hovered else 140)
         pygame.draw.rect(tmp_fill, col, tmp_fill.get_rect(), border_radius=r)
-        dst.blit(tmp_fill, rect.topleft)
+        surf.blit(tmp_fill, rect.topleft)
 
-    # Gałka
+    # Gałka (kryjąca - tak jak wcześniej rysowana wprost na nieprzezroczystej klatce)
     cx = int(_lerp(rect.left + r, rect.right - r, t))
     cy = rect.centery
     knob_r = max(6, int(rect.height * 0.42))
 
     # Glow gałki
     if hovered:
-        pygame.draw.circle(dst, (44, 220, 140, 60), (cx, cy), knob_r + 5)
+        pygame.draw.circle(surf, (44, 220, 140), (cx, cy), knob_r + 5)
 
     # Cień
-    pygame.draw.circle(dst, (0,0,0,80), (cx+2, cy+2), knob_r)
+    pygame.draw.circle(surf, (0, 0, 0), (cx + 2, cy + 2), knob_r)
     # Ring
-    pygame.draw.circle(dst, (255,255,255,255), (cx, cy), knob_r)
+    pygame.draw.circle(surf, (255, 255, 255), (cx, cy), knob_r)
     # Środek
-    pygame.draw.circle(dst, (44, 220, 140) if t > 0.1 else (200,200,200), (cx, cy), knob_r - 3)
+    pygame.draw.circle(surf, (44, 220, 140) if t > 0.1 else (200, 200, 200), (cx, cy), knob_r - 3)
+    return surf
 
-def _draw_segment_button(dst: pygame.Surface, rect: pygame.Rect, selected: bool, hovered: bool):
+def _draw_pretty_slider(dst: pygame.Surface, rect: pygame.Rect, t: float, hovered: bool):
+    q = quantize_anim_t(t)
+    size = rect.size
+    surf = get_widget_surface(
+        "slider", size,
+        lambda: _build_pretty_slider(size, q / float(WIDGET_ANIM_STEPS), hovered),
+        hovered=hovered, anim_q=q,
+    )
+    dst.blit(surf, (rect.left - SLIDER_PAD_PX, rect.top - SLIDER_PAD_PX))
+
+def _build_segment_button(size, selected: bool, hovered: bool) -> pygame.Surface:
     radius = 12
     if selected:
         fill = (44, 220, 140, 130 if not hovered else 155)
@@ -1473,19 +2004,26 @@ def _draw_segment_button(dst: pygame.Surface, rect: pygame.Rect, selected: bool,
         fill = (255, 255, 255, 18 if not hovered else 30)
         stroke = (0, 0, 0, 70 if not hovered else 90)
 
-    tmp = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
+    tmp = pygame.Surface(size, pygame.SRCALPHA)
     pygame.draw.rect(tmp, fill, tmp.get_rect(), border_radius=radius)
     pygame.draw.rect(tmp, stroke, tmp.get_rect(), width=2, border_radius=radius)
-    dst.blit(tmp, rect.topleft)
+    return tmp
+
+def _draw_segment_button(dst: pygame.Surface, rect: pygame.Rect, selected: bool, hovered: bool):
+    size = rect.size
+    surf = get_widget_surface(
+        "segment_button", size,
+        lambda: _build_segment_button(size, selected, hovered),
+        hovered=hovered, selected=selected,
+    )
+    dst.blit(surf, rect.topleft)
 
 def _draw_sidebar_tab(dst: pygame.Surface, rect: pygame.Rect, label_surf: pygame.Surface, active: bool, hovered: bool):
     # Tło zakładki
     if active:
         _draw_rounded_rect_alpha(dst, rect, (255, 255, 255, 25), radius=14)
         # Glow
-        glow = pygame.Surface((rect.width, rect.height), pygame.SRCALPHA)
-        pygame.draw.rect(glow, (255, 225, 120, 20), glow.get_rect(), border_radius=14)
-        dst.blit(glow, rect.topleft)
+        _draw_rounded_rect_alpha(dst, rect, (255, 225, 120, 20), radius=14)
     elif hovered:
         _draw_rounded_rect_alpha(dst, rect, (255, 255, 255, 12), radius=14)
 
@@ -1641,19 +2179,34 @@ fade_to = None
 fade_start_ms = 0
 fade_duration_ms = 0
 fade_next_state = None
+fade_trace = None   # (perf_counter startu, stan źródłowy) - tylko przy DINO_TRACE
+
+def release_fade_layers():
+    global fade_from, fade_to
+    frame_pool.release(fade_from)
+    frame_pool.release(fade_to)
+    fade_from = None
+    fade_to = None
 
 def start_fade(now_ms: int, from_surf: pygame.Surface, to_surf: pygame.Surface,
                duration_ms: int, next_state: str):
-    global fade_from, fade_to, fade_start_ms, fade_duration_ms, fade_next_state
-    fade_from = from_surf.convert_alpha()
-    fade_to = to_surf.convert_alpha()
+    """Kopiuje obie klatki do warstw z puli (nieprzezroczyste + alfa powierzchni)."""
+    global fade_from, fade_to, fade_start_ms, fade_duration_ms, fade_next_state, fade_trace
+    release_fade_layers()
+    fade_from = frame_pool.acquire()
+    fade_from.blit(from_surf, (0, 0))
+    fade_to = frame_pool.acquire()
+    fade_to.blit(to_surf, (0, 0))
     fade_start_ms = now_ms
     fade_duration_ms = max(1, duration_ms)
     fade_next_state = next_state
+    if tracer is not None:
+        fade_trace = (time.perf_counter(), state)
 
 def begin_countdown(now_ms: int, from_surf: pygame.Surface):
     global state, countdown_start_ms, countdown_bg_frame
     countdown_start_ms = None
+    frame_pool.release(countdown_bg_frame)
     countdown_bg_frame = make_countdown_base_frame(0)
     start_fade(now_ms, from_surf, countdown_bg_frame, FADE_BG_TO_COUNTDOWN_MS, STATE_COUNTDOWN)
     state = STATE_FADE_BG_COUNTDOWN
@@ -1665,6 +2218,15 @@ def draw_fade(now_ms: int):
     a_to = int(255 * t)
     a_from = int(255 * (1.0 - t))
 
+    if cheap_fades:
+        # bez czyszczenia ekranu, a fade_from jako zwykła kopia (bez alfy): jeden blit z alfą
+        # zamiast dwóch; nadal dwa pełne blity na klatkę, ale kopia jest dużo tańsza od mieszania
+        fade_from.set_alpha(None)
+        fade_to.set_alpha(a_to)
+        screen.blit(fade_from, (0, 0))
+        screen.blit(fade_to, (0, 0))
+        return elapsed >= fade_duration_ms
+
     fade_from.set_alpha(a_from)
     fade_to.set_alpha(a_to)
 
@@ -1697,7 +2259,6 @@ STATE_FADE_BG_MENU = "fade_bg_menu"
 state = STATE_INTRO
 intro_start_ms = pygame.time.get_ticks()
 load_start_ms = None
-pause_started_ms = None
 countdown_start_ms = None
 exit_confirm_prev_state = None
 exit_confirm_frame = None
@@ -1705,8 +2266,8 @@ exit_confirm_started_ms = None
 esc_exit_press_count = 0
 esc_exit_last_press_ms = None
 
-menu_frame_surface = menu_surface_static
-menu_item_rects_dynamic = menu_item_rects_static
+menu_frame_surface = None         # ustawiane w load_menu
+menu_item_rects_dynamic = []
 menu_hovered_index = -1
 
 # ustawienia: cache ostatniej klatki
@@ -1716,37 +2277,344 @@ def set_hand_cursor(is_hand: bool):
     return
 
 # =====================
-# BG (bg1->bg8) - zmienne stanu
+# POWTÓRKI - nagrywanie biegów / odtwarzanie (--replay)
 # =====================
-bg_index = 0
-bg_switch_start_ms = None
+background_writer = BackgroundWriter()
+telemetry = None
+if TELEMETRY:
+    telemetry = Telemetry(os.path.join(_get_settings_path()[0], TELEMETRY_FOLDER_NAME), background_writer)
+    telemetry.event(
+        "session_start", ts=round(time.time(), 3), size=[WIDTH, HEIGHT], platform=platform.platform(),
+        pygame=pygame.version.ver, sdl=".".join(str(v) for v in pygame.get_sdl_version()),
+        replay=REPLAY_ARG in sys.argv,
+    )
+replay_file = None
+replay_input = None
+replay_pos = 0
+if REPLAY_ARG in sys.argv:
+    try:
+        replay_file = ReplayFile(sys.argv[sys.argv.index(REPLAY_ARG) + 1])
+    except (IndexError, OSError, ReplayError) as e:
+        log.error("nie można wczytać powtórki: %s", e)
+    else:
+        replay_input = replay_file.replay
+        if replay_input.size != (WIDTH, HEIGHT):
+            log.warning(
+                "powtórka nagrana w %dx%d, okno %dx%d - przebieg może się rozjechać",
+                replay_input.size[0], replay_input.size[1], WIDTH, HEIGHT,
+            )
 
-bg_scroll_num = 0
-bg_speed_micro_per_sec = int(BG_SCROLL_PX_PER_SEC * 1_000_000)
-PIX_DEN = 1_000_000_000
+replay_recorder = None
+if REPLAYS and replay_input is None:
+    replay_recorder = ReplayRecorder(os.path.join(_get_settings_path()[0], REPLAY_FOLDER_NAME), background_writer)
+
+run_history = None
+if HISTORY and replay_input is None:
+    run_history = RunHistory(os.path.join(_get_settings_path()[0], HISTORY_FILENAME))
+run_active = False
+last_run_record = None   # ostatni zakończony bieg - podświetlony w rankingu
+
+def start_run():
+    """Nowy bieg od bg1: ziarno z odtwarzanej powtórki albo losowe (i nagrywanie)."""
+    global replay_pos, run_active
+    run.start(replay_input.seed if replay_input is not None else None)
+    replay_pos = 0
+    run_active = True
+    if replay_recorder is not None:
+        replay_recorder.start(run)
+    if telemetry is not None:
+        telemetry.event("run_start", seed=run.seed)
+
+def end_run(outcome: int):
+    """Koniec biegu: domknięcie powtórki i wpis do historii (jeden raz na bieg)."""
+    global run_active, last_run_record
+    if not run_active:
+        return
+    run_active = False
+    replay_name = ""
+    if replay_recorder is not None and replay_recorder.finish(outcome, run):
+        replay_name = os.path.basename(replay_recorder.last_path)
+    if telemetry is not None:
+        fields = dict(seed=run.seed, time_ms=run.time_ms, level=run.level, frames=run.frames)
+        hit = run.obstacles.hit_obstacle if outcome == OUTCOME_COLLISION else None
+        if hit is not None:
+            telemetry.event(
+                "death", obstacle=run.death_obstacle(), variant=list(hit.variant_key),
+                pattern=hit.pattern, **fields,
+            )
+        else:
+            telemetry.event("run_end", outcome=OUTCOME_NAMES.get(outcome, outcome), **fields)
+    if run_history is not None and run.frames > 0:
+        last_run_record = RunRecord(
+            ended_at=time.time(), seed=run.seed, time_ms=run.time_ms, level=run.level, frames=run.frames,
+            outcome=outcome, obstacle=run.death_obstacle(), replay=replay_name,
+        )
+        run_history.record(last_run_record)
+
+def play_jump_sound():
+    if jump_sound is not None and jump_sound_enabled:
+        try:
+            jump_sound.play()
+        except Exception:
+            pass
 
 # =====================
 # PĘTLA GŁÓWNA
 # =====================
-running = True
-while running:
+def _hover_settled(hover_t, rects, mouse_pos) -> bool:
+    """Animacja hover stoi: podświetlona jest dokładnie opcja pod kursorem (albo żadna)."""
+    hovered = -1
+    for i, rect in enumerate(rects):
+        if rect.collidepoint(mouse_pos):
+            hovered = i
+            break
+    for i, t in enumerate(hover_t):
+        if t != (1.0 if i == hovered else 0.0):
+            return False
+    return True
+
+def _settings_settled() -> bool:
+    if abs(toggle_anim - (1.0 if jump_sound_enabled else 0.0)) > IDLE_ANIM_EPS:
+        return False
+    return abs(bg_timer_toggle_anim - (1.0 if bg_timer_enabled else 0.0)) <= IDLE_ANIM_EPS
+
+def idle_wait_ms(now_ms: int):
+    """Ile można spać w oczekiwaniu na zdarzenie (None = klatka musi być rysowana)."""
+    if not IDLE_MODE:
+        return None
+    if state == STATE_INTRO:
+        if not startup_loader.done:
+            return None
+        remaining = INTRO_DURATION_MS - (now_ms - intro_start_ms)
+        return min(IDLE_WAIT_MAX_MS, remaining) if remaining > 0 else None
+    if state == STATE_EXIT_CONFIRM:
+        return IDLE_WAIT_MAX_MS
+    mouse_pos = pygame.mouse.get_pos()
+    if state == STATE_MENU:
+        settled = _hover_settled(menu_hover_t, menu_item_rects_static, mouse_pos)
+    elif state == STATE_PAUSED:
+        settled = _hover_settled(pause_menu_hover_t, pause_menu_cache["option_rects"], mouse_pos)
+    elif state == STATE_SETTINGS:
+        settled = _settings_settled()
+    else:
+        settled = False
+    return IDLE_WAIT_MAX_MS if settled else None
+
+idle_stats = {"waits": 0, "wakeups": 0, "idle_ms_total": 0.0}
+
+def idle_report() -> str:
+    return (
+        f"bezczynność: {idle_stats['waits']} oczekiwań, {idle_stats['wakeups']} wybudzeń zdarzeniem, "
+        f"łącznie {idle_stats['idle_ms_total'] / 1000.0:.1f} s bez rysowania"
+    )
+
+phase_timer = PhaseTimer()
+phase_timer.tracer = tracer
+
+stack_sampler = None
+hitch_recorder = None
+if HITCH_RECORDER:
+    stack_sampler = StackSampler()
+    hitch_recorder = HitchRecorder(
+        stack_sampler, os.path.join(_get_settings_path()[0], HITCH_FOLDER_NAME), factor=HITCH_FACTOR
+    )
+
+def hitch_snapshot() -> dict:
+    snap = {
+        "state": state,
+        "bg_index": run.bg_index,
+        "speed_mult": round(run.speed_mult, 3),
+        "run_ms": run.time_ms,
+        "obstacles": len(obstacles.obstacles),
+        "obstacle_caches": obstacles.cache_sizes(),
+        "quality_level": quality_governor.level if quality_governor is not None else 0,
+        "render_scale": round(min(render_scale, quality_render_scale), 3),
+        "phases_ms": phase_timer.last_frame(),
+        "frame_pool": frame_pool.stats(),
+        "gc_ms": round(frame_gc_ms, 3),
+        "gc_counts": list(gc.get_count()),
+    }
+    if texture_backend is not None:
+        snap["textures"] = texture_backend.texture_count()
+    return snap
+perf_overlay = PerfOverlay(pygame.font.Font(None, max(18, int(HEIGHT * 0.024))))
+perf_overlay.visible = PERF_HUD
+
+def memory_families() -> dict:
+    families = {
+        "bg_sequence": bg_sequence,
+        "ekrany": [intro_bg, menu_bg, load_level_bg, load_surface, menu_surface_static],
+        "menu": [menu_surfs_normal, menu_surfs_hover, _menu_frame],
+    }
+    for name, obj in obstacles.memory_families().items():
+        families["przeszkody." + name] = obj
+    families.update({
+        "settings_cache": [_settings_cache, _settings_frame],
+        "overlay_caches": [pause_menu_cache, game_over_menu_cache, exit_confirm_cache, dim_overlay],
+        "countdown_surfs": countdown_surfs,
+        "widget_cache": _widget_cache,
+        "hud": [timer_number_atlas, timer_prefix_surf],
+        "dino": [dino.img, dino.mask, cursor_img],
+        "scena (skala)": [_scene_buffer, _scene_scaled_assets],
+        "pula klatek": frame_pool.surfaces(),
+    })
+    return families
+
+py_heap_growth = []
+
+def memory_report_text(sep: Optional[str] = None) -> str:
+    text = format_memory_report(memory_report(memory_families()), sep)
+    if texture_backend is not None:
+        text += f"\ntekstury GPU: {texture_backend.texture_count()}"
+    if py_heap is not None:
+        text += f"\ntracemalloc: {py_heap.current_mb():.1f} MB, sesji {py_heap.sessions}"
+        text += "".join("\n  " + line for line in py_heap_growth)
+    return text
+
+memory_overlay = None   # tworzona przy pierwszym F4
+
+if MEMORY_REPORT_ARG in sys.argv:
+    advance_startup(math.inf)
+    print(memory_report_text())
+    settings_store.close()
+    if telemetry is not None:
+        telemetry.close()
+    background_writer.close()
+    if run_history is not None:
+        run_history.close()
+    pygame.quit()
+    sys.exit()
+
+def run_autotune() -> dict:
+    """Mikrobenchmarki na tej maszynie (~1 s, tylko przy pierwszym starcie)."""
+    t0 = time.perf_counter()
+
+    # intro na ekranie w trakcie pomiaru (test vsync i tak musi coś pokazywać)
+    screen.blit(intro_bg, (0, 0))
+
+    sample = bg_sequence[0]
+    smooth = bench_smoothscale(sample, (max(1, int(WIDTH * 0.7)), max(1, int(HEIGHT * 0.7))))
+    smooth_best = pick_fastest(smooth, "GENERIC")
+    apply_smoothscale_backend(smooth_best)
+
+    # przeszkody: ta sama scena rysowana blits() i pojedynczymi blit()
+    scratch = frame_pool.acquire()
+    run.start(0)
+    for _ in range(120):
+        run.advance(16)
+        run.update_obstacles()
+
+    def draw_obstacles(strategy: str):
+        obstacles.blit_strategy = strategy
+        scratch.blit(sample, (0, 0))
+        obstacles.draw(scratch)
+
+    blit_times = bench_strategies(draw_obstacles, BLIT_STRATEGIES)
+    obstacles.blit_strategy = pick_fastest(blit_times, "blits")
+    bench_obstacles = len(obstacles.obstacles)
+    run.start(0)
+    frame_pool.release(scratch)
+
     if vsync_enabled:
-        dt = clock.tick()
+        vsync = bench_vsync(lambda: present_frame(screen))
+        pacing = "vsync" if vsync["ok"] else "paced"
+        if not vsync["ok"]:
+            frame_pacer.disable_vsync("autotuning: flip nie czeka na odświeżenie")
     else:
-        dt = clock.tick_busy_loop(TARGET_FPS_NO_VSYNC)
+        vsync = {"ok": False}
+        pacing = "paced"
+
+    result = {
+        "version": TUNING_VERSION,
+        "fingerprint": hardware_id,
+        "smoothscale": smooth_best,
+        "blit_strategy": obstacles.blit_strategy,
+        "pacing": pacing,
+        "measurements": {
+            "smoothscale_ms": {k: round(v, 3) for k, v in smooth.items()},
+            "obstacles_draw_ms": {k: round(v, 4) for k, v in blit_times.items()},
+            "obstacles_on_screen": bench_obstacles,
+            "vsync": vsync,
+        },
+    }
+    save_tuning(tuning_path, result)
+    log.info(
+        "autotuning (%.0f ms): smoothscale=%s, blity=%s, tempo=%s",
+        (time.perf_counter() - t0) * 1000.0, smooth_best, obstacles.blit_strategy, pacing,
+    )
+    return result
+
+def load_autotune():
+    global tuning
+    if autotune_pending and MEMORY_REPORT_ARG not in sys.argv:
+        tuning = run_autotune()
+        yield "autotuning"
+
+startup_loader.add(load_autotune())
+
+# stany, w których pełna kolekcja GC nie jest widoczna (gra stoi albo trwa przejście)
+GC_COLLECT_STATES = (STATE_PAUSED, STATE_GAME_OVER, STATE_LOAD, STATE_COUNTDOWN, STATE_FADE_BG_MENU)
+
+running = True
+prev_frame_state = None
+idle_wait = None
+frame_gc_ms = 0.0
+while running:
+    # statyczny ekran: czekamy na wejście / timer zamiast rysować tę samą klatkę
+    woken_events = []
+    if idle_wait is not None:
+        idle_t0 = time.perf_counter()
+        if stack_sampler is not None:
+            stack_sampler.paused = True
+        state_profiler.switch(None)
+        woken = pygame.event.wait(max(1, int(idle_wait)))
+        if stack_sampler is not None:
+            stack_sampler.paused = False
+        idle_stats["waits"] += 1
+        idle_stats["idle_ms_total"] += (time.perf_counter() - idle_t0) * 1000.0
+        if woken.type != pygame.NOEVENT:
+            idle_stats["wakeups"] += 1
+            woken_events.append(woken)
+        # czas oczekiwania nie jest czasem klatki - dt po wybudzeniu = 0, statystyki tempa bez dziury
+        frame_pacer.resync()
+
+    # gdzie rysujemy tę klatkę: ekran programowy albo (w rozgrywce) backend tekstur
+    frame_dst = screen
+    dt = frame_pacer.tick()
+    frame_start_t = time.perf_counter()
+    phase_timer.begin_frame(state)
+    state_profiler.switch(state)
 
     now = pygame.time.get_ticks()
 
-    for event in pygame.event.get():
+    for event in woken_events + pygame.event.get():
         if event.type == pygame.QUIT:
             save_user_settings()
             running = False
 
+        if event.type == pygame.KEYDOWN and event.key == PERF_HUD_KEY:
+            perf_overlay.toggle()
+
+        if event.type == pygame.KEYDOWN and event.key == MEMORY_OVERLAY_KEY:
+            advance_startup(math.inf)
+            if memory_overlay is None:
+                memory_overlay = TextPanelOverlay(pygame.font.Font(None, max(18, int(HEIGHT * 0.024))))
+            memory_overlay.toggle()
+            if memory_overlay.visible:
+                log.info("pamięć:\n%s", memory_report_text())
+
+        if event.type == pygame.KEYDOWN and event.key == PROFILE_KEY:
+            if state_profiler.active:
+                for path in state_profiler.stop():
+                    log.info("profil: %s", path)
+            else:
+                state_profiler.start(state)
+                log.info("profilowanie włączone (F9 = stop i zapis)")
+
         # ESC: w grze pauza, poza gra 3x aby pokazac wyjscie
         if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
             if state == STATE_BG:
                 reset_exit_confirm_presses()
-                pause_started_ms = now
                 state = STATE_PAUSED
                 pause_menu_hover_t = [0.0 for _ in pause_menu_cache["option_rects"]]
             elif state == STATE_SETTINGS:
@@ -1765,52 +2633,64 @@ while running:
                 resume_from_exit_confirm(now)
             else:
                 if register_exit_confirm_press(now):
+                    advance_startup(math.inf)   # nakładka wyjścia może jeszcze nie istnieć (intro)
                     enter_exit_confirm(now)
 
-        if state == STATE_BG and event.type == pygame.KEYDOWN and event.key == current_jump_key():
-            if dino_on_ground:
-                dino_vy = -DINO_JUMP_VEL_PX_PER_S
-                dino_on_ground = False
-                if jump_sound is not None and jump_sound_enabled:
-                    try:
-                        jump_sound.play()
-                    except Exception:
-                        pass
+        # odtwarzana powtórka: skoki z nagrania, klawiatura ich nie dodaje
+        if (state == STATE_BG and replay_input is None
+                and event.type == pygame.KEYDOWN and event.key == current_jump_key()):
+            if run.jump():
+                if replay_recorder is not None:
+                    replay_recorder.jump()
+                play_jump_sound()
+
+        # podgląd powtórki: przewijanie = najbliższy keyframe + symulacja reszty
+        if (state == STATE_BG and replay_file is not None
+                and event.type == pygame.KEYDOWN and event.key in (pygame.K_LEFT, pygame.K_RIGHT)):
+            step = REPLAY_SEEK_STEP_MS if event.key == pygame.K_RIGHT else -REPLAY_SEEK_STEP_MS
+            try:
+                replay_pos = replay_file.seek(run, max(0, run.time_ms + step))
+            except ReplayError as e:
+                log.warning("przewijanie powtórki: %s", e)
+            if run.collided:
+                state = STATE_GAME_OVER
+                game_over_hover_t = [0.0 for _ in game_over_menu_cache["option_rects"]]
 
         if state == STATE_BG and event.type == pygame.KEYDOWN and event.key == pygame.K_p:
-            pause_started_ms = now
             state = STATE_PAUSED
             pause_menu_hover_t = [0.0 for _ in pause_menu_cache["option_rects"]]
 
         if state == STATE_BG and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             if pause_button_rect.collidepoint(event.pos):
-                pause_started_ms = now
                 state = STATE_PAUSED
                 pause_menu_hover_t = [0.0 for _ in pause_menu_cache["option_rects"]]
 
         if state == STATE_PAUSED and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             mx, my = event.pos
             if pause_menu_cache["option_rects"][0].collidepoint(mx, my):
-                resume_from_pause(now)
                 state = STATE_BG
             elif pause_menu_cache["option_rects"][1].collidepoint(mx, my):
-                pause_started_ms = None
-                frame = capture_game_frame(now, include_hud=False)
+                end_run(OUTCOME_ABANDONED)
+                frame = capture_game_frame(include_hud=False)
                 begin_countdown(now, frame)
+                frame_pool.release(frame)
             elif pause_menu_cache["option_rects"][2].collidepoint(mx, my):
-                pause_started_ms = None
-                frame = capture_game_frame(now, include_hud=False)
+                end_run(OUTCOME_ABANDONED)
+                frame = capture_game_frame(include_hud=False)
                 start_fade(now, frame, menu_surface_static, FADE_BG_TO_MENU_MS, STATE_MENU)
+                frame_pool.release(frame)
                 state = STATE_FADE_BG_MENU
 
         if state == STATE_GAME_OVER and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
             mx, my = event.pos
             if game_over_menu_cache["option_rects"][0].collidepoint(mx, my):
-                frame = capture_game_frame(now, include_hud=False)
+                frame = capture_game_frame(include_hud=False)
                 begin_countdown(now, frame)
+                frame_pool.release(frame)
             elif game_over_menu_cache["option_rects"][1].collidepoint(mx, my):
-                frame = capture_game_frame(now, include_hud=False)
+                frame = capture_game_frame(include_hud=False)
                 start_fade(now, frame, menu_surface_static, FADE_BG_TO_MENU_MS, STATE_MENU)
+                frame_pool.release(frame)
                 state = STATE_FADE_BG_MENU
 
         if state == STATE_EXIT_CONFIRM and event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
@@ -1884,10 +2764,12 @@ while running:
                 start_fade(now, from_s, menu_surface_static, FADE_SETTINGS_TO_MENU_MS, STATE_MENU)
                 state = STATE_FADE_SETTINGS_MENU
 
+    phase_timer.mark("events")
+
     if LOCK_WINDOW_POS and fixed_pos is not None:
         try:
-            if pygame.display.get_window_position() != fixed_pos:
-                pygame.display.set_window_position(*fixed_pos)
+            if _get_window_position() != fixed_pos:
+                _set_window_position_safe(*fixed_pos)
         except Exception:
             _set_window_position_win32(*fixed_pos)
 
@@ -1895,7 +2777,14 @@ while running:
     # LOGIKA STANÓW
     # =====================
     if state == STATE_INTRO:
-        if now - intro_start_ms >= INTRO_DURATION_MS:
+        # zasoby doładowują się w trakcie intro; menu dopiero, gdy wszystko gotowe
+        if not startup_loader.done:
+            advance_startup(STARTUP_SLICE_MS)
+            frame_pacer.resync()    # ładowanie to nie odstęp klatki
+        if startup_loader.done and replay_input is not None:
+            start_run()
+            state = STATE_BG
+        elif startup_loader.done and now - intro_start_ms >= INTRO_DURATION_MS:
             start_fade(now, intro_bg, menu_surface_static, FADE_INTRO_TO_MENU_MS, STATE_MENU)
             state = STATE_FADE_INTRO_MENU
 
@@ -1903,18 +2792,9 @@ while running:
         if load_start_ms is None:
             load_start_ms = now
         if now - load_start_ms >= LOAD_DURATION_MS:
-            speed_mult = 1.0
-            apply_speed_to_systems(rescale_existing=False)
-
-            bg_index = 0
-            bg_switch_start_ms = None
-            bg_scroll_num = 0
-            snap_dino_to_ground(bg_index)
-
-            obstacles.reset(bg_index, now, dino_safe_right_px=dino_safe_right_px(), start_visible=True)
-
             first_bg_frame = make_scrolling_bg_frame(bg_sequence[0], 0)
             start_fade(now, load_surface, first_bg_frame, FADE_LOAD_TO_BG_MS, STATE_BG)
+            frame_pool.release(first_bg_frame)
             state = STATE_FADE_LOAD_BG
 
     elif state == STATE_COUNTDOWN:
@@ -1923,77 +2803,52 @@ while running:
         if countdown_bg_frame is None:
             countdown_bg_frame = make_countdown_base_frame(0)
         if now - countdown_start_ms >= COUNTDOWN_DURATION_MS:
-            speed_mult = 1.0
-            apply_speed_to_systems(rescale_existing=False)
-
-            bg_index = 0
-            bg_switch_start_ms = now
-            bg_scroll_num = 0
-            snap_dino_to_ground(bg_index)
-
-            obstacles.reset(bg_index, now, dino_safe_right_px=dino_safe_right_px(), start_visible=True)
-
+            start_run()
             countdown_start_ms = None
+            frame_pool.release(countdown_bg_frame)
+            countdown_bg_frame = None
             state = STATE_BG
 
     elif state == STATE_BG:
-        if bg_switch_start_ms is None:
-            bg_switch_start_ms = now
-
-        if now - bg_switch_start_ms >= BG_SWITCH_EVERY_MS:
-            speed_mult = min(LEVEL_SPEED_CAP_MULT, speed_mult * (1.0 + LEVEL_SPEED_INCREASE))
-            apply_speed_to_systems(rescale_existing=True)
-
-            bg_index = (bg_index + 1) % len(bg_sequence)
-            bg_switch_start_ms = now
-            bg_scroll_num = 0
-
-            obstacles.on_bg_change(bg_index, now, dino_safe_right_px=dino_safe_right_px())
-
-            if dino_on_ground:
-                snap_dino_to_ground(bg_index)
+        # czas biegu = suma dt klatek (w pauzie stoi); przy powtórce - dt z nagrania
+        run_dt = dt
+        if replay_input is not None:
+            if replay_pos < len(replay_input.inputs):
+                code = replay_input.inputs[replay_pos]
+                replay_pos += 1
+                run_dt = code >> 1
+                if code & 1 and run.jump():
+                    play_jump_sound()
             else:
-                resolve_dino_vs_ground(bg_index)
-
-        dt_ms = min(dt, MAX_DT_MS_FOR_SCROLL)
-        dt_s = dt_ms / 1000.0
-
-        gy = get_ground_y_for_bg(bg_index)
-
-        dino_vy += DINO_GRAVITY_PX_PER_S2 * dt_s
-        dino_y += dino_vy * dt_s
-
-        if dino_y + dino_img.get_height() >= gy:
-            dino_y = float(gy - dino_img.get_height())
-            dino_vy = 0.0
-            dino_on_ground = True
+                run_dt = None
+
+        if run_dt is None:
+            # nagranie przerwanego biegu skończyło się bez kolizji
+            frame = capture_game_frame(include_hud=False)
+            start_fade(now, frame, menu_surface_static, FADE_BG_TO_MENU_MS, STATE_MENU)
+            frame_pool.release(frame)
+            state = STATE_FADE_BG_MENU
         else:
-            dino_on_ground = False
-
-        w = bg_sequence[bg_index].get_width()
-        if w > 0:
-            mod = w * PIX_DEN
-            bg_scroll_num = (bg_scroll_num + bg_speed_micro_per_sec * dt_ms) % mod
-
-        obstacles.update(
-            dt_ms=dt_ms,
-            ground_y=gy,
-            bg_idx=bg_index,
-            now_ms=now,
-            dino_safe_right_px=dino_safe_right_px(),
-            baseline_offset_px=DINO_BOTTOM_PAD_PX
-        )
-
-        dx, dy = dino_draw_pos()
-        dino_hit = dino_hit_rect_world()
-        if obstacles.collides_mask(
-            dino_mask=dino_mask,
-            dino_topleft=(dx, dy),
-            dino_hit_rect=dino_hit,
-            min_overlap_pixels=MIN_OVERLAP_PIXELS
-        ):
-            state = STATE_GAME_OVER
-            game_over_hover_t = [0.0 for _ in game_over_menu_cache["option_rects"]]
+            if replay_recorder is not None:
+                replay_recorder.frame(run_dt, run)
+            if run.advance(run_dt):
+                if tracer is not None:
+                    tracer.instant("bg_switch", "game", {"bg_index": run.bg_index, "speed_mult": round(run.speed_mult, 3)})
+                if telemetry is not None:
+                    telemetry.event(
+                        "level", level=run.level, bg_index=run.bg_index, time_ms=run.time_ms,
+                        speed_mult=round(run.speed_mult, 3),
+                    )
+            phase_timer.mark("logic")
+            run.update_obstacles()
+            phase_timer.mark("obstacles")
+            if run.check_collision():
+                end_run(OUTCOME_COLLISION)
+                state = STATE_GAME_OVER
+                game_over_hover_t = [0.0 for _ in game_over_menu_cache["option_rects"]]
+        phase_timer.mark("collision")
+
+    phase_timer.mark("logic")
 
     # =====================
     # RYSOWANIE
@@ -2038,6 +2893,7 @@ while running:
         set_hand_cursor(False)
         draw_game_world(screen)
         draw_overlay_menu_animated(screen, game_over_menu_cache, pygame.mouse.get_pos(), dt, game_over_hover_t)
+        draw_leaderboard(screen)
 
     elif state == STATE_EXIT_CONFIRM:
         set_hand_cursor(False)
@@ -2060,6 +2916,11 @@ while running:
         done = draw_fade(now)
         if done:
             state = fade_next_state
+            release_fade_layers()
+            if tracer is not None and fade_trace is not None:
+                t0, from_state = fade_trace
+                tracer.complete(f"{from_state} -> {state}", "transition", t0, time.perf_counter() - t0)
+                fade_trace = None
             if state == STATE_LOAD:
                 load_start_ms = now
             if state == STATE_SETTINGS:
@@ -2067,10 +2928,7 @@ while running:
             if state == STATE_COUNTDOWN:
                 countdown_start_ms = now
             if state == STATE_BG:
-                bg_switch_start_ms = now
-                bg_scroll_num = 0
-                snap_dino_to_ground(bg_index)
-                obstacles.reset(bg_index, now, dino_safe_right_px=dino_safe_right_px(), start_visible=True)
+                start_run()
 
     elif state == STATE_LOAD:
         set_hand_cursor(False)
@@ -2086,22 +2944,104 @@ while running:
 
     elif state == STATE_BG:
         set_hand_cursor(False)
-        draw_game_world(screen)
-        draw_bg_timer(screen, now)
+        if texture_backend is not None:
+            frame_dst = texture_backend
+        draw_game_world_scaled(frame_dst)
+        phase_timer.mark("draw")
+        draw_bg_timer(frame_dst)
         pause_hovered = pause_button_rect.collidepoint(pygame.mouse.get_pos())
-        draw_pause_button(screen, hovered=pause_hovered)
+        draw_pause_button(frame_dst, hovered=pause_hovered)
+        phase_timer.mark("hud")
+
+    phase_timer.mark("draw")
+    perf_overlay.draw(frame_dst, phase_timer, state, now, frame_budget_ms())
+    if memory_overlay is not None:
+        memory_overlay.draw(frame_dst, lambda: memory_report_text("\t"), now)
+    phase_timer.mark("overlay")
 
     # =====================
     # RYSUJ WŁASNY KURSOR NA WIERZCHU
     # =====================
-    if cursor_img is not None:
+    cursor_sample_t = time.perf_counter()
+    if cursor_img is not None and not cursor_hw_active:
         mx, my = pygame.mouse.get_pos()
         hx, hy = cursor_hotspot
-        screen.blit(cursor_img, (mx - hx, my - hy))
-
-    pygame.display.flip()
-
-# utrwal ustawienia przy zamykaniu gry
+        frame_dst.blit(cursor_img, (mx - hx, my - hy))
+        cursor_stats["blit_ms_total"] += (time.perf_counter() - cursor_sample_t) * 1000.0
+    phase_timer.mark("cursor")
+
+    frame_work_ms = (time.perf_counter() - frame_start_t) * 1000.0
+    present_frame(frame_dst)
+    cursor_stats["sample_to_flip_ms_total"] += (time.perf_counter() - cursor_sample_t) * 1000.0
+    cursor_stats["frames"] += 1
+    phase_timer.mark("flip")
+    frame_gc_ms = gc_controller.take_frame_ms()
+    phase_timer.end_frame(dt, frame_gc_ms)
+    if telemetry is not None:
+        telemetry.frame(dt, frame_work_ms, state)
+    # intro: klatki z porcjami ładowania startowego są długie z założenia (obraz stoi)
+    if hitch_recorder is not None and state != STATE_INTRO:
+        if hitch_recorder.check(frame_start_t, time.perf_counter(), frame_budget_ms(), hitch_snapshot):
+            log.debug("zacięcie klatki w stanie %s (%d w sesji)", state, hitch_recorder.hitches)
+
+    # governor jakości patrzy tylko na klatki rozgrywki
+    if quality_governor is not None and state == STATE_BG:
+        # budżet może się zmienić po pomiarze odświeżania / wykryciu braku vsync
+        quality_governor.set_budget(frame_budget_ms())
+        if prev_frame_state != STATE_BG:
+            quality_governor.reset_window()
+        else:
+            new_level = quality_governor.observe(dt, frame_work_ms, now)
+            if new_level is not None:
+                apply_quality_level(new_level)
+    if state != prev_frame_state:
+        if tracer is not None:
+            tracer.instant("state", "transition", {"from": prev_frame_state, "to": state})
+        if telemetry is not None:
+            telemetry.event("state", src=prev_frame_state, dst=state)
+        if state == STATE_BG:
+            gc_controller.enter_gameplay()
+        elif prev_frame_state == STATE_BG:
+            gc_controller.leave_gameplay()
+        if state in GC_COLLECT_STATES:
+            gc_controller.collect()
+        if py_heap is not None and state == STATE_LOAD:
+            # granica sesji: nowa gra - przyrost pamięci Pythona od poprzedniej
+            py_heap_growth = py_heap.checkpoint()
+            for line in py_heap_growth:
+                log.info("tracemalloc: %s", line)
+    prev_frame_state = state
+    idle_wait = idle_wait_ms(now)
+
+# utrwal ustawienia przy zamykaniu gry (czekamy na zapis w tle)
 save_user_settings()
+settings_store.close()
+log.info(settings_store.report())
+end_run(OUTCOME_ABANDONED)
+if replay_file is not None:
+    replay_file.close()
+if telemetry is not None:
+    telemetry.close()
+background_writer.close()
+log.info(background_writer.report())
+if telemetry is not None:
+    log.info(telemetry.report())
+if run_history is not None:
+    run_history.close()
+    log.info(run_history.report())
+for path in state_profiler.stop():
+    log.info("profil: %s", path)
+log.info(cursor_report())
+log.info(frame_pacer.report())
+log.info(idle_report())
+log.info(gc_controller.report())
+if blit_auditor is not None:
+    log.info("%s", blit_auditor.report())
+if stack_sampler is not None:
+    stack_sampler.stop()
+    log.info("próbki stosu: %d, zacięć: %d, zapisanych: %d", stack_sampler.taken, hitch_recorder.hitches, hitch_recorder.dumps)
+if tracer is not None:
+    tracer.close()
+    log.info("ślad zapisany: %s (%d zdarzeń, pominiętych %d)", tracer.path, tracer.written, tracer.dropped)
 pygame.quit()
 sys.exit()
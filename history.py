@@ -0,0 +1,227 @@
+# history.py
+"""Historia biegów i ranking w SQLite (history.db w folderze ustawień).
+
+Pętla gry tylko dopisuje bieg do listy w pamięci (RunHistory.record); wątek
+w tle zapisuje zebrane biegi jedną transakcją i po każdej porcji odświeża
+migawkę najlepszych wyników. Nakładka końca gry czyta tę migawkę (razem
+z biegami jeszcze niezapisanymi) - żadnego zapytania w klatce.
+
+Baza w trybie WAL: odczyt z innego procesu (`python history.py`) nie czeka na
+zapis gry. Indeksy po czasie przeżycia i po ziarnie - ranking i biegi danego
+ziarna to przejście indeksu, bez sortowania całej tabeli."""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+log = logging.getLogger("dino_runner.history")
+
+HISTORY_FILENAME = "history.db"
+SCHEMA_VERSION = 1
+LEADERBOARD_SIZE = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    ended_at REAL NOT NULL,
+    seed INTEGER NOT NULL,
+    time_ms INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    frames INTEGER NOT NULL,
+    outcome INTEGER NOT NULL,
+    obstacle TEXT NOT NULL DEFAULT '',
+    replay TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS runs_by_time ON runs (time_ms DESC);
+CREATE INDEX IF NOT EXISTS runs_by_seed ON runs (seed, time_ms DESC);
+"""
+
+_COLUMNS = "ended_at, seed, time_ms, level, frames, outcome, obstacle, replay"
+
+
+@dataclass(frozen=True)
+class RunRecord:
+    ended_at: float     # time.time() końca biegu
+    seed: int
+    time_ms: int        # czas przeżycia (czas biegu, bez pauz)
+    level: int
+    frames: int
+    outcome: int        # replay.OUTCOME_*
+    obstacle: str = ""  # nazwa obrazu przeszkody przy kolizji
+    replay: str = ""    # nazwa pliku powtórki (jeśli nagrywana)
+
+    def row(self) -> tuple:
+        return (self.ended_at, self.seed, self.time_ms, self.level, self.frames,
+                self.outcome, self.obstacle, self.replay)
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """Połączenie z bazą historii (tworzy schemat przy pierwszym użyciu)."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    conn = sqlite3.connect(path, timeout=2.0)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+        with conn:
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+    return conn
+
+
+def top_runs(conn: sqlite3.Connection, limit: int, seed: Optional[int] = None) -> List[RunRecord]:
+    """Najdłuższe biegi (opcjonalnie tylko z danym ziarnem) - z indeksu, najlepsze pierwsze."""
+    if seed is None:
+        rows = conn.execute(f"SELECT {_COLUMNS} FROM runs ORDER BY time_ms DESC LIMIT ?", (limit,))
+    else:
+        rows = conn.execute(
+            f"SELECT {_COLUMNS} FROM runs WHERE seed = ? ORDER BY time_ms DESC LIMIT ?", (seed, limit)
+        )
+    return [RunRecord(*row) for row in rows]
+
+
+def _best_first(records: List[RunRecord]) -> List[RunRecord]:
+    return sorted(records, key=lambda r: (-r.time_ms, r.ended_at))
+
+
+class RunHistory:
+    """Zapis biegów w osobnym wątku (własne połączenie SQLite) + migawka rankingu."""
+    BATCH_DELAY_S = 0.5       # biegi z tego okna idą jedną transakcją
+    PENDING_MAX = 1000        # baza niedostępna: starsze niezapisane biegi przepadają
+    CLOSE_TIMEOUT_S = 3.0
+
+    def __init__(self, path: str, top_n: int = LEADERBOARD_SIZE):
+        self.path = path
+        self.top_n = top_n
+        self._cond = threading.Condition()
+        self._pending: List[RunRecord] = []
+        self._inflight: List[RunRecord] = []   # wzięte przez wątek, jeszcze nie w migawce
+        self._top: List[RunRecord] = []
+        self._closing = False
+
+        self.inserted = 0
+        self.batches = 0
+        self.dropped = 0
+        self.failures = 0
+        self.max_batch_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+
+    def record(self, run: RunRecord):
+        """Nie blokuje: bieg czeka w pamięci na zapis w tle."""
+        with self._cond:
+            if len(self._pending) >= self.PENDING_MAX:
+                del self._pending[0]
+                self.dropped += 1
+            self._pending.append(run)
+            self._cond.notify()
+
+    def leaderboard(self) -> List[RunRecord]:
+        """Najlepsze biegi: migawka z bazy + biegi jeszcze niezapisane (bez zapytań)."""
+        with self._cond:
+            records = self._top + self._inflight + self._pending
+        return _best_first(records)[:self.top_n]
+
+    def close(self):
+        """Zapisuje to, co czeka, i kończy wątek."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join(self.CLOSE_TIMEOUT_S)
+        if self._thread.is_alive():
+            log.warning("zapis historii nie zakończył się w %.0f s", self.CLOSE_TIMEOUT_S)
+
+    def _run(self):
+        conn = None
+        try:
+            conn = connect(self.path)
+            top = top_runs(conn, self.top_n)
+            with self._cond:
+                self._top = top
+        except sqlite3.Error as e:
+            self.failures += 1
+            log.warning("nie można otworzyć historii %s: %s", self.path, e)
+
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if not self._pending:
+                    break
+                if not self._closing:
+                    self._cond.wait(self.BATCH_DELAY_S)
+                batch, self._pending = self._pending, []
+                self._inflight = batch
+            top = self._insert(conn, batch)
+            with self._cond:
+                if top is not None:
+                    self._top = top
+                else:
+                    # bez bazy ranking zostaje w pamięci (do końca sesji)
+                    self._top = _best_first(self._top + batch)[:self.top_n]
+                self._inflight = []
+
+        if conn is not None:
+            conn.close()
+
+    def _insert(self, conn: Optional[sqlite3.Connection], batch: List[RunRecord]) -> Optional[List[RunRecord]]:
+        if conn is None:
+            return None
+        t0 = time.perf_counter()
+        try:
+            with conn:
+                conn.executemany(
+                    f"INSERT INTO runs ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [r.row() for r in batch],
+                )
+            top = top_runs(conn, self.top_n)
+        except sqlite3.Error as e:
+            self.failures += 1
+            log.warning("nie można zapisać historii %s: %s", self.path, e)
+            return None
+        self.inserted += len(batch)
+        self.batches += 1
+        self.max_batch_ms = max(self.max_batch_ms, (time.perf_counter() - t0) * 1000.0)
+        return top
+
+    def report(self) -> str:
+        return (
+            f"historia: {self.inserted} biegów w {self.batches} transakcjach, "
+            f"maks {self.max_batch_ms:.1f} ms, pominiętych {self.dropped}, błędów {self.failures}"
+        )
+
+
+def _format_record(i: int, r: RunRecord) -> str:
+    when = time.strftime("%Y-%m-%d %H:%M", time.localtime(r.ended_at))
+    return (
+        f"{i:3d}. {r.time_ms / 1000.0:7.2f} s  level {r.level}  ziarno {r.seed:08x}  {when}"
+        f"  {r.obstacle or '-'}  {r.replay}"
+    )
+
+
+def main(argv: List[str]) -> int:
+    ap = argparse.ArgumentParser(description="Najlepsze biegi z historii gry.")
+    ap.add_argument("db", metavar="history.db")
+    ap.add_argument("-n", type=int, default=20, help="ile biegów (domyślnie 20)")
+    ap.add_argument("--seed", type=lambda s: int(s, 16), metavar="HEX", help="tylko biegi z tym ziarnem")
+    args = ap.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"{args.db}: brak pliku")
+        return 1
+    conn = connect(args.db)
+    try:
+        for i, r in enumerate(top_runs(conn, args.n, args.seed), 1):
+            print(_format_record(i, r))
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,558 @@
+# perf.py
+import gc
+import logging
+import time
+from array import array
+from collections import deque
+from typing import Deque, Dict, Iterator, List, Optional, Tuple
+
+log = logging.getLogger("dino_runner.perf")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentyl z posortowanej listy (q w zakresie 0..1)."""
+    if not values:
+        return 0.0
+    idx = int(round(q * (len(values) - 1)))
+    return values[max(0, min(len(values) - 1, idx))]
+
+
+class QualityGovernor:
+    """Stopniowo obniża / podnosi poziom jakości na podstawie czasów klatek.
+
+    Poziom 0 = pełna jakość; im wyższy, tym taniej (co oznacza dany poziom,
+    decyduje gra). W dół schodzimy szybko, gdy budżet klatki jest przekraczany,
+    w górę wracamy dopiero po dłuższym okresie zapasu - a jeśli zaraz potem
+    znowu trzeba zejść, następna próba w górę czeka dwa razy dłużej."""
+
+    WINDOW_FRAMES = 60
+    OVER_BUDGET_FRAC = 0.25       # tyle klatek z okna może przekroczyć budżet
+    MISSED_FRAME_RATIO = 1.25     # dt > budżet * 1.25 = zgubiona klatka
+    WORK_HIGH_RATIO = 0.95        # praca > 95% budżetu = brak zapasu
+    WORK_LOW_RATIO = 0.60         # praca (p90) < 60% budżetu = zapas
+    DOWN_COOLDOWN_MS = 1500
+    UP_HOLD_MS = 4000
+    UP_HOLD_MAX_MS = 30000
+    QUICK_REVERSAL_MS = 5000
+
+    def __init__(self, max_level: int, budget_ms: float, name: str = "quality"):
+        self.max_level = max(0, int(max_level))
+        self.budget_ms = float(budget_ms)
+        self.name = name
+        self.level = 0
+
+        self._dt: Deque[float] = deque(maxlen=self.WINDOW_FRAMES)
+        self._work: Deque[float] = deque(maxlen=self.WINDOW_FRAMES)
+        self._last_change_ms: Optional[int] = None
+        self._last_up_ms: Optional[int] = None
+        self._headroom_since_ms: Optional[int] = None
+        self._up_hold_ms = self.UP_HOLD_MS
+
+    def set_budget(self, budget_ms: float):
+        budget_ms = float(budget_ms)
+        if abs(budget_ms - self.budget_ms) > 0.05:
+            log.info("%s: budżet klatki %.2f -> %.2f ms", self.name, self.budget_ms, budget_ms)
+            self.budget_ms = budget_ms
+            self.reset_window()
+
+    def reset_window(self):
+        """Po pauzie / zmianie stanu - stare próbki nie mówią nic o bieżącej scenie."""
+        self._dt.clear()
+        self._work.clear()
+        self._headroom_since_ms = None
+
+    def observe(self, dt_ms: float, work_ms: float, now_ms: int) -> Optional[int]:
+        """Dodaje próbkę klatki. Zwraca nowy poziom, jeśli się zmienił."""
+        self._dt.append(float(dt_ms))
+        self._work.append(float(work_ms))
+        if len(self._dt) < self._dt.maxlen:
+            return None
+
+        budget = self.budget_ms
+        over = 0
+        for dt, work in zip(self._dt, self._work):
+            if dt > budget * self.MISSED_FRAME_RATIO or work > budget * self.WORK_HIGH_RATIO:
+                over += 1
+
+        since_change = None if self._last_change_ms is None else now_ms - self._last_change_ms
+
+        if over > len(self._dt) * self.OVER_BUDGET_FRAC:
+            self._headroom_since_ms = None
+            if self.level < self.max_level and (since_change is None or since_change >= self.DOWN_COOLDOWN_MS):
+                if self._last_up_ms is not None and now_ms - self._last_up_ms < self.QUICK_REVERSAL_MS:
+                    self._up_hold_ms = min(self.UP_HOLD_MAX_MS, self._up_hold_ms * 2)
+                return self._change(self.level + 1, now_ms, over)
+            return None
+
+        work_p90 = percentile(sorted(self._work), 0.90)
+        if self.level > 0 and work_p90 < budget * self.WORK_LOW_RATIO:
+            if self._headroom_since_ms is None:
+                self._headroom_since_ms = now_ms
+            elif now_ms - self._headroom_since_ms >= self._up_hold_ms:
+                self._last_up_ms = now_ms
+                return self._change(self.level - 1, now_ms, over)
+        else:
+            self._headroom_since_ms = None
+        return None
+
+    def _change(self, level: int, now_ms: int, over: int) -> int:
+        old = self.level
+        self.level = max(0, min(self.max_level, int(level)))
+        work_p90 = percentile(sorted(self._work), 0.90)
+        log.info(
+            "%s: poziom %d -> %d (praca p90 %.2f ms, klatek ponad budżet %d/%d, budżet %.2f ms)",
+            self.name, old, self.level, work_p90, over, len(self._dt), self.budget_ms,
+        )
+        self._last_change_ms = now_ms
+        self._headroom_since_ms = None
+        self.reset_window()
+        return self.level
+
+
+class FramePacer:
+    """Zastępuje Clock.tick / tick_busy_loop.
+
+    Bez vsync: śpi (time.sleep) większość interwału klatki, a kręci się w pętli
+    tylko przez ostatni ułamek milisekundy - margines dobierany z mierzonego
+    spóźnienia sleep(). Z vsync: nie czeka sam, tylko mierzy odstępy między
+    klatkami, szacuje rzeczywiste odświeżanie i wykrywa, że vsync po cichu nie
+    działa (klatki szybsze niż jakikolwiek realny ekran albo odstępy niezwiązane
+    z odświeżaniem) - wtedy przechodzi na własne odmierzanie w target_fps.
+    Sprawdzenie powtarza się co VSYNC_RECHECK_FRAMES klatek (np. inny monitor)."""
+
+    HISTORY_FRAMES = 240
+    VSYNC_CHECK_FRAMES = 120
+    VSYNC_RECHECK_FRAMES = 1800
+    VSYNC_MIN_PLAUSIBLE_MS = 3.0    # ~333 Hz; szybciej = vsync nie blokuje
+    VSYNC_PERIOD_Q = 0.10           # okres odświeżania = dolny percentyl odstępów
+    VSYNC_GRID_TOL = 0.15           # odstęp w tej części okresu od jego wielokrotności...
+    VSYNC_MIN_ON_GRID = 0.75        # ...dla co najmniej takiej części klatek
+    SPIN_MARGIN_MIN_S = 0.0002
+    SPIN_MARGIN_MAX_S = 0.002
+
+    def __init__(self, target_fps: int, vsync: bool):
+        self.target_fps = max(1, int(target_fps))
+        self.interval_s = 1.0 / self.target_fps
+        self.vsync_requested = bool(vsync)
+        self.vsync_ok = bool(vsync)
+        self._next_vsync_check = self.VSYNC_CHECK_FRAMES
+
+        self._intervals: Deque[float] = deque(maxlen=self.HISTORY_FRAMES)
+        self._oversleep: Deque[float] = deque(maxlen=64)
+        self._spin_margin_s = 0.001
+        self._last_t: Optional[float] = None
+        self._deadline: Optional[float] = None
+        self._carry_ms = 0.0
+        self.measured_refresh_hz: Optional[float] = None
+
+        self.sleep_s_total = 0.0
+        self.spin_s_total = 0.0
+        self.frames = 0
+
+    @property
+    def pacing(self) -> bool:
+        return not self.vsync_ok
+
+    def _wait_until(self, deadline: float):
+        now = time.perf_counter()
+        remaining = deadline - now
+        if remaining > self._spin_margin_s:
+            want = remaining - self._spin_margin_s
+            t0 = time.perf_counter()
+            time.sleep(want)
+            slept = time.perf_counter() - t0
+            self.sleep_s_total += slept
+            self._oversleep.append(max(0.0, slept - want))
+            if len(self._oversleep) >= 16:
+                worst = sorted(self._oversleep)[int(len(self._oversleep) * 0.95) - 1]
+                self._spin_margin_s = min(self.SPIN_MARGIN_MAX_S, max(self.SPIN_MARGIN_MIN_S, worst + 0.0002))
+        t0 = time.perf_counter()
+        while time.perf_counter() < deadline:
+            pass
+        self.spin_s_total += time.perf_counter() - t0
+
+    def tick(self) -> int:
+        """Czeka do następnej klatki (bez vsync) i zwraca dt w ms, jak Clock.tick()."""
+        if self.pacing and self._deadline is not None:
+            self._wait_until(self._deadline)
+
+        now = time.perf_counter()
+        if self._last_t is None:
+            self._last_t = now
+            self._deadline = now + self.interval_s
+            return 0
+
+        interval = now - self._last_t
+        self._last_t = now
+        self._intervals.append(interval)
+        self.frames += 1
+
+        if self.pacing:
+            self._deadline += self.interval_s
+            # po długiej klatce nie nadrabiamy serią - zaczynamy odliczanie od teraz
+            if self._deadline < now:
+                self._deadline = now + self.interval_s
+        elif self.frames >= self._next_vsync_check and len(self._intervals) >= self.VSYNC_CHECK_FRAMES:
+            self._next_vsync_check = self.frames + self.VSYNC_RECHECK_FRAMES
+            self._check_vsync()
+
+        self._carry_ms += interval * 1000.0
+        dt_ms = int(self._carry_ms)
+        self._carry_ms -= dt_ms
+        return dt_ms
+
+    def resync(self):
+        """Po celowej przerwie (czekanie na zdarzenie): następny tick() zwraca 0
+        i nie liczy przerwy jako odstępu klatki."""
+        self._last_t = None
+        self._deadline = None
+        self._carry_ms = 0.0
+
+    @classmethod
+    def judge_vsync(cls, intervals_ms: List[float]) -> Tuple[bool, float, str]:
+        """(vsync działa?, okres odświeżania [ms], powód gdy nie).
+
+        Przy vsync każdy odstęp klatek to wielokrotność okresu odświeżania - klatka,
+        która nie zdążyła, czeka na następne - więc opuszczone odświeżenia są
+        normalne. Okres to dolny percentyl, bo spóźnienia odstępy tylko wydłużają."""
+        vals = sorted(intervals_ms)
+        if not vals:
+            return False, 0.0, "brak pomiarów"
+        median = percentile(vals, 0.5)
+        period = percentile(vals, cls.VSYNC_PERIOD_Q)
+        if median < cls.VSYNC_MIN_PLAUSIBLE_MS:
+            return False, period, f"mediana odstępu klatek {median:.2f} ms"
+        if period < cls.VSYNC_MIN_PLAUSIBLE_MS:
+            return False, period, f"najkrótsze odstępy {period:.2f} ms"
+        per_refresh = sorted(v / round(v / period) for v in vals if abs(v / period - round(v / period)) <= cls.VSYNC_GRID_TOL)
+        on_grid = len(per_refresh) / len(vals)
+        if on_grid < cls.VSYNC_MIN_ON_GRID:
+            return False, period, f"tylko {on_grid:.0%} odstępów to wielokrotności {period:.2f} ms"
+        return True, percentile(per_refresh, 0.5), ""
+
+    def disable_vsync(self, reason: str, swap_ms: float = 0.0):
+        """Przejście na własne tempo (vsync zgłoszony, ale flip nie czeka w rytmie ekranu).
+
+        swap_ms: mediana odstępu, jeśli flip jednak blokuje - tempo nie szybsze niż on,
+        inaczej pacer odmierzałby klatki, których swap i tak nie przepuści."""
+        if not self.vsync_ok:
+            return
+        self.vsync_ok = False
+        if swap_ms > self.interval_s * 1000.0:
+            self.interval_s = swap_ms / 1000.0
+        self._deadline = time.perf_counter() + self.interval_s
+        log.warning("vsync nie działa (%s) - własne tempo %.0f FPS", reason, 1.0 / self.interval_s)
+
+    def _check_vsync(self):
+        intervals_ms = [v * 1000.0 for v in self._intervals]
+        ok, period_ms, reason = self.judge_vsync(intervals_ms)
+        if not ok:
+            self.disable_vsync(reason, swap_ms=percentile(sorted(intervals_ms), 0.5))
+            return
+        hz = 1000.0 / period_ms
+        if self.measured_refresh_hz is None or abs(hz - self.measured_refresh_hz) > self.measured_refresh_hz * 0.02:
+            log.info("vsync działa, zmierzone odświeżanie %.1f Hz", hz)
+        self.measured_refresh_hz = hz
+
+    def frame_budget_ms(self, default_refresh_hz: float) -> float:
+        """Budżet klatki: interwał własnego tempa albo zmierzone odświeżanie (vsync)."""
+        if self.pacing:
+            return 1000.0 * self.interval_s
+        hz = self.measured_refresh_hz or float(default_refresh_hz)
+        return 1000.0 / hz
+
+    def report(self) -> str:
+        st = self.stats()
+        return (
+            f"tempo klatek [{st['mode']}]: {st['fps']:.1f} FPS, średnio {st['avg_ms']:.2f} ms, "
+            f"p99 {st['p99_ms']:.2f} ms, jitter {st['jitter_ms']:.2f} ms, "
+            f"sen {st['sleep_ms_total']:.0f} ms / spin {st['spin_ms_total']:.0f} ms"
+        )
+
+    def stats(self) -> dict:
+        vals = sorted(self._intervals)
+        n = len(vals)
+        mean = sum(vals) / n if n else 0.0
+        var = sum((v - mean) ** 2 for v in vals) / n if n else 0.0
+        return {
+            "mode": "paced" if self.pacing else "vsync",
+            "vsync_requested": self.vsync_requested,
+            "vsync_ok": self.vsync_ok,
+            "fps": (1.0 / mean) if mean > 0 else 0.0,
+            "avg_ms": mean * 1000.0,
+            "p50_ms": percentile(vals, 0.50) * 1000.0,
+            "p99_ms": percentile(vals, 0.99) * 1000.0,
+            "jitter_ms": (var ** 0.5) * 1000.0,
+            "refresh_hz": self.measured_refresh_hz,
+            "spin_margin_ms": self._spin_margin_s * 1000.0,
+            "sleep_ms_total": self.sleep_s_total * 1000.0,
+            "spin_ms_total": self.spin_s_total * 1000.0,
+            "frames": self.frames,
+        }
+
+
+class RingBuffer:
+    """Bufor cykliczny stałego rozmiaru na próbki float (bez alokacji po starcie)."""
+
+    def __init__(self, size: int):
+        self.size = max(1, int(size))
+        self._data = array("d", bytes(8 * self.size))
+        self._idx = 0
+        self.count = 0
+
+    def append(self, value: float):
+        self._data[self._idx] = value
+        self._idx = (self._idx + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+
+    def last(self, default: float = 0.0) -> float:
+        if not self.count:
+            return default
+        return self._data[(self._idx - 1) % self.size]
+
+    def values(self) -> List[float]:
+        """Próbki od najstarszej do najnowszej."""
+        if self.count < self.size:
+            return list(self._data[:self.count])
+        return list(self._data[self._idx:]) + list(self._data[:self._idx])
+
+    def clear(self):
+        self._idx = 0
+        self.count = 0
+
+
+class PhaseTimer:
+    """Czasy faz pętli głównej, osobny zestaw buforów dla każdego stanu gry.
+
+    mark(faza) przypisuje fazie czas od poprzedniego znacznika (w tej samej
+    klatce można oznaczyć fazę kilka razy - czasy się sumują). end_frame()
+    zapisuje wszystkie fazy klatki, jej łączny czas pracy i odstęp dt.
+    Jeśli ustawiony jest tracer (diag.TraceWriter), każda faza i klatka
+    trafia też do śladu jako zdarzenie z czasem trwania."""
+
+    PHASES = ("events", "logic", "obstacles", "collision", "draw", "hud", "overlay", "cursor", "flip")
+    HISTORY_FRAMES = 300
+
+    def __init__(self, history: int = HISTORY_FRAMES):
+        self.history = int(history)
+        self._buffers: dict = {}
+        self._frame = {p: 0.0 for p in self.PHASES}
+        self._state: Optional[str] = None
+        self._frame_t0 = 0.0
+        self._last_t = 0.0
+        self.tracer = None
+
+    def _state_buffers(self, state: str) -> dict:
+        bufs = self._buffers.get(state)
+        if bufs is None:
+            bufs = {name: RingBuffer(self.history) for name in self.PHASES + ("total", "dt", "gc")}
+            self._buffers[state] = bufs
+        return bufs
+
+    def begin_frame(self, state: str):
+        self._state = state
+        self._frame_t0 = self._last_t = time.perf_counter()
+        for p in self._frame:
+            self._frame[p] = 0.0
+
+    def mark(self, phase: str):
+        t = time.perf_counter()
+        self._frame[phase] += (t - self._last_t) * 1000.0
+        if self.tracer is not None:
+            self.tracer.complete(phase, "phase", self._last_t, t - self._last_t)
+        self._last_t = t
+
+    def end_frame(self, dt_ms: float, gc_ms: float = 0.0):
+        """gc_ms: przerwy GC w tej klatce (zawierają się już w czasach faz)."""
+        if self._state is None:
+            return
+        bufs = self._state_buffers(self._state)
+        for p, v in self._frame.items():
+            bufs[p].append(v)
+        bufs["total"].append((self._last_t - self._frame_t0) * 1000.0)
+        bufs["dt"].append(float(dt_ms))
+        bufs["gc"].append(float(gc_ms))
+        if self.tracer is not None:
+            self.tracer.complete("frame", "frame", self._frame_t0, self._last_t - self._frame_t0,
+                                 {"state": self._state, "dt_ms": dt_ms})
+
+    def last_frame(self) -> dict:
+        """Fazy ostatniej (albo bieżącej) klatki w ms."""
+        return {p: round(v, 3) for p, v in self._frame.items()}
+
+    def states(self) -> List[str]:
+        return list(self._buffers)
+
+    def series(self, state: str, name: str) -> List[float]:
+        bufs = self._buffers.get(state)
+        return bufs[name].values() if bufs else []
+
+    def summary(self, state: str) -> dict:
+        """Średnie faz + percentyle łącznego czasu klatki dla stanu."""
+        bufs = self._buffers.get(state)
+        if not bufs or not bufs["total"].count:
+            return {}
+        out = {"frames": bufs["total"].count}
+        for p in self.PHASES + ("gc",):
+            vals = bufs[p].values()
+            out[p] = sum(vals) / len(vals)
+        total = sorted(bufs["total"].values())
+        out["p50"] = percentile(total, 0.50)
+        out["p95"] = percentile(total, 0.95)
+        out["p99"] = percentile(total, 0.99)
+        return out
+
+
+class GcController:
+    """Sterowanie cyklicznym GC i pomiar jego przerw.
+
+    - freeze_startup(): po załadowaniu zasobów przenosi wszystkie obiekty do
+      generacji stałej (gc.freeze), żeby pełne kolekcje ich nie przeglądały,
+    - enter_gameplay() / leave_gameplay(): w rozgrywce odsuwa kolekcje gen2
+      (wysoki próg), gen0/gen1 działają normalnie,
+    - collect(): pełna kolekcja w momencie, gdy przerwa nie boli (pauza,
+      koniec gry, ekrany przejściowe).
+    Każda przerwa GC (gc.callbacks) jest liczona do bieżącej klatki
+    (take_frame_ms) i - jeśli ustawiony jest tracer - trafia do śladu."""
+
+    GAMEPLAY_GEN2_THRESHOLD = 1000
+    HISTORY = 512
+
+    def __init__(self, manage: bool = True):
+        self.manage = bool(manage)
+        self.tracer = None
+        self.in_gameplay = False
+        self._saved_threshold: Optional[tuple] = None
+        self._t0 = 0.0
+        self._frame_ms = 0.0
+        self.pauses = {gen: RingBuffer(self.HISTORY) for gen in range(3)}
+        self.counts = [0, 0, 0]
+        self.gameplay_counts = [0, 0, 0]
+        self.max_ms = [0.0, 0.0, 0.0]
+        self.forced = 0
+        gc.callbacks.append(self._callback)
+
+    def _callback(self, phase: str, info: dict):
+        if phase == "start":
+            self._t0 = time.perf_counter()
+            return
+        t1 = time.perf_counter()
+        ms = (t1 - self._t0) * 1000.0
+        gen = int(info.get("generation", 0))
+        self._frame_ms += ms
+        self.pauses[gen].append(ms)
+        self.counts[gen] += 1
+        if self.in_gameplay:
+            self.gameplay_counts[gen] += 1
+        if ms > self.max_ms[gen]:
+            self.max_ms[gen] = ms
+        if self.tracer is not None:
+            self.tracer.complete(f"gc gen{gen}", "gc", self._t0, t1 - self._t0,
+                                 {"collected": info.get("collected", 0), "gameplay": self.in_gameplay})
+
+    def take_frame_ms(self) -> float:
+        """Suma przerw GC od poprzedniego wywołania (czyli w ostatniej klatce)."""
+        ms = self._frame_ms
+        self._frame_ms = 0.0
+        return ms
+
+    def freeze_startup(self):
+        if not self.manage:
+            return
+        gc.collect()
+        gc.freeze()
+        log.info("gc: zamrożono %d obiektów po starcie", gc.get_freeze_count())
+
+    def enter_gameplay(self):
+        self.in_gameplay = True
+        if not self.manage or self._saved_threshold is not None:
+            return
+        self._saved_threshold = gc.get_threshold()
+        g0, g1, _g2 = self._saved_threshold
+        gc.set_threshold(g0, g1, self.GAMEPLAY_GEN2_THRESHOLD)
+
+    def leave_gameplay(self):
+        self.in_gameplay = False
+        if self._saved_threshold is not None:
+            gc.set_threshold(*self._saved_threshold)
+            self._saved_threshold = None
+
+    def collect(self):
+        if not self.manage:
+            return
+        gc.collect()
+        self.forced += 1
+
+    def report(self) -> str:
+        parts = []
+        for gen in range(3):
+            vals = sorted(self.pauses[gen].values())
+            parts.append(
+                f"gen{gen}: {self.counts[gen]}x (w grze {self.gameplay_counts[gen]}), "
+                f"p99 {percentile(vals, 0.99):.2f} ms, maks {self.max_ms[gen]:.2f} ms"
+            )
+        return "gc: " + "; ".join(parts) + f"; wymuszonych kolekcji {self.forced}"
+
+
+class IncrementalLoader:
+    """Ładowanie rozłożone na klatki: generatory kroków (każdy yield = nazwa
+    ukończonego kroku) wykonywane po kolei, porcjami mieszczącymi się w budżecie
+    czasu. Krok dłuższy niż budżet i tak wykona się w całości - kroki mają być drobne."""
+
+    def __init__(self, t0: Optional[float] = None):
+        self._queue: Deque[Iterator[str]] = deque()
+        self.t0 = time.perf_counter() if t0 is None else t0   # początek startu (do raportu)
+        self.tracer = None
+        self.done = False
+        self.first_frame_ms: Optional[float] = None
+        self.ready_ms: Optional[float] = None
+        self.step_ms: Dict[str, float] = {}
+        self.busy_ms = 0.0
+        self.slices = 0
+
+    def add(self, steps: Iterator[str]):
+        self._queue.append(steps)
+        self.done = False
+
+    def mark_first_frame(self):
+        self.first_frame_ms = (time.perf_counter() - self.t0) * 1000.0
+        if self.tracer is not None:
+            self.tracer.instant("first_frame", "startup", {"ms": round(self.first_frame_ms, 1)})
+
+    def run(self, budget_ms: float) -> bool:
+        """Kolejne kroki, dopóki nie minie budget_ms; True = wszystko gotowe."""
+        if self.done:
+            return True
+        start = time.perf_counter()
+        self.slices += 1
+        try:
+            while True:
+                if not self._queue:
+                    self.done = True
+                    self.ready_ms = (time.perf_counter() - self.t0) * 1000.0
+                    return True
+                t0 = time.perf_counter()
+                try:
+                    name = next(self._queue[0])
+                except StopIteration:
+                    self._queue.popleft()
+                    continue
+                t1 = time.perf_counter()
+                self.step_ms[name] = self.step_ms.get(name, 0.0) + (t1 - t0) * 1000.0
+                if self.tracer is not None:
+                    self.tracer.complete(name, "startup", t0, t1 - t0)
+                if (t1 - start) * 1000.0 >= budget_ms:
+                    return False
+        finally:
+            self.busy_ms += (time.perf_counter() - start) * 1000.0
+
+    def report(self, slowest: int = 3) -> str:
+        top = sorted(self.step_ms.items(), key=lambda kv: kv[1], reverse=True)[:slowest]
+        first = "-" if self.first_frame_ms is None else f"{self.first_frame_ms:.0f} ms"
+        ready = "-" if self.ready_ms is None else f"{self.ready_ms:.0f} ms"
+        return (
+            f"start: pierwsza klatka po {first}, wszystko gotowe po {ready} "
+            f"({self.busy_ms:.0f} ms ładowania w {self.slices} porcjach); najwolniejsze: "
+            + ", ".join(f"{name} {ms:.0f} ms" for name, ms in top)
+        )
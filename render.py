@@ -2,12 +2,32 @@
 import os
 import glob
 import random
+import time
 from dataclasses import dataclass
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Tuple, Optional
 
 import pygame
 
 
+def smoothscale_generic(surf: pygame.Surface, size: Tuple[int, int]) -> pygame.Surface:
+    """smoothscale zawsze backendem GENERIC.
+
+    Z tego skalowania powstają maski kolizji, więc wynik nie może zależeć od
+    backendu SIMD wybranego przez autotuner (SSE2 i NEON różnią się o piksel) -
+    inaczej powtórka z innej maszyny rozjechałaby się na pierwszej kolizji."""
+    try:
+        prev = pygame.transform.get_smoothscale_backend()
+    except Exception:
+        prev = "GENERIC"
+    if prev == "GENERIC":
+        return pygame.transform.smoothscale(surf, size)
+    pygame.transform.set_smoothscale_backend("GENERIC")
+    try:
+        return pygame.transform.smoothscale(surf, size)
+    finally:
+        pygame.transform.set_smoothscale_backend(prev)
+
+
 @dataclass
 class Variant:
     img: pygame.Surface
@@ -55,6 +75,8 @@ class Obstacle:
     foot_bottom: int
 
     pinned: bool = True
+    variant_key: Tuple[int, int, int] = (0, 0, 0)   # (tło, obraz, wysokość) - do odtworzenia ze stanu
+    pattern: str = ""   # wzorzec z _pick_pattern(); "" = przeszkoda startowa poziomu
 
 
 @dataclass
@@ -65,6 +87,67 @@ class SpawnSpec:
     prefer_narrow: bool = False
 
 
+class SurfacePool:
+    """Pula wielokrotnie używanych pełnoekranowych powierzchni w formacie ekranu.
+
+    Każde acquire() musi mieć swoje release(); powierzchnie ponad limit wolnych
+    są po zwolnieniu porzucane (licznik `dropped`)."""
+
+    def __init__(self, size: Tuple[int, int], max_free: int = 4):
+        self.size = (int(size[0]), int(size[1]))
+        self.max_free = max(0, int(max_free))
+        self._free: List[pygame.Surface] = []
+        self._in_use: Dict[int, pygame.Surface] = {}
+
+        self.created = 0
+        self.reused = 0
+        self.released = 0
+        self.dropped = 0
+        self.peak_in_use = 0
+
+    def _new_surface(self) -> pygame.Surface:
+        return pygame.Surface(self.size).convert()
+
+    def acquire(self) -> pygame.Surface:
+        if self._free:
+            surf = self._free.pop()
+            self.reused += 1
+        else:
+            surf = self._new_surface()
+            self.created += 1
+        # poprzedni użytkownik mógł ustawić alfę (fade)
+        surf.set_alpha(None)
+        self._in_use[id(surf)] = surf
+        self.peak_in_use = max(self.peak_in_use, len(self._in_use))
+        return surf
+
+    def release(self, surf: Optional[pygame.Surface]):
+        if surf is None or self._in_use.pop(id(surf), None) is None:
+            return
+        self.released += 1
+        if len(self._free) < self.max_free:
+            self._free.append(surf)
+        else:
+            self.dropped += 1
+
+    def owns(self, surf: Optional[pygame.Surface]) -> bool:
+        return surf is not None and id(surf) in self._in_use
+
+    def surfaces(self) -> List[pygame.Surface]:
+        return list(self._in_use.values()) + list(self._free)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "created": self.created,
+            "reused": self.reused,
+            "released": self.released,
+            "dropped": self.dropped,
+            "in_use": len(self._in_use),
+            "free": len(self._free),
+            "peak_in_use": self.peak_in_use,
+        }
+
+
 class ObstacleManager:
     # --- bezpieczniki układania (fix na ogromne odstępy na starcie poziomu) ---
     START_FIRST_SPAWN_MIN_MS = 300
@@ -91,7 +174,11 @@ class ObstacleManager:
         mask_alpha_threshold: int = 50,
         jump_vel_px_per_s: Optional[float] = None,
         gravity_px_per_s2: Optional[float] = None,
+        tracer=None,
+        preload: bool = True,
     ):
+        # opcjonalny diag.TraceWriter: ładowanie obrazów i chybienia cache wariantów
+        self.tracer = tracer
         self.sw, self.sh = int(screen_size[0]), int(screen_size[1])
         self.dino_h = max(1, int(dino_height_px))
         self.obstacle_dir = obstacle_dir
@@ -113,12 +200,19 @@ class ObstacleManager:
         self.jump_vel = None if jump_vel_px_per_s is None else float(jump_vel_px_per_s)
         self.gravity = None if gravity_px_per_s2 is None else float(gravity_px_per_s2)
 
-        self.raw_bank: Dict[int, List[pygame.Surface]] = self._load_raw_bank()
-        self.base_bank: Dict[int, List[pygame.Surface]] = self._build_base_bank()
+        # banki obrazów: od razu albo (preload=False) krokami z load_steps(), np. w trakcie intro
+        self.raw_bank: Dict[int, List[pygame.Surface]] = {}
+        self.base_bank: Dict[int, List[pygame.Surface]] = {}
+        if preload:
+            for _ in self.load_steps():
+                pass
         self._variant_cache: Dict[Tuple[int, int, int], Variant] = {}
+        # warstwy przeskalowane dla wewnętrznej rozdzielczości: (id(surf), skala*1000) -> (surf, scaled)
+        self._scaled_cache: Dict[Tuple[int, int], Tuple[pygame.Surface, pygame.Surface]] = {}
 
         self.bg_idx = 0
         self.obstacles: List[Obstacle] = []
+        self.hit_obstacle: Optional[Obstacle] = None   # ostatnia kolizja z collides_mask()
         self.recent_img_idx: List[int] = []
 
         self.elapsed_ms = 0
@@ -128,6 +222,12 @@ class ObstacleManager:
         self.pattern_cooldown_ms = 0
         self.last_pattern_name = ""
 
+        # jakość renderu (wyłączane przez governor jakości przy słabym CPU)
+        self.draw_highlights = True
+        self.draw_rims = True
+        # "blits" (jedna lista na warstwę) albo "blit" (pojedynczo) - wybiera autotuner
+        self.blit_strategy = "blits"
+
     # ---------- public: speed update ----------
     def set_base_speed(self, new_base_speed: float, rescale_existing: bool = True):
         new_base_speed = float(new_base_speed)
@@ -258,41 +358,67 @@ class ObstacleManager:
         src_h = max(1, surf.get_height())
         scale = target_h / float(src_h)
         target_w = max(1, int(surf.get_width() * scale))
-        return pygame.transform.smoothscale(surf, (target_w, target_h)).convert_alpha()
+        return smoothscale_generic(surf, (target_w, target_h)).convert_alpha()
+
+    SCALED_CACHE_MAX_ITEMS = 512
+
+    @staticmethod
+    def _native_layer(surf: pygame.Surface, scale: float) -> pygame.Surface:
+        return surf
+
+    def _scaled_layer(self, surf: pygame.Surface, scale: float) -> pygame.Surface:
+        key = (id(surf), int(round(scale * 1000)))
+        entry = self._scaled_cache.get(key)
+        if entry is not None:
+            return entry[1]
+        if len(self._scaled_cache) >= self.SCALED_CACHE_MAX_ITEMS:
+            self._scaled_cache.clear()
+        w = max(1, int(round(surf.get_width() * scale)))
+        h = max(1, int(round(surf.get_height() * scale)))
+        scaled = pygame.transform.smoothscale(surf, (w, h)).convert_alpha()
+        self._scaled_cache[key] = (surf, scaled)
+        return scaled
 
     # ---------- loading ----------
-    def _load_raw_bank(self) -> Dict[int, List[pygame.Surface]]:
-        bank: Dict[int, List[pygame.Surface]] = {}
-        path_bank: Dict[int, List[str]] = {}
+    def load_steps(self) -> Iterator[int]:
+        """Wczytuje bank obrazów po jednym tle; yield po każdym (indeks tła)."""
+        base_h = self._base_target_h()
         for i in range(8):
             pat = os.path.join(self.obstacle_dir, f"bg{i+1}_*.png")
-            paths = sorted(glob.glob(pat))
             imgs: List[pygame.Surface] = []
             ok_paths: List[str] = []
-            for p in paths:
+            for p in sorted(glob.glob(pat)):
+                t0 = time.perf_counter()
                 try:
                     raw = pygame.image.load(p).convert_alpha()
                     imgs.append(raw)
                     ok_paths.append(p)
                 except Exception:
                     pass
-            bank[i] = imgs
-            path_bank[i] = ok_paths
-        self.raw_paths = path_bank
-        return bank
-
-    def _build_base_bank(self) -> Dict[int, List[pygame.Surface]]:
-        base_h = self._base_target_h()
-        out: Dict[int, List[pygame.Surface]] = {}
-        for bg_idx, raws in self.raw_bank.items():
-            out[bg_idx] = [self._scale_to_h(r, base_h) for r in raws]
-        return out
+                if self.tracer is not None:
+                    self.tracer.complete(os.path.basename(p), "asset", t0, time.perf_counter() - t0)
+            self.raw_bank[i] = imgs
+            self.raw_paths[i] = ok_paths
+            self.base_bank[i] = [self._scale_to_h(r, base_h) for r in imgs]
+            yield i
 
     def _get_variant(self, bg_idx: int, img_index: int, target_h: int) -> Variant:
         key = (bg_idx, img_index, int(target_h))
-        if key in self._variant_cache:
-            return self._variant_cache[key]
+        v = self._variant_cache.get(key)
+        if v is not None:
+            return v
+
+        t0 = time.perf_counter()
+        v = self._build_variant(bg_idx, img_index, target_h)
+        self._variant_cache[key] = v
+        if self.tracer is not None:
+            self.tracer.complete(
+                "variant_miss", "cache", t0, time.perf_counter() - t0,
+                {"bg": bg_idx, "img": img_index, "h": int(target_h), "cached": len(self._variant_cache)},
+            )
+        return v
 
+    def _build_variant(self, bg_idx: int, img_index: int, target_h: int) -> Variant:
         raws = self.raw_bank.get(bg_idx, [])
         if not raws:
             dummy = pygame.Surface((1, 1), pygame.SRCALPHA)
@@ -311,7 +437,6 @@ class ObstacleManager:
                 highlight_img=None,
                 highlight_offset=(0, 0),
             )
-            self._variant_cache[key] = v
             return v
 
         src = raws[img_index]
@@ -340,7 +465,6 @@ class ObstacleManager:
             highlight_img=highlight_img,
             highlight_offset=highlight_offset,
         )
-        self._variant_cache[key] = v
         return v
 
     # ---------- difficulty / speed ----------
@@ -427,6 +551,14 @@ class ObstacleManager:
             return float(self.obstacle_scale_overrides.get(name, 1.0))
         return 1.0
 
+    def obstacle_name(self, ob: Obstacle) -> str:
+        """Nazwa pliku obrazu przeszkody (bez rozszerzenia), np. do historii biegów."""
+        bg_idx, img_idx, _h = ob.variant_key
+        paths = self.raw_paths.get(bg_idx, [])
+        if 0 <= img_idx < len(paths):
+            return os.path.splitext(os.path.basename(paths[img_idx]))[0]
+        return ""
+
     def _pick_pattern(self) -> Tuple[str, List[SpawnSpec]]:
         if self.pattern_cooldown_ms > 0:
             return "single", [SpawnSpec()]
@@ -486,6 +618,10 @@ class ObstacleManager:
         return name, specs
 
     # ---------- API ----------
+    def reseed(self, seed: int):
+        """Ziarno biegu: ten sam seed + te same dt i skoki = te same przeszkody."""
+        self.rng.seed(int(seed))
+
     def reset(self, bg_idx: int, now_ms: int, dino_safe_right_px: int, start_visible: bool = True):
         """Reset na start gry (tu difficulty wraca do 0)."""
         self.bg_idx = int(bg_idx)
@@ -597,6 +733,7 @@ class ObstacleManager:
                     prefer_narrow=spec.prefer_narrow,
                 )
                 if ob is not None:
+                    ob.pattern = pattern_name
                     spawned += 1
 
             interval = self._spawn_interval_ms()
@@ -607,9 +744,60 @@ class ObstacleManager:
             if spawned > 0:
                 self.last_pattern_name = pattern_name
 
-    def draw(self, screen: pygame.Surface):
+    def get_state(self) -> dict:
+        """Pełny stan symulacji (RNG, trudność, przeszkody) jako dane JSON - do keyframe'ów powtórek."""
+        version, internal, gauss = self.rng.getstate()
+        return {
+            "rng": [version, list(internal), gauss],
+            "bg_idx": self.bg_idx,
+            "base_speed": self.base_speed,
+            "elapsed_ms": self.elapsed_ms,
+            "difficulty": self.difficulty,
+            "level_bonus": self.level_bonus,
+            "next_spawn_ms": self.next_spawn_ms,
+            "pattern_cooldown_ms": self.pattern_cooldown_ms,
+            "last_pattern_name": self.last_pattern_name,
+            "recent_img_idx": list(self.recent_img_idx),
+            "obstacles": [[*ob.variant_key, ob.x, ob.y, ob.speed, ob.pinned, ob.pattern] for ob in self.obstacles],
+        }
+
+    def set_state(self, state: dict):
+        """Odwrotność get_state(); obrazy przeszkód z cache wariantów (banki muszą być wczytane)."""
+        version, internal, gauss = state["rng"]
+        self.rng.setstate((version, tuple(internal), gauss))
+        self.bg_idx = int(state["bg_idx"])
+        self.base_speed = float(state["base_speed"])
+        self.elapsed_ms = int(state["elapsed_ms"])
+        self.difficulty = float(state["difficulty"])
+        self.level_bonus = float(state["level_bonus"])
+        self.next_spawn_ms = int(state["next_spawn_ms"])
+        self.pattern_cooldown_ms = int(state["pattern_cooldown_ms"])
+        self.last_pattern_name = str(state["last_pattern_name"])
+        self.recent_img_idx = [int(i) for i in state["recent_img_idx"]]
+        self.obstacles = []
+        for bg_idx, img_idx, target_h, x, y, speed, pinned, pattern in state["obstacles"]:
+            key = (int(bg_idx), int(img_idx), int(target_h))
+            v = self._get_variant(*key)
+            ob = self._make_obstacle(v, key, float(x), float(y), float(speed), bool(pinned))
+            ob.pattern = str(pattern)
+            self.obstacles.append(ob)
+
+    def memory_families(self) -> Dict[str, object]:
+        """Długożyjące powierzchnie/maski do raportu pamięci (diag.memory_report)."""
+        return {
+            "raw_bank": self.raw_bank,
+            "base_bank": self.base_bank,
+            "variants": list(self._variant_cache.values()),
+            "scaled": [scaled for _src, scaled in self._scaled_cache.values()],
+        }
+
+    def cache_sizes(self) -> Dict[str, int]:
+        return {"variants": len(self._variant_cache), "scaled": len(self._scaled_cache)}
+
+    def draw(self, screen: pygame.Surface, scale: float = 1.0):
         """Render: ground shadow, soft silhouette, img, highlight (ADD), rim.
-        Sortowanie po X poprawia warstwy (bardziej "z przodu" = bardziej na prawo)."""
+        Sortowanie po X poprawia warstwy (bardziej "z przodu" = bardziej na prawo).
+        scale < 1.0: rysowanie do mniejszego bufora sceny (warstwy przeskalowane z cache)."""
         if not self.obstacles:
             return
 
@@ -621,50 +809,46 @@ class ObstacleManager:
         highlight_blits = []
         rim_blits = []
 
+        layer = self._scaled_layer if scale != 1.0 else self._native_layer
+
         for ob in obs_sorted:
             if ob.ground_shadow_img is not None:
-                gx = int(ob.x + ob.ground_shadow_offset[0])
-                gy = int(ob.y + ob.ground_shadow_offset[1])
-                ground_shadow_blits.append((ob.ground_shadow_img, (gx, gy)))
+                gx = int((ob.x + ob.ground_shadow_offset[0]) * scale)
+                gy = int((ob.y + ob.ground_shadow_offset[1]) * scale)
+                ground_shadow_blits.append((layer(ob.ground_shadow_img, scale), (gx, gy)))
 
             if ob.soft_shadow_img is not None:
-                sx = int(ob.x + ob.soft_shadow_offset[0])
-                sy = int(ob.y + ob.soft_shadow_offset[1])
-                soft_shadow_blits.append((ob.soft_shadow_img, (sx, sy)))
-
-            img_blits.append((ob.img, ob.draw_rect.topleft))
-
-            if ob.highlight_img is not None:
-                hx = int(ob.x + ob.highlight_offset[0])
-                hy = int(ob.y + ob.highlight_offset[1])
-                highlight_blits.append((ob.highlight_img, (hx, hy), None, pygame.BLEND_RGBA_ADD))
-
-            if ob.rim_img is not None:
-                rim_blits.append((ob.rim_img, ob.draw_rect.topleft))
-
-        try:
-            if ground_shadow_blits:
-                screen.blits(ground_shadow_blits)
-            if soft_shadow_blits:
-                screen.blits(soft_shadow_blits)
-            if img_blits:
-                screen.blits(img_blits)
-            if highlight_blits:
-                screen.blits(highlight_blits)
-            if rim_blits:
-                screen.blits(rim_blits)
-        except Exception:
-            for s, pos in ground_shadow_blits:
-                screen.blit(s, pos)
-            for s, pos in soft_shadow_blits:
-                screen.blit(s, pos)
-            for s, pos in img_blits:
-                screen.blit(s, pos)
-            for item in highlight_blits:
-                s, pos, _area, flags = item
-                screen.blit(s, pos, special_flags=flags)
-            for s, pos in rim_blits:
-                screen.blit(s, pos)
+                sx = int((ob.x + ob.soft_shadow_offset[0]) * scale)
+                sy = int((ob.y + ob.soft_shadow_offset[1]) * scale)
+                soft_shadow_blits.append((layer(ob.soft_shadow_img, scale), (sx, sy)))
+
+            if scale != 1.0:
+                topleft = (int(ob.draw_rect.left * scale), int(ob.draw_rect.top * scale))
+            else:
+                topleft = ob.draw_rect.topleft
+
+            img_blits.append((layer(ob.img, scale), topleft))
+
+            if ob.highlight_img is not None and self.draw_highlights:
+                hx = int((ob.x + ob.highlight_offset[0]) * scale)
+                hy = int((ob.y + ob.highlight_offset[1]) * scale)
+                highlight_blits.append((layer(ob.highlight_img, scale), (hx, hy), None, pygame.BLEND_RGBA_ADD))
+
+            if ob.rim_img is not None and self.draw_rims:
+                rim_blits.append((layer(ob.rim_img, scale), topleft))
+
+        layers = (ground_shadow_blits, soft_shadow_blits, img_blits, highlight_blits, rim_blits)
+        if self.blit_strategy == "blits":
+            try:
+                for items in layers:
+                    if items:
+                        screen.blits(items, doreturn=0)
+                return
+            except Exception:
+                pass
+        for items in layers:
+            for item in items:
+                screen.blit(*item)
 
     def collides_mask(
         self,
@@ -674,6 +858,7 @@ class ObstacleManager:
         min_overlap_pixels: int = 1,
     ) -> bool:
         dx, dy = int(dino_topleft[0]), int(dino_topleft[1])
+        self.hit_obstacle = None
 
         for ob in self.obstacles:
             if not ob.hit_rect.colliderect(dino_hit_rect):
@@ -682,6 +867,7 @@ class ObstacleManager:
             off = (int(ob.draw_rect.left - dx), int(ob.draw_rect.top - dy))
             area = dino_mask.overlap_area(ob.mask, off)
             if area >= int(min_overlap_pixels):
+                self.hit_obstacle = ob
                 return True
 
         return False
@@ -772,10 +958,14 @@ class ObstacleManager:
             if x < min_x_from_dino:
                 x = min_x_from_dino
 
-        draw_rect = v.img.get_rect(topleft=(int(x), int(y)))
-        hit_rect = self._make_hit_rect(x, y, v.bounds)
+        ob = self._make_obstacle(v, (self.bg_idx, img_idx, target_h), x, y, speed, pinned)
+        self.obstacles.append(ob)
+        return ob
 
-        ob = Obstacle(
+    def _make_obstacle(
+        self, v: Variant, key: Tuple[int, int, int], x: float, y: float, speed: float, pinned: bool
+    ) -> Obstacle:
+        return Obstacle(
             img=v.img,
             mask=v.mask,
             ground_shadow_img=v.ground_shadow_img,
@@ -788,11 +978,10 @@ class ObstacleManager:
             x=float(x),
             y=float(y),
             speed=float(speed),
-            draw_rect=draw_rect,
-            hit_rect=hit_rect,
+            draw_rect=v.img.get_rect(topleft=(int(x), int(y))),
+            hit_rect=self._make_hit_rect(x, y, v.bounds),
             bounds=v.bounds,
             foot_bottom=v.foot_bottom,
             pinned=pinned,
+            variant_key=key,
         )
-        self.obstacles.append(ob)
-        return ob
@@ -0,0 +1,577 @@
+# replay.py
+"""Powtórki biegów: ziarno RNG + (dt, skok) każdej klatki, zmiennymi długościami.
+
+Format pliku (.dreplay), same varinty (LEB128, bez znaku) po nagłówku MAGIC:
+    wersja, seed, szerokość, wysokość
+    klatki: (dt_ms << 1 | skok) + 1, ... , 0 = koniec klatek
+    wynik: outcome (1 kolizja, 2 przerwany), klatki, czas_ms, level, crc stanu
+    keyframe'y: co KEYFRAME_EVERY_MS czasu biegu pełny stan (RunSim.get_state,
+        JSON + zlib) sprzed danej klatki
+    indeks: liczba, potem (klatka, czas_ms, offset, długość) każdego keyframe'u
+    stopka (12 B): offset indeksu (uint64 LE) + INDEX_MAGIC
+Typowa klatka to jeden bajt (dt <= 62 ms), minuta gry ~3.6 KB + ~6 keyframe'ów.
+
+ReplayFile czyta plik przez mmap i przewija (seek) do dowolnej chwili:
+najbliższy wcześniejszy keyframe + symulacja reszty, zamiast od zera.
+
+Bieg jest nagrywany do <nazwa>.part przez storage.BackgroundWriter i dopiero
+po końcu zmienia nazwę, więc niedokończone nagranie nigdy nie udaje pełnego.
+Odtwarzanie to sim.RunSim karmiony zapisanymi dt - w grze (`game.py --replay
+PLIK`, w czasie rzeczywistym) albo bez okna, tak szybko jak się da:
+
+    python replay.py PLIK [PLIK ...]
+    python replay.py KATALOG -j 8 --report wyniki.json   # tysiące biegów, pula procesów
+    python replay.py PLIK --at 95.5     # stan biegu w 95,5 s (przez keyframe)
+
+Weryfikacja sprawdza zapisany wynik (kolizja i jej klatka, czas przeżycia,
+level, crc stanu) i oznacza biegi, których czas w dużej części pochodzi z klatek
+dłuższych niż limit fizyki (MAX_DT_MS_FOR_SCROLL).
+"""
+import argparse
+import bisect
+import glob
+import itertools
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+log = logging.getLogger("dino_runner.replay")
+
+MAGIC = b"DRPL"
+VERSION = 2
+INDEX_MAGIC = b"DRKI"
+FOOTER = struct.Struct("<Q4s")
+KEYFRAME_EVERY_MS = 10000
+REPLAY_EXT = ".dreplay"
+PART_EXT = ".part"
+REPLAY_FOLDER_NAME = "replays"
+REPLAY_KEEP = 200
+# granice przy odczycie: obce pliki nie mogą podać liczb, których symulacja nie uniesie
+MAX_FRAME_DT_MS = 60000
+MAX_FRAMES = 10_000_000
+
+OUTCOME_COLLISION = 1
+OUTCOME_ABANDONED = 2
+OUTCOME_NAMES = {OUTCOME_COLLISION: "kolizja", OUTCOME_ABANDONED: "przerwany"}
+
+
+class ReplayError(ValueError):
+    pass
+
+
+def write_varint(buf: bytearray, n: int):
+    n = int(n)
+    if n < 0:
+        raise ValueError("varint: liczba ujemna")
+    while n >= 0x80:
+        buf.append((n & 0x7F) | 0x80)
+        n >>= 7
+    buf.append(n)
+
+
+def read_varint(data, pos: int) -> Tuple[int, int]:
+    n = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError("ucięty varint")
+        b = data[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+@dataclass
+class Replay:
+    seed: int
+    size: Tuple[int, int]
+    inputs: List[int] = field(default_factory=list)     # dt_ms << 1 | skok
+    outcome: int = OUTCOME_ABANDONED
+    frames: int = 0
+    time_ms: int = 0
+    level: int = 1
+    digest: int = 0
+    keyframes: List[Tuple[int, int, int, int]] = field(default_factory=list)   # klatka, czas, offset, długość
+
+
+def parse_replay(data) -> Replay:
+    """data: bytes albo mmap; keyframe'y są tylko indeksowane, nie dekodowane."""
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ReplayError("to nie jest plik powtórki")
+    pos = len(MAGIC)
+    version, pos = read_varint(data, pos)
+    if version != VERSION:
+        raise ReplayError(f"nieobsługiwana wersja powtórki: {version}")
+    seed, pos = read_varint(data, pos)
+    w, pos = read_varint(data, pos)
+    h, pos = read_varint(data, pos)
+    replay = Replay(seed=seed, size=(w, h))
+    while True:
+        code, pos = read_varint(data, pos)
+        if code == 0:
+            break
+        if (code - 1) >> 1 > MAX_FRAME_DT_MS:
+            raise ReplayError(f"klatka {len(replay.inputs)}: dt {(code - 1) >> 1} ms poza zakresem")
+        if len(replay.inputs) >= MAX_FRAMES:
+            raise ReplayError(f"ponad {MAX_FRAMES} klatek")
+        replay.inputs.append(code - 1)
+    replay.outcome, pos = read_varint(data, pos)
+    replay.frames, pos = read_varint(data, pos)
+    if replay.frames > MAX_FRAMES:
+        raise ReplayError(f"zapisana liczba klatek {replay.frames} poza zakresem")
+    replay.time_ms, pos = read_varint(data, pos)
+    replay.level, pos = read_varint(data, pos)
+    replay.digest, pos = read_varint(data, pos)
+    replay.keyframes = _parse_index(data, pos)
+    return replay
+
+
+def _parse_index(data, end_of_trailer: int) -> List[Tuple[int, int, int, int]]:
+    if len(data) < end_of_trailer + FOOTER.size:
+        raise ReplayError("brak indeksu keyframe'ów")
+    index_pos, magic = FOOTER.unpack(data[len(data) - FOOTER.size:])
+    if magic != INDEX_MAGIC or not end_of_trailer <= index_pos <= len(data) - FOOTER.size:
+        raise ReplayError("uszkodzona stopka indeksu")
+    count, pos = read_varint(data, index_pos)
+    entries = []
+    for _ in range(count):
+        entry = []
+        for _ in range(4):
+            n, pos = read_varint(data, pos)
+            entry.append(n)
+        frame, t, offset, length = entry
+        if offset < end_of_trailer or offset + length > index_pos:
+            raise ReplayError("keyframe poza plikiem")
+        entries.append((frame, t, offset, length))
+    return entries
+
+
+def encode_keyframes(keyframes: List[Tuple[int, int, dict]], base_offset: int) -> bytes:
+    """Blok keyframe'ów + indeks + stopka; base_offset = długość pliku przed blokiem."""
+    out = bytearray()
+    index = []
+    for frame, t, state in keyframes:
+        blob = zlib.compress(json.dumps(state, separators=(",", ":")).encode("utf-8"), 6)
+        index.append((frame, t, base_offset + len(out), len(blob)))
+        out += blob
+    index_pos = base_offset + len(out)
+    write_varint(out, len(index))
+    for entry in index:
+        for n in entry:
+            write_varint(out, n)
+    out += FOOTER.pack(index_pos, INDEX_MAGIC)
+    return bytes(out)
+
+
+def load_replay(path: str) -> Replay:
+    with open(path, "rb") as fh:
+        return parse_replay(fh.read())
+
+
+class ReplayFile:
+    """Powtórka zmapowana w pamięci; keyframe'y dekodowane dopiero przy seek()."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as fh:
+            try:
+                self._mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ReplayError("pusty plik") from None
+        try:
+            self.replay = parse_replay(self._mm)
+        except ReplayError:
+            self._mm.close()
+            raise
+        # czas biegu po każdej klatce - do zamiany czasu na numer klatki
+        self.frame_end_ms = list(itertools.accumulate(code >> 1 for code in self.replay.inputs))
+        self._keyframe_ms = [t for _frame, t, _off, _len in self.replay.keyframes]
+
+    def keyframe_state(self, i: int) -> dict:
+        _frame, _t, offset, length = self.replay.keyframes[i]
+        try:
+            return json.loads(zlib.decompress(self._mm[offset:offset + length]))
+        except (zlib.error, ValueError) as e:
+            raise ReplayError(f"uszkodzony keyframe {i}: {e}") from None
+
+    def seek(self, run, time_ms: int) -> int:
+        """Ustawia run na stan po ostatniej klatce kończącej się najpóźniej w time_ms
+        (albo na kolizji, jeśli wcześniej); zwraca indeks następnej klatki do odtworzenia."""
+        i = bisect.bisect_right(self._keyframe_ms, time_ms) - 1
+        if i >= 0:
+            try:
+                run.set_state(self.keyframe_state(i))
+            except (KeyError, IndexError, TypeError, ValueError) as e:
+                raise ReplayError(f"niepoprawny keyframe {i}: {e}") from None
+            pos = self.replay.keyframes[i][0]
+        else:
+            run.start(self.replay.seed)
+            pos = 0
+        inputs = self.replay.inputs
+        while pos < len(inputs) and not run.collided and self.frame_end_ms[pos] <= time_ms:
+            code = inputs[pos]
+            if code & 1:
+                run.jump()
+            run.step(code >> 1)
+            pos += 1
+        return pos
+
+    def close(self):
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def prune_replays(folder: str, keep: int):
+    """Zostawia `keep` najnowszych powtórek; usuwa też osierocone .part po awarii."""
+    for path in glob.glob(os.path.join(folder, "*" + REPLAY_EXT + PART_EXT)):
+        os.remove(path)
+    paths = sorted(glob.glob(os.path.join(folder, "*" + REPLAY_EXT)))
+    for path in paths[:max(0, len(paths) - keep)]:
+        os.remove(path)
+
+
+def _remove_file(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+class ReplayRecorder:
+    """Nagrywanie biegu w pętli gry: bajty do bufora, co FLUSH_BYTES do wątku zapisu.
+
+    Jeśli pełna kolejka zapisu odrzuci którąkolwiek porcję, nagranie jest
+    porzucane w finish() - plik z dziurą nie może dostać docelowej nazwy."""
+    FLUSH_BYTES = 4096
+
+    def __init__(self, folder: str, writer, keep: int = REPLAY_KEEP):
+        self.folder = folder
+        self.writer = writer
+        self._buf = bytearray()
+        self._part: Optional[str] = None
+        self._final: Optional[str] = None
+        self._jump = False
+        self._size = 0
+        self._broken = False
+        self._keyframes: List[Tuple[int, int, dict]] = []
+        self._next_keyframe_ms = KEYFRAME_EVERY_MS
+        self.recorded = 0
+        self.last_path: Optional[str] = None
+        writer.submit(prune_replays, folder, keep)
+
+    @property
+    def active(self) -> bool:
+        return self._part is not None
+
+    def start(self, run):
+        """Nagłówek nowego biegu (po run.start())."""
+        if self.active:
+            self.discard()
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        self._final = os.path.join(self.folder, f"{stamp}-{run.seed:08x}{REPLAY_EXT}")
+        self._part = self._final + PART_EXT
+        self._buf = bytearray(MAGIC)
+        for n in (VERSION, run.seed, run.width, run.height):
+            write_varint(self._buf, n)
+        self._jump = False
+        self._size = 0
+        self._broken = False
+        self._keyframes = []
+        self._next_keyframe_ms = KEYFRAME_EVERY_MS
+
+    def jump(self):
+        """Skuteczny skok przed najbliższą klatką."""
+        self._jump = True
+
+    def frame(self, dt_ms: int, run):
+        """Wejście klatki; woła się przed run.advance(dt_ms)."""
+        if not self.active:
+            return
+        if run.time_ms >= self._next_keyframe_ms:
+            # sam odczyt stanu; JSON i kompresja dopiero w wątku zapisu przy finish()
+            self._keyframes.append((run.frames, run.time_ms, run.get_state()))
+            self._next_keyframe_ms = run.time_ms + KEYFRAME_EVERY_MS
+        write_varint(self._buf, ((int(dt_ms) << 1) | self._jump) + 1)
+        self._jump = False
+        if len(self._buf) >= self.FLUSH_BYTES:
+            self._flush()
+
+    def finish(self, outcome: int, run) -> bool:
+        """Domyka nagranie; False = porzucone (część zapisu przepadła)."""
+        if not self.active:
+            return False
+        self._buf.append(0)
+        for n in (outcome, run.frames, run.time_ms, run.level, run.digest()):
+            write_varint(self._buf, n)
+        self._flush()
+        if not self._broken and not self.writer.append_encoded(
+                self._part, encode_keyframes, self._keyframes, self._size):
+            self._broken = True
+        self._keyframes = []
+        if self._broken or not self.writer.finish_file(self._part, self._final):
+            # bez zmiany nazwy zostaje najwyżej .part - prune_replays usuwa je przy starcie
+            log.warning("powtórka %s porzucona: kolejka zapisu była pełna", os.path.basename(self._final))
+            self.discard()
+            return False
+        self.recorded += 1
+        self.last_path = self._final
+        self._part = self._final = None
+        return True
+
+    def discard(self):
+        if not self.active:
+            return
+        self._buf = bytearray()
+        self._keyframes = []
+        self.writer.finish_file(self._part)
+        self.writer.submit(_remove_file, self._part)
+        self._part = self._final = None
+
+    def _flush(self):
+        if self._buf:
+            if not self._broken and not self.writer.append(self._part, self._buf):
+                self._broken = True
+            self._size += len(self._buf)
+            self._buf = bytearray()
+
+
+def simulate(replay: Replay, run) -> int:
+    """Odtwarza powtórkę na RunSim (bez rysowania); zwraca outcome przebiegu."""
+    run.start(replay.seed)
+    for code in replay.inputs:
+        if code & 1:
+            run.jump()
+        if run.step(code >> 1):
+            return OUTCOME_COLLISION
+    return OUTCOME_ABANDONED
+
+
+CHECKED = (
+    ("outcome", "wynik"),
+    ("frames", "klatka końca/kolizji"),
+    ("time_ms", "czas przeżycia [ms]"),
+    ("level", "level"),
+    ("digest", "crc stanu"),
+)
+
+
+def verify(replay: Replay, run) -> List[str]:
+    """Rozbieżności między zapisanym wynikiem a ponowną symulacją (pusta = zgodne)."""
+    outcome = simulate(replay, run)
+    got = {
+        "outcome": outcome, "frames": run.frames, "time_ms": run.time_ms,
+        "level": run.level, "digest": run.digest(),
+    }
+    problems = []
+    for key, label in CHECKED:
+        claimed = getattr(replay, key)
+        if got[key] != claimed:
+            problems.append(f"{label}: zapisane {claimed}, symulacja {got[key]}")
+    return problems
+
+
+# =====================
+# Weryfikacja wsadowa (pula procesów)
+# =====================
+MIN_SIDE, MAX_SIDE = 64, 8192
+# czas z klatek dłuższych niż MAX_DT_MS_FOR_SCROLL liczy się do przeżycia, ale fizyka go nie widzi
+SUSPICIOUS_UNSIMULATED_MS = 2000
+
+# rozmiar -> RunSim; banki przeszkód wczytane raz na rozmiar, ale trzymane tylko dla kilku
+# ostatnich (bank dla dużego okna to setki MB, a pliki idą po nazwie, więc rozmiary się grupują)
+WORKER_RUN_CACHE = 2
+_worker_runs: OrderedDict = OrderedDict()
+
+
+def _headless_run(size: Tuple[int, int]):
+    import sim
+
+    w, h = size
+    if not (MIN_SIDE <= w <= MAX_SIDE and MIN_SIDE <= h <= MAX_SIDE):
+        raise ReplayError(f"nieobsługiwany rozmiar {w}x{h}")
+    run = _worker_runs.get(size)
+    if run is None:
+        while len(_worker_runs) >= WORKER_RUN_CACHE:
+            _worker_runs.popitem(last=False)
+        run = _worker_runs[size] = sim.load_headless(size)
+    else:
+        _worker_runs.move_to_end(size)
+    return run
+
+
+def _worker_init():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    # SDL domyślnie przechwytuje SIGINT/SIGTERM (zamienia na QUIT) - proces roboczy by ich nie słyszał
+    os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+    import pygame
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+
+
+def verify_file(path: str) -> dict:
+    """Weryfikacja jednego pliku w procesie roboczym; wynik jako słownik (do raportu JSON)."""
+    import sim
+
+    t0 = time.perf_counter()
+    result = {"path": path, "ok": False, "problems": [], "error": None}
+    try:
+        replay = load_replay(path)
+        run = _headless_run(replay.size)
+        result["problems"] = verify(replay, run)
+    except (OSError, ReplayError) as e:
+        result["error"] = str(e)
+        return result
+    except Exception as e:  # jeden plik nie może przerwać całej puli
+        log.exception("weryfikacja %s", path)
+        result["error"] = f"{type(e).__name__}: {e}"
+        return result
+    result.update(
+        ok=not result["problems"],
+        outcome=replay.outcome,
+        frames=run.frames,
+        time_ms=run.time_ms,
+        level=run.level,
+        unsimulated_ms=sum(max(0, (code >> 1) - sim.MAX_DT_MS_FOR_SCROLL) for code in replay.inputs),
+        ms=round((time.perf_counter() - t0) * 1000.0, 2),
+    )
+    return result
+
+
+def collect_paths(args: List[str]) -> List[str]:
+    """Pliki wprost + katalogi przeszukane rekurencyjnie (*.dreplay)."""
+    paths = []
+    for arg in args:
+        if os.path.isdir(arg):
+            paths.extend(sorted(glob.glob(os.path.join(arg, "**", "*" + REPLAY_EXT), recursive=True)))
+        else:
+            paths.append(arg)
+    return paths
+
+
+def verify_many(paths: List[str], jobs: int, on_result=None) -> List[dict]:
+    results = []
+    if jobs <= 1 or len(paths) <= 1:
+        _worker_init()
+        for path in paths:
+            results.append(verify_file(path))
+            if on_result is not None:
+                on_result(results[-1])
+        return results
+
+    import multiprocessing
+
+    chunk = max(1, min(32, len(paths) // (jobs * 8)))
+    pool = multiprocessing.Pool(jobs, initializer=_worker_init)
+    try:
+        for result in pool.imap_unordered(verify_file, paths, chunksize=chunk):
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+    return results
+
+
+def _format_result(r: dict) -> str:
+    if r["error"] is not None:
+        return f"{r['path']}: BŁĄD: {r['error']}"
+    head = (
+        f"{r['path']}: {OUTCOME_NAMES.get(r['outcome'], r['outcome'])}, klatka {r['frames']}, "
+        f"{r['time_ms'] / 1000.0:.2f} s, level {r['level']} ({r['ms']:.0f} ms) - "
+    )
+    if r["problems"]:
+        return head + "ROZBIEŻNE: " + "; ".join(r["problems"])
+    if r["unsimulated_ms"] > SUSPICIOUS_UNSIMULATED_MS:
+        return head + f"zgodne, ale {r['unsimulated_ms'] / 1000.0:.1f} s w klatkach dłuższych niż limit fizyki"
+    return head + "zgodne"
+
+
+def summary(results: List[dict], wall_s: float) -> str:
+    ok = [r for r in results if r["ok"]]
+    errors = [r for r in results if r["error"] is not None]
+    mismatched = [r for r in results if r["error"] is None and not r["ok"]]
+    suspicious = [r for r in ok if r["unsimulated_ms"] > SUSPICIOUS_UNSIMULATED_MS]
+    game_s = sum(r["time_ms"] for r in results if r["error"] is None) / 1000.0
+    lines = [
+        f"powtórek: {len(results)} - zgodnych {len(ok)}, rozbieżnych {len(mismatched)}, "
+        f"błędnych plików {len(errors)}, podejrzanych (czas poza fizyką) {len(suspicious)}",
+        f"czas gry {game_s / 60.0:.1f} min w {wall_s:.1f} s "
+        f"({len(results) / max(wall_s, 1e-6):.1f} powtórek/s, {game_s / max(wall_s, 1e-6):.0f}x czasu rzeczywistego)",
+    ]
+    if ok:
+        best = max(ok, key=lambda r: r["time_ms"])
+        lines.append(f"najdłuższy zgodny bieg: {best['time_ms'] / 1000.0:.2f} s, level {best['level']} ({best['path']})")
+    return "\n".join(lines)
+
+
+def _describe(run) -> str:
+    return (
+        f"klatka {run.frames}, {run.time_ms / 1000.0:.2f} s, level {run.level}, bg{run.bg_index + 1}, "
+        f"dino y={run.dino_y:.1f}, przeszkód {len(run.obstacles.obstacles)}"
+    )
+
+
+def _main_seek(paths: List[str], at_s: float) -> int:
+    _worker_init()
+    failed = 0
+    for path in paths:
+        try:
+            with ReplayFile(path) as source:
+                run = _headless_run(source.replay.size)
+                t0 = time.perf_counter()
+                pos = source.seek(run, int(at_s * 1000))
+                ms = (time.perf_counter() - t0) * 1000.0
+                print(f"{path}: {_describe(run)} (seek {ms:.1f} ms, następna klatka {pos}/{len(source.replay.inputs)})")
+        except (OSError, ReplayError) as e:
+            print(f"{path}: {e}")
+            failed += 1
+    return 1 if failed else 0
+
+
+def main(argv: List[str]) -> int:
+    ap = argparse.ArgumentParser(description="Sprawdza powtórki bez okna (ponowna symulacja).")
+    ap.add_argument("paths", nargs="+", metavar="PLIK_LUB_KATALOG")
+    ap.add_argument("--at", type=float, metavar="SEK", help="zamiast sprawdzania: stan biegu w tej sekundzie")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="procesy robocze (domyślnie: liczba CPU)")
+    ap.add_argument("-v", "--verbose", action="store_true", help="wiersz dla każdej powtórki, nie tylko rozbieżnych")
+    ap.add_argument("--report", metavar="PLIK.json", help="wyniki wszystkich powtórek jako JSON")
+    args = ap.parse_args(argv)
+
+    paths = collect_paths(args.paths)
+    if args.at is not None:
+        return _main_seek(paths, args.at)
+
+    def on_result(r: dict):
+        if args.verbose or not r["ok"] or r["unsimulated_ms"] > SUSPICIOUS_UNSIMULATED_MS:
+            print(_format_result(r), flush=True)
+
+    t0 = time.perf_counter()
+    results = verify_many(paths, args.jobs, on_result)
+    print(summary(results, time.perf_counter() - t0))
+    if args.report:
+        results.sort(key=lambda r: r["path"])
+        with open(args.report, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, ensure_ascii=False, indent=1)
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
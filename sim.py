@@ -0,0 +1,331 @@
+# sim.py
+"""Symulacja jednego biegu: fizyka dino, przewijanie tła, levele, przeszkody i
+kolizje - bez rysowania i bez zegara ściennego.
+
+Czas biegu to suma dt podanych do advance(), a przeszkody losuje RNG
+ObstacleManagera ziarnem z start(). Ten sam seed + te same (dt, skok) na
+klatkę dają więc ten sam bieg co do piksela - na tym opierają się powtórki
+(replay.py). Gra woła advance / update_obstacles / check_collision osobno,
+żeby PhaseTimer widział fazy; narzędzia biorą po prostu step()."""
+import random
+import struct
+import zlib
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+import pygame
+
+from render import ObstacleManager, smoothscale_generic
+
+# =====================
+# TŁA PO ŁADOWANIU (bg1->bg8)
+# =====================
+BG_SWITCH_EVERY_MS = 20000
+
+# Bazowa prędkość gry (scroll + przeszkody)
+BG_SCROLL_PX_PER_SEC = 230.0
+
+MAX_DT_MS_FOR_SCROLL = 40
+
+# przewijanie tła w stałym punkcie (px * PIX_DEN), bez dryfu floatów
+PIX_DEN = 1_000_000_000
+
+# =====================
+# LEVEL SPEED
+# Speed per level: +15%, cap 2.50x.
+# =====================
+LEVEL_SPEED_INCREASE = 0.15
+LEVEL_SPEED_CAP_MULT = 2.50
+
+# =====================
+# DINO - PARAMETRY
+# =====================
+DINO_PATH = "assets/skin/dino.png"
+OBSTACLE_DIR = "assets/obstacles"
+
+GROUND_Y_FRAC_BY_BG = [
+    0.86,  # bg1
+    0.86,  # bg2
+    0.90,  # bg3
+    0.86,  # bg4
+    0.90,  # bg5
+    0.86,  # bg6
+    0.86,  # bg7
+    0.906, # bg8
+]
+
+GROUND_Y_PX_OFFSET_BY_BG = [
+    0,      # bg1
+    0,      # bg2
+    -16,    # bg3
+    +5,     # bg4
+    -16,    # bg5
+    0,      # bg6
+    0,      # bg7
+    0,      # bg8
+]
+
+BG_COUNT = len(GROUND_Y_FRAC_BY_BG)
+
+DINO_X_FRAC = 0.18
+
+# Dino mniejsze
+DINO_HEIGHT_FRAC = 0.125
+
+# Skok ~3% dalej
+DINO_GRAVITY_PX_PER_S2 = 2800.0 / 1.03
+DINO_JUMP_VEL_PX_PER_S = 1120.0
+
+# =====================
+# KOLIZJE - maska
+# =====================
+MASK_ALPHA_THRESHOLD = 50     # ignoruje bardzo "miękkie" piksele na krawędziach
+MIN_OVERLAP_PIXELS = 4        # minimalna liczba pikseli overlap aby uznać kolizję
+
+
+@dataclass
+class DinoShape:
+    img: pygame.Surface
+    mask: pygame.mask.Mask
+    bounds: pygame.Rect
+    bottom_pad: int     # przezroczysty margines pod stopami
+
+
+def build_dino(raw: pygame.Surface, win_h: int) -> DinoShape:
+    """Dino przeskalowane do wysokości okna + maska kolizji."""
+    target_h = max(24, int(win_h * DINO_HEIGHT_FRAC))
+    scale = target_h / float(max(1, raw.get_height()))
+    target_w = max(24, int(raw.get_width() * scale))
+    img = smoothscale_generic(raw, (target_w, target_h)).convert_alpha()
+
+    mask = pygame.mask.from_surface(img, MASK_ALPHA_THRESHOLD)
+    rects = mask.get_bounding_rects()
+    bounds = ObstacleManager._union_rects(rects, img.get_rect())
+    return DinoShape(img=img, mask=mask, bounds=bounds, bottom_pad=max(0, int(img.get_height() - bounds.bottom)))
+
+
+def make_obstacles(size: Tuple[int, int], dino: DinoShape, tracer=None, preload: bool = True) -> ObstacleManager:
+    return ObstacleManager(
+        screen_size=size,
+        dino_height_px=dino.img.get_height(),
+        obstacle_dir=OBSTACLE_DIR,
+        base_speed_px_per_sec=BG_SCROLL_PX_PER_SEC,
+        mask_alpha_threshold=MASK_ALPHA_THRESHOLD,
+        jump_vel_px_per_s=DINO_JUMP_VEL_PX_PER_S,
+        gravity_px_per_s2=DINO_GRAVITY_PX_PER_S2,
+        tracer=tracer,
+        preload=preload,
+    )
+
+
+def load_headless(size: Tuple[int, int]) -> "RunSim":
+    """RunSim z zasobów z dysku (wymaga pygame.display z trybem - convert_alpha)."""
+    dino = build_dino(pygame.image.load(DINO_PATH).convert_alpha(), int(size[1]))
+    return RunSim(size, dino, make_obstacles(size, dino))
+
+
+class RunSim:
+    def __init__(self, size: Tuple[int, int], dino: DinoShape, obstacles: ObstacleManager):
+        self.width, self.height = int(size[0]), int(size[1])
+        self.dino = dino
+        self.obstacles = obstacles
+
+        # bg8: push ground down to match the white base using dino bottom padding
+        self.ground_px_offsets = list(GROUND_Y_PX_OFFSET_BY_BG)
+        if len(self.ground_px_offsets) > 7:
+            self.ground_px_offsets[7] += dino.bottom_pad
+
+        self.dino_x = int(self.width * DINO_X_FRAC)
+        self.dino_y = 0.0
+        self.dino_vy = 0.0
+        self.dino_on_ground = True
+        self.jump_pending = False
+
+        self.seed = 0
+        self.time_ms = 0        # zegar biegu: suma dt, stoi w pauzie
+        self.frames = 0
+        self.level = 1
+        self.collided = False
+        self._dt_ms = 0
+
+        self.speed_mult = 1.0
+        self.bg_index = 0
+        self.bg_switch_start_ms = 0
+        self.bg_scroll_num = 0
+        self.bg_speed_micro_per_sec = int(BG_SCROLL_PX_PER_SEC * 1_000_000)
+        self.apply_speed(rescale_existing=False)
+
+    # ---------- dino ----------
+    def ground_y(self, bg_idx: int) -> int:
+        i = bg_idx % len(GROUND_Y_FRAC_BY_BG)
+        frac = GROUND_Y_FRAC_BY_BG[i]
+        px_off = self.ground_px_offsets[i] if i < len(self.ground_px_offsets) else 0
+        return int(self.height * frac) + int(px_off)
+
+    def snap_dino_to_ground(self, bg_idx: int):
+        gy = self.ground_y(bg_idx)
+        self.dino_y = float(gy - self.dino.img.get_height())
+        self.dino_vy = 0.0
+        self.dino_on_ground = True
+
+    def resolve_dino_vs_ground(self, bg_idx: int):
+        gy = self.ground_y(bg_idx)
+        if self.dino_y + self.dino.img.get_height() >= gy:
+            self.dino_y = float(gy - self.dino.img.get_height())
+            self.dino_vy = 0.0
+            self.dino_on_ground = True
+
+    def dino_safe_right_px(self) -> int:
+        return int(self.dino_x + self.dino.img.get_width() // 2)
+
+    def dino_draw_pos(self) -> Tuple[int, int]:
+        dx = int(self.dino_x - self.dino.img.get_width() // 2)
+        dy = int(self.dino_y)
+        return dx, dy
+
+    def dino_hit_rect(self) -> pygame.Rect:
+        dx, dy = self.dino_draw_pos()
+        b = self.dino.bounds
+        return pygame.Rect(dx + b.left, dy + b.top, b.width, b.height)
+
+    # ---------- prędkość ----------
+    def speed_px_per_sec(self) -> float:
+        return BG_SCROLL_PX_PER_SEC * float(self.speed_mult)
+
+    def apply_speed(self, rescale_existing: bool = True):
+        spd = self.speed_px_per_sec()
+        self.bg_speed_micro_per_sec = int(spd * 1_000_000)
+        self.obstacles.set_base_speed(spd, rescale_existing=rescale_existing)
+
+    # ---------- bieg ----------
+    def start(self, seed: Optional[int] = None):
+        """Nowy bieg od bg1; seed=None = losowe ziarno (zapisywane w self.seed)."""
+        self.seed = random.getrandbits(32) if seed is None else int(seed)
+        self.obstacles.reseed(self.seed)
+        self.time_ms = 0
+        self.frames = 0
+        self.level = 1
+        self.collided = False
+        self.jump_pending = False
+
+        self.speed_mult = 1.0
+        self.apply_speed(rescale_existing=False)
+        self.bg_index = 0
+        self.bg_switch_start_ms = 0
+        self.bg_scroll_num = 0
+        self.snap_dino_to_ground(self.bg_index)
+        self.obstacles.reset(self.bg_index, 0, dino_safe_right_px=self.dino_safe_right_px(), start_visible=True)
+
+    def jump(self) -> bool:
+        """Skok od najbliższej klatki - jest wejściem tej klatki, także dla powtórki
+        (skok wciśnięty tuż przed pauzą nie zmienia stanu, którego nie nagrano)."""
+        if not self.dino_on_ground or self.jump_pending:
+            return False
+        self.jump_pending = True
+        return True
+
+    def advance(self, dt_ms: int) -> bool:
+        """Zegar, zmiana levelu, fizyka dino i scroll tła. True = nowy level w tej klatce."""
+        self.frames += 1
+        self.time_ms += max(0, int(dt_ms))
+        now = self.time_ms
+        switched = False
+
+        if self.jump_pending:
+            self.dino_vy = -DINO_JUMP_VEL_PX_PER_S
+            self.dino_on_ground = False
+            self.jump_pending = False
+
+        if now - self.bg_switch_start_ms >= BG_SWITCH_EVERY_MS:
+            self.speed_mult = min(LEVEL_SPEED_CAP_MULT, self.speed_mult * (1.0 + LEVEL_SPEED_INCREASE))
+            self.apply_speed(rescale_existing=True)
+
+            self.bg_index = (self.bg_index + 1) % BG_COUNT
+            self.level += 1
+            self.bg_switch_start_ms = now
+            self.bg_scroll_num = 0
+
+            self.obstacles.on_bg_change(self.bg_index, now, dino_safe_right_px=self.dino_safe_right_px())
+
+            if self.dino_on_ground:
+                self.snap_dino_to_ground(self.bg_index)
+            else:
+                self.resolve_dino_vs_ground(self.bg_index)
+            switched = True
+
+        self._dt_ms = min(max(0, int(dt_ms)), MAX_DT_MS_FOR_SCROLL)
+        dt_s = self._dt_ms / 1000.0
+
+        gy = self.ground_y(self.bg_index)
+        self.dino_vy += DINO_GRAVITY_PX_PER_S2 * dt_s
+        self.dino_y += self.dino_vy * dt_s
+
+        if self.dino_y + self.dino.img.get_height() >= gy:
+            self.dino_y = float(gy - self.dino.img.get_height())
+            self.dino_vy = 0.0
+            self.dino_on_ground = True
+        else:
+            self.dino_on_ground = False
+
+        # tła mają szerokość okna
+        if self.width > 0:
+            mod = self.width * PIX_DEN
+            self.bg_scroll_num = (self.bg_scroll_num + self.bg_speed_micro_per_sec * self._dt_ms) % mod
+        return switched
+
+    def update_obstacles(self):
+        self.obstacles.update(
+            dt_ms=self._dt_ms,
+            ground_y=self.ground_y(self.bg_index),
+            bg_idx=self.bg_index,
+            now_ms=self.time_ms,
+            dino_safe_right_px=self.dino_safe_right_px(),
+            baseline_offset_px=self.dino.bottom_pad,
+        )
+
+    def check_collision(self) -> bool:
+        self.collided = self.obstacles.collides_mask(
+            dino_mask=self.dino.mask,
+            dino_topleft=self.dino_draw_pos(),
+            dino_hit_rect=self.dino_hit_rect(),
+            min_overlap_pixels=MIN_OVERLAP_PIXELS,
+        )
+        return self.collided
+
+    def death_obstacle(self) -> str:
+        """Przeszkoda, na której skończył się bieg ("" bez kolizji)."""
+        ob = self.obstacles.hit_obstacle if self.collided else None
+        return self.obstacles.obstacle_name(ob) if ob is not None else ""
+
+    def step(self, dt_ms: int) -> bool:
+        """Cała klatka biegu; True = kolizja."""
+        self.advance(dt_ms)
+        self.update_obstacles()
+        return self.check_collision()
+
+    # ---------- stan (keyframe'y powtórek) ----------
+    _STATE_FIELDS = (
+        "seed", "time_ms", "frames", "level", "collided",
+        "dino_y", "dino_vy", "dino_on_ground", "jump_pending",
+        "speed_mult", "bg_index", "bg_switch_start_ms", "bg_scroll_num", "bg_speed_micro_per_sec",
+    )
+
+    def get_state(self) -> dict:
+        """Pełny stan biegu po ostatniej klatce (dane JSON); set_state() wznawia z niego symulację."""
+        state = {name: getattr(self, name) for name in self._STATE_FIELDS}
+        state["obstacles"] = self.obstacles.get_state()
+        return state
+
+    def set_state(self, state: dict):
+        for name in self._STATE_FIELDS:
+            setattr(self, name, type(getattr(self, name))(state[name]))
+        self.obstacles.set_state(state["obstacles"])
+
+    def digest(self) -> int:
+        """CRC32 stanu biegu - do porównania nagrania z odtworzeniem."""
+        parts = [struct.pack(
+            "<qqddqi", self.time_ms, self.frames, self.dino_y, self.dino_vy, self.bg_scroll_num, self.bg_index,
+        )]
+        for ob in self.obstacles.obstacles:
+            parts.append(struct.pack("<ddd", ob.x, ob.y, ob.speed))
+        return zlib.crc32(b"".join(parts))
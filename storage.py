@@ -0,0 +1,225 @@
+# storage.py
+"""Zapis ustawień bez blokowania pętli gry.
+
+SettingsStore.save() tylko podmienia oczekujący słownik; wątek w tle zapisuje
+najnowszą wersję po chwili bez zmian (kilka kliknięć = jeden zapis), atomowo:
+plik tymczasowy + fsync + os.replace, więc przerwany zapis nie zostawi uciętego
+setting.json. close() przy wyjściu zapisuje to, co jeszcze czeka.
+
+BackgroundWriter to ogólny wątek zapisu dla strumieni (powtórki itp.): pętla gry
+tylko wrzuca bajty do kolejki, pliki otwiera, dopisuje i zamyka wątek w tle."""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import BinaryIO, Callable, Dict, Optional
+
+log = logging.getLogger("dino_runner.storage")
+
+
+class SettingsStore:
+    DEBOUNCE_S = 0.4          # zapis po tylu sekundach bez kolejnej zmiany...
+    MAX_DELAY_S = 2.0         # ...ale nie później niż tyle od pierwszej niezapisanej
+    REPLACE_RETRIES = 3       # Windows: cel chwilowo otwarty (antywirus, synchronizacja profilu)
+    CLOSE_TIMEOUT_S = 3.0
+
+    def __init__(self, path: str):
+        self.path = path
+        self._cond = threading.Condition()
+        self._pending: Optional[dict] = None
+        self._written: Optional[dict] = None
+        self._first_change_t = 0.0
+        self._last_change_t = 0.0
+        self._closing = False
+
+        self.writes = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.max_write_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name="settings-writer", daemon=True)
+        self._thread.start()
+
+    def save(self, data: dict):
+        """Nie blokuje: zapamiętuje kopię, zapis zrobi wątek w tle."""
+        with self._cond:
+            if self._pending is None and data == self._written:
+                return
+            now = time.monotonic()
+            if self._pending is None:
+                self._first_change_t = now
+            else:
+                self.coalesced += 1
+            self._pending = dict(data)
+            self._last_change_t = now
+            self._cond.notify()
+
+    def close(self):
+        """Zapisuje oczekujące zmiany od razu i kończy wątek."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify()
+        self._thread.join(self.CLOSE_TIMEOUT_S)
+        if self._thread.is_alive():
+            log.warning("zapis ustawień nie zakończył się w %.0f s", self.CLOSE_TIMEOUT_S)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closing:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                while not self._closing:
+                    due = min(self._last_change_t + self.DEBOUNCE_S, self._first_change_t + self.MAX_DELAY_S)
+                    now = time.monotonic()
+                    if now >= due:
+                        break
+                    self._cond.wait(due - now)
+                data = self._pending
+                self._pending = None
+            if self._write(data):
+                with self._cond:
+                    self._written = data
+
+    def _write(self, data: dict) -> bool:
+        t0 = time.perf_counter()
+        tmp = self.path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=False, indent=2)
+                fh.flush()
+                os.fsync(fh.fileno())
+            for attempt in range(self.REPLACE_RETRIES):
+                try:
+                    os.replace(tmp, self.path)
+                    break
+                except PermissionError:
+                    if attempt == self.REPLACE_RETRIES - 1:
+                        raise
+                    time.sleep(0.05 * (attempt + 1))
+        except (OSError, TypeError, ValueError) as e:
+            self.failures += 1
+            log.warning("nie można zapisać %s: %s", self.path, e)
+            return False
+        ms = (time.perf_counter() - t0) * 1000.0
+        self.writes += 1
+        self.max_write_ms = max(self.max_write_ms, ms)
+        return True
+
+    def report(self) -> str:
+        return (
+            f"ustawienia: {self.writes} zapisów w tle ({self.coalesced} zmian scalonych), "
+            f"maks {self.max_write_ms:.1f} ms, błędów {self.failures}"
+        )
+
+
+class BackgroundWriter:
+    """Kolejka operacji plikowych wykonywanych w osobnym wątku.
+
+    Nic tu nie blokuje wołającego: przy pełnej kolejce operacja przepada
+    (licznik `dropped`) - lepiej zgubić nagranie niż klatkę."""
+    QUEUE_MAX = 256
+    CLOSE_TIMEOUT_S = 3.0
+
+    def __init__(self, name: str = "background-writer"):
+        self._queue: "queue.Queue" = queue.Queue(self.QUEUE_MAX)
+        self._files: Dict[str, BinaryIO] = {}
+        self._failed: set = set()
+
+        self.ops = 0
+        self.bytes = 0
+        self.dropped = 0
+        self.failures = 0
+        self.max_op_ms = 0.0
+
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, fn: Callable, *args) -> bool:
+        try:
+            self._queue.put_nowait((fn, args))
+        except queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def append(self, path: str, data: bytes) -> bool:
+        """Dopisuje bajty do pliku (otwieranego przy pierwszym zapisie)."""
+        return self.submit(self._append, path, bytes(data))
+
+    def append_encoded(self, path: str, encode: Callable[..., bytes], *args) -> bool:
+        """Jak append(), ale bajty liczy encode(*args) już w wątku zapisu (np. kompresja)."""
+        return self.submit(lambda: self._append(path, encode(*args)))
+
+    def finish_file(self, path: str, final_path: Optional[str] = None) -> bool:
+        """Zamyka plik (fsync); z final_path - atomowo zmienia nazwę na docelową."""
+        return self.submit(self._finish, path, final_path)
+
+    def close(self):
+        """Wykonuje to, co zostało w kolejce, i kończy wątek."""
+        try:
+            self._queue.put((None, ()), timeout=self.CLOSE_TIMEOUT_S)
+        except queue.Full:
+            log.warning("kolejka zapisu w tle pełna przy zamykaniu")
+            return
+        self._thread.join(self.CLOSE_TIMEOUT_S)
+        if self._thread.is_alive():
+            log.warning("zapis w tle nie zakończył się w %.0f s", self.CLOSE_TIMEOUT_S)
+
+    def _run(self):
+        while True:
+            fn, args = self._queue.get()
+            if fn is None:
+                break
+            t0 = time.perf_counter()
+            try:
+                fn(*args)
+            except Exception as e:  # wątek zapisu nie może umrzeć
+                self.failures += 1
+                log.warning("operacja zapisu w tle nie powiodła się: %s", e)
+            self.ops += 1
+            self.max_op_ms = max(self.max_op_ms, (time.perf_counter() - t0) * 1000.0)
+        for path in list(self._files):
+            self._finish(path, None)
+
+    def _append(self, path: str, data: bytes):
+        if path in self._failed:
+            return
+        fh = self._files.get(path)
+        try:
+            if fh is None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fh = open(path, "ab")
+                self._files[path] = fh
+            fh.write(data)
+        except OSError as e:
+            # jeden błąd na plik: dalsze dopiski do niego pomijamy
+            self._failed.add(path)
+            self.failures += 1
+            log.warning("nie można zapisać %s: %s", path, e)
+            return
+        self.bytes += len(data)
+
+    def _finish(self, path: str, final_path: Optional[str]):
+        fh = self._files.pop(path, None)
+        if path in self._failed:
+            self._failed.discard(path)
+            if fh is not None:
+                fh.close()
+            return
+        if fh is not None:
+            fh.flush()
+            os.fsync(fh.fileno())
+            fh.close()
+        if final_path is not None and os.path.exists(path):
+            os.replace(path, final_path)
+
+    def report(self) -> str:
+        return (
+            f"zapis w tle: {self.ops} operacji, {self.bytes / 1024.0:.1f} KB, "
+            f"maks {self.max_op_ms:.1f} ms, pominiętych {self.dropped}, błędów {self.failures}"
+        )
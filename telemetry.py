@@ -0,0 +1,157 @@
+# telemetry.py
+"""Telemetria sesji: zdarzenia gry jako JSONL w <folder ustawień>/telemetry.
+
+Pętla gry tylko dokłada słowniki do listy w pamięci (event) i zbiera czasy
+klatek (frame); co FLUSH_EVERY_S albo po FLUSH_EVENTS zdarzeniach porcja idzie
+do BackgroundWriter. Serializacja, kompresja i zapis dzieją się w jego wątku:
+każda porcja to osobny człon gzip dopisany do pliku sesji, więc plik da się
+czytać `zcat`/gzip.open także w trakcie gry. Po ROTATE_BYTES nowy plik, stare
+ponad KEEP_FILES są usuwane.
+
+Pamięć jest ograniczona: lista zdarzeń najwyżej FLUSH_EVENTS, okno czasów
+klatek najwyżej SUMMARY_MAX_FRAMES, a przy pełnej kolejce zapisu porcja
+przepada (licznik `dropped`) zamiast czekać."""
+import glob
+import gzip
+import json
+import logging
+import os
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from perf import percentile
+
+log = logging.getLogger("dino_runner.telemetry")
+
+TELEMETRY_FOLDER_NAME = "telemetry"
+TELEMETRY_EXT = ".jsonl.gz"
+
+
+def prune_telemetry(folder: str, keep: int):
+    """Zostawia `keep` najnowszych plików (nazwy zaczynają się od znacznika czasu)."""
+    paths = sorted(glob.glob(os.path.join(folder, "*" + TELEMETRY_EXT)))
+    for path in paths[:max(0, len(paths) - keep)]:
+        os.remove(path)
+
+
+class Telemetry:
+    FLUSH_EVERY_S = 10.0
+    FLUSH_EVENTS = 256
+    SUMMARY_EVERY_S = 10.0
+    SUMMARY_MAX_FRAMES = 4096
+    ROTATE_BYTES = 256 * 1024       # skompresowanych bajtów na plik
+    KEEP_FILES = 40
+    COMPRESS_LEVEL = 6
+
+    def __init__(self, folder: str, writer):
+        self.folder = folder
+        self.writer = writer
+        self.session = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid():x}"
+        self._t0 = time.monotonic()
+        self._events: List[dict] = []
+        self._last_flush = self._t0
+        self._frame_dt = array("f")
+        self._frame_work = array("f")
+        self._frame_states: Dict[str, int] = {}
+        self._last_summary = self._t0
+
+        # stan wątku zapisu
+        self._path: Optional[str] = None
+        self._file_bytes = 0
+        self._part = 0
+
+        self.events = 0
+        self.dropped = 0
+        self.written = 0
+        self.bytes = 0
+        writer.submit(prune_telemetry, folder, self.KEEP_FILES)
+
+    # ---------- pętla gry ----------
+    def event(self, kind: str, **fields):
+        """Zdarzenie z czasem od początku sesji [s]; pola muszą być serializowalne do JSON."""
+        ev = {"t": round(time.monotonic() - self._t0, 3), "ev": kind}
+        ev.update(fields)
+        self._events.append(ev)
+        self.events += 1
+        if len(self._events) >= self.FLUSH_EVENTS:
+            self.flush()
+
+    def frame(self, dt_ms: float, work_ms: float, state: str):
+        """Czasy jednej klatki; co SUMMARY_EVERY_S zdarzenie "frames" z percentylami."""
+        self._frame_dt.append(dt_ms)
+        self._frame_work.append(work_ms)
+        self._frame_states[state] = self._frame_states.get(state, 0) + 1
+        now = time.monotonic()
+        if now - self._last_summary >= self.SUMMARY_EVERY_S or len(self._frame_dt) >= self.SUMMARY_MAX_FRAMES:
+            self._summarize(now)
+        if self._events and now - self._last_flush >= self.FLUSH_EVERY_S:
+            self.flush()
+
+    def _summarize(self, now: float):
+        if not self._frame_dt:
+            return
+        dts = sorted(self._frame_dt)
+        works = sorted(self._frame_work)
+        self.event(
+            "frames",
+            n=len(dts),
+            window_s=round(now - self._last_summary, 2),
+            dt_ms={
+                "mean": round(sum(dts) / len(dts), 2),
+                "p50": round(percentile(dts, 0.50), 2),
+                "p95": round(percentile(dts, 0.95), 2),
+                "p99": round(percentile(dts, 0.99), 2),
+                "max": round(dts[-1], 2),
+            },
+            work_ms={
+                "p50": round(percentile(works, 0.50), 2),
+                "p95": round(percentile(works, 0.95), 2),
+                "max": round(works[-1], 2),
+            },
+            states=self._frame_states,
+        )
+        self._frame_dt = array("f")
+        self._frame_work = array("f")
+        self._frame_states = {}
+        self._last_summary = now
+
+    def flush(self):
+        """Oddaje zebrane zdarzenia do wątku zapisu (nie czeka na zapis)."""
+        self._last_flush = time.monotonic()
+        if not self._events:
+            return
+        batch, self._events = self._events, []
+        if not self.writer.submit(self._write, batch):
+            self.dropped += len(batch)
+
+    def close(self):
+        """Ostatnie podsumowanie i porcja; woła się przed zamknięciem BackgroundWriter."""
+        self._summarize(time.monotonic())
+        self.event("session_end")
+        self.flush()
+
+    # ---------- wątek zapisu ----------
+    def _write(self, batch: List[dict]):
+        text = "".join(json.dumps(ev, ensure_ascii=False, separators=(",", ":")) + "\n" for ev in batch)
+        data = gzip.compress(text.encode("utf-8"), compresslevel=self.COMPRESS_LEVEL)
+        rotated = False
+        if self._path is None or (self._file_bytes > 0 and self._file_bytes + len(data) > self.ROTATE_BYTES):
+            self._part += 1
+            self._path = os.path.join(self.folder, f"{self.session}-{self._part:03d}{TELEMETRY_EXT}")
+            self._file_bytes = 0
+            rotated = self._part > 1
+        os.makedirs(self.folder, exist_ok=True)
+        with open(self._path, "ab") as fh:
+            fh.write(data)
+        self._file_bytes += len(data)
+        self.written += len(batch)
+        self.bytes += len(data)
+        if rotated:
+            prune_telemetry(self.folder, self.KEEP_FILES)
+
+    def report(self) -> str:
+        return (
+            f"telemetria: {self.events} zdarzeń, zapisanych {self.written} "
+            f"({self.bytes / 1024.0:.1f} KB gzip, {self._part} plików), pominiętych {self.dropped}"
+        )
@@ -0,0 +1,166 @@
+# texture_backend.py
+from typing import Dict, Iterable, Optional, Tuple
+
+import pygame
+from pygame._sdl2 import video
+
+# tryby mieszania SDL (SDL_BlendMode)
+SDL_BLENDMODE_NONE = 0
+SDL_BLENDMODE_BLEND = 1
+SDL_BLENDMODE_ADD = 2
+
+
+class TextureBackend:
+    """Rysowanie rozgrywki przez SDL2 Renderer/Texture zamiast software'owych Surface.
+
+    Obiekt udaje docelową pygame.Surface (blit / blits / fill / get_size), więc
+    draw_game_world, ObstacleManager.draw i HUD rysują na nim bez zmian. Każda
+    powierzchnia źródłowa jest wgrywana jako tekstura raz (przy pierwszym użyciu
+    albo w preload) i potem już tylko kopiowana.
+
+    software=True wymusza renderer programowy SDL (działa bez GPU)."""
+
+    MAX_TEXTURES = 1024
+
+    def __init__(
+        self,
+        size: Tuple[int, int],
+        title: str = "Dino Runner",
+        vsync: bool = True,
+        software: bool = False,
+        borderless: bool = True,
+    ):
+        self.size = (int(size[0]), int(size[1]))
+        self.window = video.Window(title, self.size, borderless=borderless)
+        self.renderer = video.Renderer(
+            self.window,
+            accelerated=0 if software else -1,
+            vsync=bool(vsync),
+        )
+        self.software = bool(software)
+        self.vsync = bool(vsync)
+
+        # (id(surface), additive) -> (surface, texture); surface trzymamy, żeby id się nie powtórzyło
+        self._textures: Dict[Tuple[int, bool], Tuple[pygame.Surface, video.Texture]] = {}
+        self._stream: Optional[video.Texture] = None
+
+        self.uploads = 0
+        self.copies = 0
+
+    # ---------- tekstury ----------
+    @staticmethod
+    def _additive_source(surf: pygame.Surface) -> pygame.Surface:
+        # BLEND_RGBA_ADD w pygame dodaje RGB bez mnożenia przez alfę;
+        # SDL_BLENDMODE_ADD mnoży przez alfę - wyrównujemy alfę do 255
+        src = surf.convert_alpha()
+        src.fill((0, 0, 0, 255), special_flags=pygame.BLEND_RGBA_MAX)
+        return src
+
+    def texture_for(self, surf: pygame.Surface, additive: bool = False) -> video.Texture:
+        key = (id(surf), bool(additive))
+        entry = self._textures.get(key)
+        if entry is not None:
+            return entry[1]
+
+        if len(self._textures) >= self.MAX_TEXTURES:
+            self._textures.clear()
+
+        src = self._additive_source(surf) if additive else surf
+        tex = video.Texture.from_surface(self.renderer, src)
+        if additive:
+            tex.blend_mode = SDL_BLENDMODE_ADD
+        elif surf.get_flags() & pygame.SRCALPHA:
+            tex.blend_mode = SDL_BLENDMODE_BLEND
+        else:
+            tex.blend_mode = SDL_BLENDMODE_NONE
+        self._textures[key] = (surf, tex)
+        self.uploads += 1
+        return tex
+
+    def preload(self, surfaces: Iterable[pygame.Surface]):
+        for surf in surfaces:
+            if surf is not None:
+                self.texture_for(surf)
+
+    def forget(self, surf: pygame.Surface):
+        self._textures.pop((id(surf), False), None)
+        self._textures.pop((id(surf), True), None)
+
+    def texture_count(self) -> int:
+        return len(self._textures)
+
+    # ---------- API jak pygame.Surface ----------
+    def get_size(self) -> Tuple[int, int]:
+        return self.size
+
+    def get_width(self) -> int:
+        return self.size[0]
+
+    def get_height(self) -> int:
+        return self.size[1]
+
+    def get_rect(self, **kwargs) -> pygame.Rect:
+        r = pygame.Rect((0, 0), self.size)
+        for name, value in kwargs.items():
+            setattr(r, name, value)
+        return r
+
+    def fill(self, color, rect=None, special_flags: int = 0):
+        self.renderer.draw_color = tuple(color)[:3] + (255,)
+        if rect is None:
+            self.renderer.clear()
+        else:
+            self.renderer.fill_rect(pygame.Rect(rect))
+
+    def blit(self, source: pygame.Surface, dest, area=None, special_flags: int = 0):
+        tex = self.texture_for(source, additive=bool(special_flags & pygame.BLEND_RGBA_ADD))
+        if area is None:
+            src_rect = None
+            w, h = source.get_size()
+        else:
+            src_rect = pygame.Rect(area).clip(source.get_rect())
+            w, h = src_rect.size
+        if len(dest) == 2:
+            x, y = dest
+        else:
+            x, y = dest[0], dest[1]
+        dst_rect = pygame.Rect(int(x), int(y), w, h)
+        tex.draw(srcrect=src_rect, dstrect=dst_rect)
+        self.copies += 1
+        return dst_rect
+
+    def blits(self, blit_sequence, doreturn=True):
+        out = [] if doreturn else None
+        for item in blit_sequence:
+            r = self.blit(*item)
+            if doreturn:
+                out.append(r)
+        return out
+
+    # ---------- klatka ----------
+    def clear(self, color=(0, 0, 0)):
+        self.fill(color)
+
+    def present_surface(self, surf: pygame.Surface):
+        """Klatka narysowana programowo (menu, fade, overlay) - jeden upload całego ekranu."""
+        if self._stream is None or (self._stream.width, self._stream.height) != surf.get_size():
+            self._stream = video.Texture(self.renderer, surf.get_size(), streaming=True)
+            self._stream.blend_mode = SDL_BLENDMODE_NONE
+        self._stream.update(surf)
+        self._stream.draw(dstrect=pygame.Rect((0, 0), self.size))
+
+    def present(self):
+        self.renderer.present()
+
+    def read_frame(self) -> pygame.Surface:
+        return self.renderer.to_surface()
+
+    # ---------- okno ----------
+    def set_position(self, x: int, y: int):
+        self.window.position = (int(x), int(y))
+
+    def get_position(self) -> Tuple[int, int]:
+        return tuple(self.window.position)
+
+    def set_icon(self, icon: pygame.Surface):
+        self.window.set_icon(icon)